@@ -1,21 +1,76 @@
 from Board import Board
-from GameMaster import GameMaster
+from Exceptions import SearchLimitError
+from MCTS import MCTS
+from SearchStats import SearchStats
+from TranspositionTable import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+import Bitboard
+import MoveTable
+import TableBase
 
-from random import randint
+from random import choice
 import math
+import threading
+import time
+
+
+class SearchContext:
+    __slots__ = ("stats", "start", "cache", "cache_counters", "nodes", "deadline", "node_limit", "stop_event", "history", "killer_moves")
+
+    def __init__(self, source: str, geometry, transposition_table: TranspositionTable, time_limit: float, node_limit: int, stop_event: threading.Event):
+        """ initializes a new instance of the SearchContext class - the state of one move search (its counters, limits, killer moves and history
+            heuristic), created by every search call, so the searches of one AI can run at the same time in different threads
+
+        Args:
+            source (str): what finds the move (see SearchStats)
+            geometry (Bitboard.Geometry): geometry of the board
+            transposition_table (TranspositionTable): table used by the search (its lookups are counted from now on)
+            time_limit (float): seconds for the search (None for no time limit)
+            node_limit (int): nodes for the search (None for no node limit)
+            stop_event (threading.Event): event stopping the search early (None if it can not be stopped)
+        """
+        self.stats = SearchStats(source)
+        self.start = time.perf_counter()
+        self.cache = transposition_table
+        self.cache_counters = (transposition_table.hits, transposition_table.misses)
+        # nodes of the depth limited search (added to the stats at its end) and its limits
+        self.nodes = 0
+        self.deadline = None if time_limit is None else time.monotonic() + time_limit
+        self.node_limit = node_limit
+        self.stop_event = stop_event
+        # the fields in the most lines first, until the search tells more
+        self.history = [len(lines) for lines in geometry.cell_lines]
+        self.killer_moves = [[] for _ in range(geometry.cells + 1)]
 
 
 class AI:
-    strategy = "Player vs Player"
-    name = "X"
-    testing_board = Board()
+    # short names of the computer strategies used by the console tools
+    STRATEGIES = {
+        "random": "Player vs Random Computer",
+        "smart": "Player vs Smart Computer",
+        "mcts": "Player vs MCTS Computer",
+    }
+    # time limit (in seconds) used by the game window for the boards bigger than 3x3
+    DEFAULT_TIME_LIMIT = 1.0
+    # how many nodes are searched between two checks of the clock
+    TIME_CHECK_INTERVAL = 64
     
-    def __init__(self, name: str, strategy: str):
-        """ initializes a new instance of the AI class. Sets the name, id and the strategy
+    def __init__(self, name: str, strategy: str, transposition_table: TranspositionTable = None, use_move_table: bool = True, size: int = 3, win_length: int = 3,
+                 time_limit: float = None, node_limit: int = None, workers: int = 1, analysis_cache: TranspositionTable = None):
+        """ initializes a new instance of the AI class. Sets the name, id, the strategy, the board geometry, the transposition table,
+            which keeps the searched positions between the moves (a new one is created if not provided) and the precomputed move table (3x3 board)
+            or the tablebase (bigger boards, if it was solved with solve_tablebase.py)
 
         Args:
             name (str): name of the AI player
             strategy (str): name of the AI's strategy
+            transposition_table (TranspositionTable): cache of the searched positions, might be shared between the AI instances
+            use_move_table (bool): if the smart strategy should answer from the precomputed move table or tablebase (the search is used if it is missing)
+            size (int): number of rows (and columns) of the board
+            win_length (int): number of fields in a line needed to win
+            time_limit (float): seconds per move for the iterative deepening search (None with no node limit for the full minimax search) or the MCTS
+            node_limit (int): nodes per move for the iterative deepening search (None with no time limit for the full minimax search) or playouts per move for the MCTS
+            workers (int): number of processes searching the root moves in parallel (1 for the search in this process only)
+            analysis_cache (TranspositionTable): cache of the exactly solved positions of analyze, might be shared between the AI instances
         """
         if type(name) != str:
             raise TypeError("\"name\" should be of str class")
@@ -23,132 +78,685 @@ class AI:
             raise TypeError("\"strategy\" should be of str class")
         self.name = name
         self.strategy = strategy
+        self.geometry = Bitboard.get_geometry(size, win_length)
+        self.transposition_table = TranspositionTable() if transposition_table is None else transposition_table
+        # the entries are (score, distance, EXACT), kept apart from the search's bounds
+        self.analysis_cache = TranspositionTable() if analysis_cache is None else analysis_cache
+        self.move_table = None
+        if use_move_table:
+            self.move_table = MoveTable.get_default_table() if (size, win_length) == (3, 3) else TableBase.get_default_tablebase(size, win_length)
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        if type(workers) != int or workers < 1:
+            raise ValueError("\"workers\" should be a positive int")
+        self.workers = workers
+        self.parallel_search = None
+        self.mcts = None
+        # the pool of the parallel search and the tree of the MCTS (kept between the moves) belong to the AI, so their searches take turns;
+        # the other searches keep their state in their SearchContext and can run at the same time
+        self.search_lock = threading.Lock()
+        # counters of the last finished move search and the functions they are sent to after every search
+        self.search_stats = SearchStats()
+        self.stats_sinks = []
+        # weights of the open lines (without the opponent's fields) by the number of the player's fields in them
+        self.line_weights = [0] + [10 ** i for i in range(win_length)]
+
+    def set_limits(self, time_limit: float = None, node_limit: int = None):
+        """ changes the limits of the next searches (see __init__), also of the already created parallel search and MCTS
 
-    def set_testing_board(self, board: Board):
-        self.testing_board = board
+        Args:
+            time_limit (float): seconds per move
+            node_limit (int): nodes (playouts for the MCTS) per move
+        """
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        if self.parallel_search is not None:
+            self.parallel_search.time_limit = time_limit
+            self.parallel_search.node_limit = node_limit
+        if self.mcts is not None:
+            self.mcts.time_limit = time_limit
+            self.mcts.playouts = MCTS.DEFAULT_PLAYOUTS if node_limit is None and time_limit is None else node_limit
 
-    def get_player_move(self, board: list, opponentName: str) -> tuple:
-        """ returns the valid move as the coordinates of the board's field, random or minimax way depending on the strategy
+    def get_player_move(self, board: list, opponentName: str, stop_event: threading.Event = None) -> tuple:
+        """ returns the valid move as the coordinates of the board's field, random, minimax or MCTS way depending on the strategy
 
         Args:
-            board (list): board represented as a 2D 9 grid list
+            board (list): board represented as a 2D list
             opponentName (str): name of the human player (required for minimax evaluation)
+            stop_event (threading.Event): when set (e.g. from the GUI thread), the iterative deepening search or MCTS returns the best move
+                                          found so far (the full minimax search is not stopped). It stops this search only
+
+        Returns:
+            tuple: row, col
+        """
+        testing_board = Board(self.geometry.size, self.geometry.win_length)
+        testing_board.replace(board)
+        return self.get_player_move_on_board(testing_board, opponentName, stop_event)
+
+    def get_player_move_on_board(self, board: Board, opponent_name: str, stop_event: threading.Event = None) -> tuple:
+        """ the same as get_player_move, but takes the Board instance, so no list conversion is needed
+
+        Args:
+            board (Board): current board
+            opponent_name (str): name of the human player (required for minimax evaluation)
+            stop_event (threading.Event): event stopping the search (see get_player_move)
 
         Returns:
             tuple: row, col
         """
         if self.strategy == "Player vs Smart Computer":
-            self.testing_board.replace(board)
-            return self.get_best_move(opponentName)
+            if self.move_table is not None:
+                context = self.create_search_context("move_table" if isinstance(self.move_table, MoveTable.MoveTable) else "tablebase")
+                entry = self.move_table.get_best_move(board.get_bitboard(self.name), board.get_bitboard(opponent_name))
+                if entry is not None:
+                    self.finish_search_stats(context)
+                    return self.geometry.get_coordinates_of_cell(entry[0])
+            return self.get_best_move(board, opponent_name, stop_event)
+        elif self.strategy == "Player vs MCTS Computer":
+            with self.search_lock:
+                if self.mcts is None:
+                    self.mcts = MCTS(self.geometry.size, self.geometry.win_length, self.node_limit, self.time_limit)
+                context = self.create_search_context("mcts")
+                cell = self.mcts.get_best_move(board.get_bitboard(self.name), board.get_bitboard(opponent_name), stop_event)
+                context.stats.nodes = self.mcts.last_playouts
+                context.stats.max_depth = self.mcts.last_max_depth
+            self.finish_search_stats(context)
+            return (-1, -1) if cell == -1 else self.geometry.get_coordinates_of_cell(cell)
         else:
-            return self.get_random_move(board)
-            
+            context = self.create_search_context("random")
+            cell = board.get_random_free_cell()
+            self.finish_search_stats(context)
+            return (-1, -1) if cell == -1 else self.geometry.get_coordinates_of_cell(cell)
+
 
     def get_random_move(self, board: list) -> tuple:
         """ returns the random valid move as the coordinates of the board's field
 
         Args:
-            board (list): board represented as a 2D 9 grid list
+            board (list): board represented as a 2D list
 
         Returns:
             tuple: row, col
         """
-        while True:
-            move = randint(1,9)
-            if Board.is_AI_move_valid(move, board):
-                return Board.get_coordinates(move)
+        size = len(board)
+        return choice([(row, col) for row in range(size) for col in range(size) if board[row][col] == " "])
 
-    def get_best_move(self, opponent_name: str) -> tuple:
+    def get_best_move(self, board: Board, opponent_name: str, stop_event: threading.Event = None) -> tuple:
+        """ returns the best move for the position on the board, found with the minimax algorithm (the full search, the iterative deepening
+            search if there is the time or node limit, in the pool of processes if there are more workers). The counters of the search are kept
+            in search_stats and sent to the stats sinks.
+
+        Args:
+            board (Board): current board (it is not changed)
+            opponent_name (str): name of the human player
+            stop_event (threading.Event): event stopping the search (see get_player_move)
+
+        Returns:
+            tuple: row, col
+        """
+        ai_bits = board.get_bitboard(self.name)
+        opponent_bits = board.get_bitboard(opponent_name)
+        is_limited = self.time_limit is not None or self.node_limit is not None
+        context = self.create_search_context("parallel" if self.workers > 1 else "iterative" if is_limited else "minimax", stop_event)
+        if self.workers > 1:
+            with self.search_lock:
+                parallel_search = self.get_parallel_search()
+                cell = parallel_search.get_best_move(ai_bits, opponent_bits, stop_event)
+                context.stats.merge(parallel_search.stats)
+        elif is_limited:
+            cell = -1 if self.geometry.is_full(ai_bits | opponent_bits) else self.get_best_move_iterative(context, ai_bits, opponent_bits)
+        else:
+            cell = self.get_best_move_full(context, ai_bits, opponent_bits)
+        self.finish_search_stats(context)
+        return (-1, -1) if cell == -1 else self.geometry.get_coordinates_of_cell(cell)
+
+    def get_best_move_full(self, context: SearchContext, ai_bits: int, opponent_bits: int) -> int:
+        """ returns the best move found by the full minimax search. From the moves with the same score the one with the lowest depth is chosen.
+
+        Args:
+            context (SearchContext): state of the search
+            ai_bits (int): bitboard of the AI (maximizer)
+            opponent_bits (int): bitboard of the opponent (minimizer)
+
+        Returns:
+            int: bit number of the best move (-1 if there is no free field)
+        """
+        occupied = ai_bits | opponent_bits
         best_score = -math.inf
-        best_move = {'row': -1, 'col': -1, 'depth': 0}
-        
-        for row in range(3):
-            for col in range(3):
-                if self.testing_board.is_given_field_empty(row, col):
-                    self.testing_board.update_with_coords(self.name, (row, col))
-                    temp_score, temp_depth = self.minimax(0, -math.inf, math.inf, False, opponent_name)
-                    self.testing_board.update_with_coords(" ", (row, col))
-                    
-                    if best_score < temp_score or (best_score == temp_score and best_move['depth'] > temp_depth): # depth optimization
-                        best_move.update({'row': row, 'col': col, 'depth': temp_depth})
-                        best_score = temp_score
-                
+        best_move = {'cell': -1, 'depth': 0}
+
+        for cell in self.geometry.get_free_cells(occupied):
+            temp_score, temp_depth = self.minimax(context, ai_bits | 1 << cell, opponent_bits, 0, -math.inf, math.inf, False, cell)
+
+            if best_score < temp_score or (best_score == temp_score and best_move['depth'] > temp_depth): # depth optimization
+                best_move.update({'cell': cell, 'depth': temp_depth})
+                best_score = temp_score
+
+        return best_move['cell']
+
+    def analyze(self, board: Board, player_name: str, opponent_name: str, stop_event: threading.Event = None) -> dict:
+        """ scores every legal move of the player to move: the result of the game after the move with the best play of both players and the number
+            of moves to the end of the game. The scores are read from the tablebase if there is one (and it holds the position), otherwise
+            the position is solved by the full search (solve_position) cached in the analysis cache, so the analysis of the next positions
+            of the same game is cheap. On the bigger boards without the tablebase raises SearchLimitError when the AI's time or node limit
+            is reached or the analysis is stopped. The counters of the analysis are kept in search_stats and sent to the stats sinks.
+
+        Args:
+            board (Board): position to analyze
+            player_name (str): name of the player to move
+            opponent_name (str): name of the other player
+            stop_event (threading.Event): event stopping the analysis (e.g. set from the GUI thread)
+
+        Returns:
+            dict: (row, col): (score, distance) with the score 1 (win), 0 (draw) or -1 (loss) for the player to move, and the number of moves
+                  to the end of the game including this one (empty if the game is over)
+        """
+        geometry = self.geometry
+        player_bits, opponent_bits = board.get_bitboard(player_name), board.get_bitboard(opponent_name)
+        occupied = player_bits | opponent_bits
+        if geometry.has_line(player_bits) or geometry.has_line(opponent_bits):
+            return {}
+        tablebase = self.move_table if isinstance(self.move_table, TableBase.TableBase) else None
+        context = SearchContext("analysis", geometry, self.analysis_cache, self.time_limit, self.node_limit, stop_event)
+        player_lines, opponent_lines = geometry.get_line_counts(player_bits), geometry.get_line_counts(opponent_bits)
+        analysis = {}
+        try:
+            for cell in geometry.get_free_cells(occupied):
+                bits = player_bits | 1 << cell
+                # the entry is for the opponent, who is to move after the move (None if it is not the player's turn, the position is solved then)
+                entry = None if tablebase is None else tablebase.get_position_entry(opponent_bits, bits)
+                if geometry.is_winning_move(bits, cell):
+                    score, distance = 1, 1
+                elif occupied | 1 << cell == geometry.full_mask:
+                    score, distance = 0, 1
+                elif entry is not None:
+                    score, distance = TableBase.DRAW - entry[0], entry[1] + 1
+                else:
+                    score, distance = self.solve_position(context, opponent_bits, bits, opponent_lines, player_lines + geometry.cell_line_increments[cell])
+                    score, distance = -score, distance + 1
+                analysis[geometry.get_coordinates_of_cell(cell)] = (score, distance)
+        finally:
+            context.stats.nodes += context.nodes
+            self.finish_search_stats(context)
+        return analysis
+
+    def solve_position(self, context: SearchContext, mover_bits: int, other_bits: int, mover_lines: int, other_lines: int) -> tuple:
+        """ returns the exact result of the open position for the player to move, found by the full search without the alpha-beta cutoffs
+            (the cutoffs would leave the distances of the other moves unknown). The results are kept in the analysis cache under the key shared
+            by all 8 rotations and reflections of the position. Raises SearchLimitError when the time or node limit is reached or the search is stopped
+
+        Args:
+            context (SearchContext): state of the search
+            mover_bits (int): bitboard of the player to move
+            other_bits (int): bitboard of the other player
+            mover_lines (int), other_lines (int): packed line counts of the players
+
+        Returns:
+            tuple: score (1 win, 0 draw, -1 loss), number of moves to the end of the game with the best play
+        """
+        geometry = self.geometry
+        key = geometry.get_canonical_key(mover_bits, other_bits)
+        entry = self.analysis_cache.get(key)
+        if entry is not None:
+            return entry[0], entry[1]
+        context.nodes += 1
+        if context.node_limit is not None and context.nodes >= context.node_limit:
+            raise SearchLimitError(context.nodes)
+        if context.nodes % AI.TIME_CHECK_INTERVAL == 0 and (context.stop_event is not None and context.stop_event.is_set() or context.deadline is not None and time.monotonic() >= context.deadline):
+            raise SearchLimitError(context.nodes)
+
+        increments, tops, full_mask = geometry.cell_line_increments, geometry.cell_line_tops, geometry.full_mask
+        occupied = mover_bits | other_bits
+        best = None
+        for cell in geometry.get_free_cells(occupied):
+            bit = 1 << cell
+            lines = mover_lines + increments[cell]
+            # the move ending the game is scored without the recursion
+            if lines & tops[cell]:
+                best = (1, 1)
+                break
+            elif occupied | bit == full_mask:
+                result = (0, 1)
+            else:
+                score, distance = self.solve_position(context, other_bits, mover_bits | bit, other_lines, lines)
+                result = (-score, distance + 1)
+            if best is None or AI.get_move_rank(*result) > AI.get_move_rank(*best):
+                best = result
+        self.analysis_cache.store(key, best[0], best[1], EXACT)
+        return best
+
+    @staticmethod
+    def get_move_rank(score: int, distance: int) -> tuple:
+        """ returns the key by which the analyzed moves are ordered (the highest is the best): the win before the draw before the loss,
+            the faster win, the slower draw or loss (static method)
+
+        Args:
+            score (int): 1 (win), 0 (draw) or -1 (loss)
+            distance (int): number of moves to the end of the game
+
+        Returns:
+            tuple: rank
+        """
+        return score, -distance if score == 1 else distance
+
+    def create_search_context(self, source: str, stop_event: threading.Event = None) -> SearchContext:
+        """ starts the new search with the AI's current limits (its counters are kept apart from the other searches running at the same time)
+
+        Args:
+            source (str): what finds the move (see SearchStats)
+            stop_event (threading.Event): event stopping the search (None if it can not be stopped)
+
+        Returns:
+            SearchContext: state of the search
+        """
+        return SearchContext(source, self.geometry, self.transposition_table, self.time_limit, self.node_limit, stop_event)
+
+    def finish_search_stats(self, context: SearchContext):
+        """ completes the counters of the search (wall time, transposition table lookups; the lookups of the other searches sharing the table
+            at the same time are counted too), keeps them as the counters of the last search and sends them to the stats sinks
+
+        Args:
+            context (SearchContext): state of the finished search
+        """
+        stats = context.stats
+        stats.seconds = time.perf_counter() - context.start
+        stats.cache_hits += context.cache.hits - context.cache_counters[0]
+        stats.cache_misses += context.cache.misses - context.cache_counters[1]
+        self.search_stats = stats
+        if self.stats_sinks:
+            record = stats.to_dict()
+            for sink in self.stats_sinks:
+                sink(record)
+
+    def get_search_stats(self) -> SearchStats:
+        """ returns the counters of the last move search
+
+        Returns:
+            SearchStats: nodes, cutoffs, cache hits and misses, max depth and wall time
+        """
+        return self.search_stats
 
-        return best_move['row'], best_move['col']
+    def add_stats_sink(self, sink):
+        """ adds the function called with the counters of every move search (as the dict of SearchStats.to_dict), e.g. SearchStats.create_logging_sink()
 
-    def minimax(self, depth: int, alpha: float, beta: float, is_maximizer_turn: bool, opponent_name: str):
+        Args:
+            sink (function): sink(stats)
+        """
+        self.stats_sinks.append(sink)
+
+    def get_parallel_search(self):
+        """ returns the parallel search of the AI (with its pool of processes), created on the first use
+
+        Returns:
+            ParallelSearch: parallel search
+        """
+        if self.parallel_search is None:
+            from ParallelSearch import ParallelSearch
+            self.parallel_search = ParallelSearch(self.geometry.size, self.geometry.win_length, self.workers, self.time_limit, self.node_limit)
+        return self.parallel_search
+
+    def close(self):
+        """ stops the processes of the parallel search, if there are any
+        """
+        if self.parallel_search is not None:
+            self.parallel_search.close()
+            self.parallel_search = None
+
+    def minimax(self, context: SearchContext, ai_bits: int, opponent_bits: int, depth: int, alpha: float, beta: float, is_maximizer_turn: bool, last_cell: int = -1,
+                ai_lines: int = None, opponent_lines: int = None):
         """ minimax function based on the Minimax algorithm with addition of alpha-pruning to save computational time. The idea is to traverse all the possible moves and get the highest move value. One player is maximizer, which will always choose the best move, and another one is minimizer which will choose the worst move for the maximizer every single time.
             After searching all the possible moves from the current state, the function will return the highest possible score of the move evaluated in the get_best_move, and its depth.
+            The position is given as two bitboards, so making and undoing a move are just the bit operations. The packed line counts of both players
+            (see Bitboard.Geometry.cell_line_increments) are passed down too, so a move which ends the game is recognized with one addition, before the recursion.
+            Searched positions are stored in the transposition table under the key shared by all their rotations and reflections,
+            together with the information if the score is exact or only the lower / upper bound (because of the alpha-beta cutoffs).
 
         Args:
+            context (SearchContext): state of the search
+            ai_bits (int): bitboard of the AI (maximizer)
+            opponent_bits (int): bitboard of the opponent (minimizer)
             depth (int): number of steps needed to get to the particular move
             alpha (float), beta (float): values needed for alpha-pruning
             is_maximizer_turn (bool): maximizer turn (true) or minimizer turn (false)
-            opponent_name (str): name of the player
+            last_cell (int): bit number of the move which led to this position (-1 if unknown, then the whole board is checked)
+            ai_lines (int), opponent_lines (int): packed line counts of the players (None at the start of the search, then the position is checked and they are built)
 
         Returns:
             tuple: score, depth
         """
-        
-        best_score = self.evaluate_current_state(opponent_name)
+        stats = context.stats
+        stats.nodes += 1
+        if depth >= stats.max_depth:
+            stats.max_depth = depth + 1
+
+        if ai_lines is None:
+            best_score = self.evaluate_current_state(ai_bits, opponent_bits, last_cell)
+            if best_score in [-1, 0, 1]:
+                return best_score, depth
+            ai_lines = self.geometry.get_line_counts(ai_bits)
+            opponent_lines = self.geometry.get_line_counts(opponent_bits)
         best_depth = depth
 
-        if best_score in [-1, 0, 1]:
-            pass
-    
-        elif is_maximizer_turn:
+        geometry = self.geometry
+        occupied = ai_bits | opponent_bits
+        free_fields = geometry.cells - occupied.bit_count()
+        key = geometry.get_canonical_key(ai_bits, opponent_bits) << 1 | is_maximizer_turn
+
+        # transposition table part
+        entry = self.transposition_table.get(key)
+        if entry is not None and entry[1] >= free_fields:
+            score, _, flag = entry
+            if flag == EXACT:
+                return score, depth+1
+            elif flag == LOWER_BOUND:
+                if score > alpha:
+                    alpha = score
+            elif score < beta:
+                beta = score
+            if alpha >= beta:
+                return score, depth+1
+        window_alpha, window_beta = alpha, beta
+
+        increments, tops, full_mask = geometry.cell_line_increments, geometry.cell_line_tops, geometry.full_mask
+        free_cells = geometry.get_free_cells(occupied)
+        if is_maximizer_turn:
             best_score = -math.inf
-            for row in range(3):
-                for col in range(3):
-                    if self.testing_board.is_given_field_empty(row, col):
-                        self.testing_board.update_with_coords(self.name, (row, col))
-                        temp_score = self.minimax(depth + 1, alpha, beta, False, opponent_name)[0]
-                        self.testing_board.update_with_coords(" ", (row, col))
-                        
-                        # depth optimization part
-                        if temp_score > best_score:
-                            best_depth = depth+1                     
-                        best_score = max([best_score, temp_score])
-
-                        # alpha beta pruning part
-                        if best_score >= beta:
-                            return best_score, depth
-                        alpha = max([alpha, best_score])
+            for cell in free_cells:
+                bit = 1 << cell
+                lines = ai_lines + increments[cell]
+                # the move ending the game is scored without the recursion
+                if lines & tops[cell]:
+                    stats.nodes += 1
+                    temp_score = 1
+                elif occupied | bit == full_mask:
+                    stats.nodes += 1
+                    temp_score = 0
+                else:
+                    temp_score = self.minimax(context, ai_bits | bit, opponent_bits, depth + 1, alpha, beta, False, cell, lines, opponent_lines)[0]
+                
+                # depth optimization part
+                if temp_score > best_score:
+                    best_depth = depth+1                     
+                    best_score = temp_score
+
+                # alpha beta pruning part
+                if best_score >= beta:
+                    stats.cutoffs += 1
+                    break
+                if best_score > alpha:
+                    alpha = best_score
  
 
         else: # minimizer turn   
             best_score = math.inf
-            for row in range(3):
-                for col in range(3):
-                    if self.testing_board.is_given_field_empty(row, col):
-                        self.testing_board.update_with_coords(opponent_name, (row, col))
-                        temp_score = self.minimax(depth + 1, alpha, beta, True, opponent_name)[0]
-                        self.testing_board.update_with_coords(" ", (row, col))
-
-                        # depth optimization part
-                        if temp_score < best_score:
-                            best_depth = depth+1 
-                        best_score = min([best_score, temp_score])
-
-                        # alpha beta pruning part
-                        if best_score <= alpha:
-                            return best_score, depth
-                        beta = min([beta, best_score])
+            for cell in free_cells:
+                bit = 1 << cell
+                lines = opponent_lines + increments[cell]
+                # the move ending the game is scored without the recursion
+                if lines & tops[cell]:
+                    stats.nodes += 1
+                    temp_score = -1
+                elif occupied | bit == full_mask:
+                    stats.nodes += 1
+                    temp_score = 0
+                else:
+                    temp_score = self.minimax(context, ai_bits, opponent_bits | bit, depth + 1, alpha, beta, True, cell, ai_lines, lines)[0]
+
+                # depth optimization part
+                if temp_score < best_score:
+                    best_depth = depth+1 
+                    best_score = temp_score
+
+                # alpha beta pruning part
+                if best_score <= alpha:
+                    stats.cutoffs += 1
+                    break
+                if best_score < beta:
+                    beta = best_score
+
+        if best_score <= window_alpha:
+            flag = UPPER_BOUND
+        elif best_score >= window_beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.transposition_table.store(key, best_score, free_fields, flag)
 
         return best_score, best_depth
 
 
-    def evaluate_current_state(self, opponent_name: str) -> int:
-        """ returns a score value for current state on the board (0 for tie, 1 for maximizer win, -1 for minimizer win, -2 for ongoing game). This is the part of the Minimax algorithm.
+    def get_best_move_iterative(self, context: SearchContext, ai_bits: int, opponent_bits: int) -> int:
+        """ returns the best move found by the iterative deepening search: the depth limited minimax (limited_minimax) is run with the depth 1, 2, ...
+            until the time or node limit is reached, and the best move of the last finished iteration is returned. Every iteration starts with
+            the best move of the previous one, so the alpha-beta cuts off earlier. The winning move is always played right away.
 
         Args:
-            opponent_name (str): name of the human player
+            context (SearchContext): state of the search
+            ai_bits (int): bitboard of the AI (maximizer)
+            opponent_bits (int): bitboard of the opponent (minimizer)
+
+        Returns:
+            int: bit number of the best move
+        """
+        free_cells = self.geometry.get_free_cells(ai_bits | opponent_bits)
+        for cell in free_cells:
+            if self.geometry.is_winning_move(ai_bits | 1 << cell, cell):
+                return cell
+
+        root_moves = self.get_root_moves(context, free_cells)
+        best_cell = root_moves[0]
+
+        for max_depth in range(1, len(free_cells) + 1):
+            best_score, iteration_best_cell = -math.inf, root_moves[0]
+            alpha = -math.inf
+            try:
+                for cell in root_moves:
+                    temp_score = self.limited_minimax(context, ai_bits | 1 << cell, opponent_bits, max_depth - 1, alpha, math.inf, False, cell, 1)
+                    if temp_score > best_score:
+                        best_score, iteration_best_cell = temp_score, cell
+                    alpha = max([alpha, best_score])
+            except SearchLimitError:
+                break
+            best_cell = iteration_best_cell
+            root_moves.remove(best_cell)
+            root_moves.insert(0, best_cell)
+            # the result of the game is already known, deeper search will not change it
+            if best_score in [-1, 1]:
+                break
+
+        context.stats.nodes += context.nodes
+        return best_cell
+
+    def get_root_moves(self, context: SearchContext, free_cells: list) -> list:
+        """ returns the free fields in the order for the first iteration of the iterative deepening search (by the history heuristic)
+
+        Args:
+            context (SearchContext): state of the search
+            free_cells (list): bit numbers of the free fields
+
+        Returns:
+            list: ordered bit numbers of the free fields
+        """
+        history = context.history
+        return sorted(free_cells, key = lambda cell: history[cell], reverse = True)
+
+    def limited_minimax(self, context: SearchContext, ai_bits: int, opponent_bits: int, depth_left: int, alpha: float, beta: float, is_maximizer_turn: bool, last_cell: int, ply: int,
+                        ai_lines: int = None, opponent_lines: int = None) -> float:
+        """ minimax with the alpha-beta pruning searching only depth_left moves ahead. The positions at the depth limit get the heuristic score
+            (evaluate_heuristic). The moves are ordered by the killer moves (moves which caused the cutoff at the same ply) and the history heuristic
+            (how often and how deep the move caused the cutoff). The moves ending the game are recognized by the packed line counts, as in minimax.
+            Raises SearchLimitError when the time or node limit is reached or the search is stopped.
+
+        Args:
+            context (SearchContext): state of the search
+            ai_bits (int): bitboard of the AI (maximizer)
+            opponent_bits (int): bitboard of the opponent (minimizer)
+            depth_left (int): number of moves to search ahead
+            alpha (float), beta (float): values needed for alpha-pruning
+            is_maximizer_turn (bool): maximizer turn (true) or minimizer turn (false)
+            last_cell (int): bit number of the move which led to this position
+            ply (int): number of moves made from the root of the search
+            ai_lines (int), opponent_lines (int): packed line counts of the players (None at the start of the search, then the position is checked and they are built)
+
+        Returns:
+            float: score (1 for maximizer win, -1 for minimizer win, heuristic score between them otherwise)
+        """
+        context.nodes += 1
+        if ply > context.stats.max_depth:
+            context.stats.max_depth = ply
+        if context.node_limit is not None and context.nodes >= context.node_limit:
+            raise SearchLimitError(context.nodes)
+        if context.nodes % AI.TIME_CHECK_INTERVAL == 0 and (context.stop_event is not None and context.stop_event.is_set() or context.deadline is not None and time.monotonic() >= context.deadline):
+            raise SearchLimitError(context.nodes)
+
+        if ai_lines is None:
+            best_score = self.evaluate_current_state(ai_bits, opponent_bits, last_cell)
+            if best_score in [-1, 0, 1]:
+                return best_score
+            ai_lines = self.geometry.get_line_counts(ai_bits)
+            opponent_lines = self.geometry.get_line_counts(opponent_bits)
+        if depth_left == 0:
+            return self.evaluate_heuristic(ai_bits, opponent_bits)
+
+        geometry = self.geometry
+        occupied = ai_bits | opponent_bits
+        key = geometry.get_canonical_key(ai_bits, opponent_bits) << 1 | is_maximizer_turn
+
+        # transposition table part
+        entry = self.transposition_table.get(key)
+        if entry is not None and entry[1] >= depth_left:
+            score, _, flag = entry
+            if flag == EXACT:
+                return score
+            elif flag == LOWER_BOUND:
+                if score > alpha:
+                    alpha = score
+            elif score < beta:
+                beta = score
+            if alpha >= beta:
+                return score
+        window_alpha, window_beta = alpha, beta
+
+        increments, tops, full_mask = geometry.cell_line_increments, geometry.cell_line_tops, geometry.full_mask
+        best_score = -math.inf if is_maximizer_turn else math.inf
+        for cell in self.order_moves(context, occupied, ply):
+            bit = 1 << cell
+            if is_maximizer_turn:
+                lines = ai_lines + increments[cell]
+                # the move ending the game is scored without the recursion
+                if lines & tops[cell]:
+                    temp_score = 1
+                elif occupied | bit == full_mask:
+                    temp_score = 0
+                else:
+                    temp_score = self.limited_minimax(context, ai_bits | bit, opponent_bits, depth_left - 1, alpha, beta, False, cell, ply + 1, lines, opponent_lines)
+                if temp_score > best_score:
+                    best_score = temp_score
+                    if best_score > alpha:
+                        alpha = best_score
+            else:
+                lines = opponent_lines + increments[cell]
+                if lines & tops[cell]:
+                    temp_score = -1
+                elif occupied | bit == full_mask:
+                    temp_score = 0
+                else:
+                    temp_score = self.limited_minimax(context, ai_bits, opponent_bits | bit, depth_left - 1, alpha, beta, True, cell, ply + 1, ai_lines, lines)
+                if temp_score < best_score:
+                    best_score = temp_score
+                    if best_score < beta:
+                        beta = best_score
+
+            # alpha beta pruning part
+            if alpha >= beta:
+                context.stats.cutoffs += 1
+                self.store_cutoff_move(context, cell, ply, depth_left)
+                break
+
+        if best_score <= window_alpha:
+            flag = UPPER_BOUND
+        elif best_score >= window_beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.transposition_table.store(key, best_score, depth_left, flag)
+
+        return best_score
+
+    def order_moves(self, context: SearchContext, occupied: int, ply: int) -> list:
+        """ returns the free fields in the order in which they should be searched: killer moves of the ply first, then by the history heuristic
+
+        Args:
+            context (SearchContext): state of the search
+            occupied (int): bits of both players
+            ply (int): number of moves made from the root of the search
+
+        Returns:
+            list: bit numbers of the free fields
+        """
+        killers = context.killer_moves[ply]
+        history = context.history
+        return sorted(self.geometry.get_free_cells(occupied), key = lambda cell: (cell in killers, history[cell]), reverse = True)
+
+    def store_cutoff_move(self, context: SearchContext, cell: int, ply: int, depth_left: int):
+        """ remembers the move which caused the alpha-beta cutoff as the killer move of the ply (two last ones are kept) and raises its history score
+
+        Args:
+            context (SearchContext): state of the search
+            cell (int): bit number of the move
+            ply (int): number of moves made from the root of the search
+            depth_left (int): number of moves searched ahead of the cutoff node
+        """
+        killers = context.killer_moves[ply]
+        if cell not in killers:
+            killers.insert(0, cell)
+            del killers[2:]
+        context.history[cell] += depth_left * depth_left
+
+    def evaluate_heuristic(self, ai_bits: int, opponent_bits: int) -> float:
+        """ returns the heuristic score of the position which is not the end of the game: the sum of the weights of the lines still open for the AI
+            minus the same sum for the opponent (the more fields of the player in the line, the bigger weight), squeezed to (-1, 1)
+
+        Args:
+            ai_bits (int): bitboard of the AI (maximizer)
+            opponent_bits (int): bitboard of the opponent (minimizer)
+
+        Returns:
+            float: heuristic score between -1 and 1
+        """
+        weights = self.line_weights
+        score = 0
+        for mask in self.geometry.win_masks:
+            ai_fields = ai_bits & mask
+            opponent_fields = opponent_bits & mask
+            if not opponent_fields:
+                score += weights[ai_fields.bit_count()]
+            elif not ai_fields:
+                score -= weights[opponent_fields.bit_count()]
+        return score / (1 + abs(score))
+
+    def evaluate_current_state(self, ai_bits: int, opponent_bits: int, last_cell: int = -1) -> int:
+        """ returns a score value for the given state (0 for tie, 1 for maximizer win, -1 for minimizer win, -2 for ongoing game). This is the part of the Minimax algorithm.
+            If the last move is known, only the lines through it are checked (O(win_length) instead of the whole board).
+
+        Args:
+            ai_bits (int): bitboard of the AI (maximizer)
+            opponent_bits (int): bitboard of the opponent (minimizer)
+            last_cell (int): bit number of the move which led to this state (-1 if unknown)
 
         Returns:
             int: score value (0 for tie, 1 for maximizer win, -1 for minimizer win, -2 for ongoing game)
         """
-        gm = GameMaster()
-        gm.evaluate_the_game_status(self.testing_board.board)
-        game_status = gm.get_the_game_status()
-        evaluations = {self.name: 1, opponent_name: -1, "0": 0}
-        return evaluations.get(game_status, -2)
+        if last_cell == -1:
+            if self.geometry.has_line(ai_bits):
+                return 1
+            if self.geometry.has_line(opponent_bits):
+                return -1
+        elif ai_bits >> last_cell & 1:
+            if self.geometry.is_winning_move(ai_bits, last_cell):
+                return 1
+        elif self.geometry.is_winning_move(opponent_bits, last_cell):
+            return -1
+        if self.geometry.is_full(ai_bits | opponent_bits):
+            return 0
+        return -2
@@ -0,0 +1,110 @@
+""" evaluation of many positions at once with NumPy. The positions are encoded either as the bitboards (array of shape (n, 2): bits of the
+    first and the second player, boards up to 8x8) or as the fields (array of shape (n, size * size): 0 for empty, 1 for the first player,
+    2 for the second player). The statuses are returned as the array of the codes below
+"""
+import Bitboard
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# the same meaning as '0' and '1' of the GameMaster, the winner is told by the player's number
+DRAW = 0
+ONGOING = 1
+FIRST_PLAYER_WINS = 2
+SECOND_PLAYER_WINS = 3
+
+# number of the positions evaluated in one vectorized step is about this number divided by the number of the lines
+BATCH_ELEMENTS = 4000000
+
+
+def _check_numpy():
+    if np is None:
+        raise ImportError("NumPy is needed for the batch evaluation")
+
+
+def _get_statuses(first_done, second_done, is_full):
+    """ returns the statuses from the winning lines of the players (the earliest line of GameMaster's order wins, if both have one)
+
+    Args:
+        first_done (numpy.ndarray): (n, lines) bool, true if the line is completed by the first player
+        second_done (numpy.ndarray): (n, lines) bool, the same for the second player
+        is_full (numpy.ndarray): (n,) bool, true if there is no free field
+
+    Returns:
+        numpy.ndarray: (n,) statuses
+    """
+    lines = first_done.shape[1]
+    first_line = np.where(first_done.any(axis = 1), first_done.argmax(axis = 1), lines)
+    second_line = np.where(second_done.any(axis = 1), second_done.argmax(axis = 1), lines)
+    statuses = np.where(is_full, DRAW, ONGOING).astype(np.int8)
+    statuses[second_line < first_line] = SECOND_PLAYER_WINS
+    statuses[first_line < second_line] = FIRST_PLAYER_WINS
+    return statuses
+
+
+def evaluate_bitboards(positions, size: int = 3, win_length: int = 3):
+    """ returns the statuses of the positions encoded as the bitboards
+
+    Args:
+        positions (numpy.ndarray): (n, 2) integers, bits of the first and the second player
+        size (int): number of rows (and columns) of the board, at most 8
+        win_length (int): number of fields in a line needed to win
+
+    Returns:
+        numpy.ndarray: (n,) statuses (DRAW, ONGOING, FIRST_PLAYER_WINS or SECOND_PLAYER_WINS)
+    """
+    _check_numpy()
+    geometry = Bitboard.get_geometry(size, win_length)
+    if geometry.cells > 64:
+        raise ValueError("bitboards of the boards bigger than 8x8 do not fit into 64 bits, use evaluate_cells")
+    positions = np.asarray(positions, dtype = np.uint64)
+    masks = np.array(geometry.win_masks, dtype = np.uint64)
+    full_mask = np.uint64(geometry.full_mask)
+    statuses = np.empty(len(positions), dtype = np.int8)
+    batch = max(1, BATCH_ELEMENTS // len(masks))
+    for start in range(0, len(positions), batch):
+        first = positions[start:start + batch, 0, None]
+        second = positions[start:start + batch, 1, None]
+        statuses[start:start + batch] = _get_statuses((first & masks) == masks, (second & masks) == masks, ((first | second)[:, 0] & full_mask) == full_mask)
+    return statuses
+
+
+def evaluate_cells(positions, size: int = 3, win_length: int = 3):
+    """ returns the statuses of the positions encoded as the fields (works for any board size)
+
+    Args:
+        positions (numpy.ndarray): (n, size * size) integers, 0 for empty, 1 for the first player, 2 for the second player
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+
+    Returns:
+        numpy.ndarray: (n,) statuses (DRAW, ONGOING, FIRST_PLAYER_WINS or SECOND_PLAYER_WINS)
+    """
+    _check_numpy()
+    geometry = Bitboard.get_geometry(size, win_length)
+    positions = np.asarray(positions, dtype = np.int8)
+    lines = np.array([[cell for cell in range(geometry.cells) if mask >> cell & 1] for mask in geometry.win_masks], dtype = np.intp)
+    statuses = np.empty(len(positions), dtype = np.int8)
+    batch = max(1, BATCH_ELEMENTS // (len(lines) * win_length))
+    for start in range(0, len(positions), batch):
+        fields = positions[start:start + batch]
+        line_fields = fields[:, lines]
+        statuses[start:start + batch] = _get_statuses((line_fields == 1).all(axis = 2), (line_fields == 2).all(axis = 2), (fields != 0).all(axis = 1))
+    return statuses
+
+
+def encode_boards(boards: list, first_name: str, second_name: str):
+    """ encodes the Board instances as the bitboards array for evaluate_bitboards
+
+    Args:
+        boards (list): Board instances (up to 8x8)
+        first_name (str): name of the first player
+        second_name (str): name of the second player
+
+    Returns:
+        numpy.ndarray: (n, 2) bits of the first and the second player
+    """
+    _check_numpy()
+    return np.array([(board.get_bitboard(first_name), board.get_bitboard(second_name)) for board in boards], dtype = np.uint64).reshape(-1, 2)
@@ -0,0 +1,332 @@
+""" bitboard helpers. A board is kept as one integer per player, in which the bit number (row * size + col) is set
+    when the player occupies that field (so the bit number is always the field ID - 1)
+"""
+from random import Random
+
+
+def _transform(row: int, col: int, size: int, symmetry: int) -> tuple:
+    """ returns the coordinates of the field after one of the 8 board symmetries (4 rotations, each optionally mirrored)
+
+    Args:
+        row (int): row coordinate
+        col (int): column coordinate
+        size (int): number of rows (and columns) of the board
+        symmetry (int): symmetry number (0 - 7), 0 is the identity
+
+    Returns:
+        tuple: (row, col)
+    """
+    if symmetry >= 4:
+        col = size - 1 - col
+    for _ in range(symmetry % 4):
+        row, col = col, size - 1 - row
+    return row, col
+
+
+class Geometry:
+    # boards with up to this number of fields get the symmetry lookup tables for the whole bitboard, bigger ones per row
+    MAX_CELLS_FOR_FULL_SYMMETRY_TABLES = 12
+    # boards with up to this number of fields get one table of the free fields for the whole bitboard, bigger ones per FREE_CELLS_CHUNK bits
+    MAX_CELLS_FOR_FULL_FREE_CELLS_TABLE = 12
+    FREE_CELLS_CHUNK = 8
+
+    def __init__(self, size: int = 3, win_length: int = 3):
+        """ initializes a new instance of the Geometry class - everything about the board of the given size which does not change
+            during the game: masks of all the winning lines (win_length fields in a row, column or diagonal) and the lines
+            going through each field, so after a move only those have to be checked
+
+        Args:
+            size (int): number of rows (and columns) of the board
+            win_length (int): number of fields in a line needed to win
+        """
+        if type(size) != int or size < 1:
+            raise ValueError("\"size\" should be a positive int")
+        if type(win_length) != int or win_length < 1 or win_length > size:
+            raise ValueError("\"win_length\" should be an int between 1 and the board size")
+        self.size = size
+        self.win_length = win_length
+        self.cells = size * size
+        self.full_mask = (1 << self.cells) - 1
+
+        def line_mask(row: int, col: int, row_step: int, col_step: int) -> int:
+            return sum(self.get_bit(row + i * row_step, col + i * col_step) for i in range(win_length))
+
+        starts = range(size - win_length + 1)
+        diagonal_masks = [line_mask(row, col, 1, 1) for row in starts for col in starts]
+        diagonal_masks += [line_mask(row, col + win_length - 1, 1, -1) for row in starts for col in starts]
+        # rows and columns interleaved (row 0, col 0, row 1, ...) - the same order in which Board used to scan them
+        rows_and_cols_masks = []
+        for i in range(size):
+            rows_and_cols_masks += [line_mask(i, col, 0, 1) for col in starts]
+            rows_and_cols_masks += [line_mask(row, i, 1, 0) for row in starts]
+        self.diagonal_masks = tuple(diagonal_masks)
+        self.rows_and_cols_masks = tuple(rows_and_cols_masks)
+        self.win_masks = self.diagonal_masks + self.rows_and_cols_masks
+        # cell_lines[cell] are the masks of all the lines going through the field (at most 4 * win_length of them)
+        self.cell_lines = tuple(tuple(mask for mask in self.win_masks if mask >> cell & 1) for cell in range(self.cells))
+        # line counts of one player packed into one int for the search: line_field_width bits per line (in the win_masks order), each starting
+        # at 2 ** (width - 1) - win_length, so the top bit of the field gets set by the move completing the line. A move adds
+        # cell_line_increments[cell] and wins if the result has any of cell_line_tops[cell] bits - O(1) instead of checking the lines one by one
+        width = win_length.bit_length() + 1
+        self.line_field_width = width
+        self.empty_line_counts = sum(((1 << (width - 1)) - win_length) << (width * line) for line in range(len(self.win_masks)))
+        self.cell_line_increments = tuple(sum(1 << (width * line) for line, mask in enumerate(self.win_masks) if mask >> cell & 1)
+                                          for cell in range(self.cells))
+        self.cell_line_tops = tuple(increment << (width - 1) for increment in self.cell_line_increments)
+        self.symmetry_tables = None
+        # free_cells_tables[chunk][bits] are the bit numbers of the set bits of the chunk, so the free fields are found with a lookup per chunk
+        chunk_length = self.cells if self.cells <= Geometry.MAX_CELLS_FOR_FULL_FREE_CELLS_TABLE else Geometry.FREE_CELLS_CHUNK
+        self.free_cells_chunk_length = chunk_length
+        self.free_cells_tables = tuple(tuple(tuple(start + i for i in range(chunk_length) if bits >> i & 1) for bits in range(1 << chunk_length))
+                                       for start in range(0, self.cells, chunk_length))
+
+    def get_bit(self, row: int, col: int) -> int:
+        """ returns the bit representing the board's field of the given coordinates
+
+        Args:
+            row (int): row coordinate
+            col (int): column coordinate
+
+        Returns:
+            int: single bit mask
+        """
+        return 1 << (row * self.size + col)
+
+    def get_coordinates_of_cell(self, cell: int) -> tuple:
+        """ returns the coordinates of the board's field, given its bit number
+
+        Args:
+            cell (int): bit number
+
+        Returns:
+            tuple: (row, col)
+        """
+        return divmod(cell, self.size)
+
+    def is_full(self, occupied: int) -> bool:
+        """ returns true if all of the board's fields are occupied
+
+        Args:
+            occupied (int): bits of both players
+
+        Returns:
+            bool: if there is no free field
+        """
+        return occupied == self.full_mask
+
+    def get_free_cells(self, occupied: int) -> tuple:
+        """ returns the bit numbers of the free fields in the ascending order, with one table lookup per chunk of the bitboard
+            instead of checking all the fields
+
+        Args:
+            occupied (int): bits of both players
+
+        Returns:
+            tuple: bit numbers of the free fields
+        """
+        free = self.full_mask & ~occupied
+        tables = self.free_cells_tables
+        if len(tables) == 1:
+            return tables[0][free]
+        chunk_length = self.free_cells_chunk_length
+        chunk_mask = (1 << chunk_length) - 1
+        cells = ()
+        for chunk, table in enumerate(tables):
+            cells += table[free >> (chunk * chunk_length) & chunk_mask]
+        return cells
+
+    def has_line(self, bits: int) -> bool:
+        """ returns true if the player owning the fields in bits has a full line anywhere on the board
+
+        Args:
+            bits (int): player's bitboard
+
+        Returns:
+            bool: if there is a winning line
+        """
+        for mask in self.win_masks:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def is_winning_move(self, bits: int, cell: int) -> bool:
+        """ returns true if the player owning the fields in bits has a full line going through the given field.
+            Checks only the lines through that field, so after a move it costs O(win_length) instead of a full board scan
+
+        Args:
+            bits (int): player's bitboard (with the move already made)
+            cell (int): bit number of the move
+
+        Returns:
+            bool: if the move made a winning line
+        """
+        for mask in self.cell_lines[cell]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def get_line_counts(self, bits: int) -> int:
+        """ returns the packed line counts of the player (see cell_line_increments), built from scratch - the search then updates them with every move
+
+        Args:
+            bits (int): player's bitboard
+
+        Returns:
+            int: packed line counts
+        """
+        counts = self.empty_line_counts
+        for cell in range(self.cells):
+            if bits >> cell & 1:
+                counts += self.cell_line_increments[cell]
+        return counts
+
+    def from_list(self, board_list: list) -> dict:
+        """ converts the 2D list into the bitboards
+
+        Args:
+            board_list (list): board represented as the 2D list
+
+        Returns:
+            dict: pairs name (str): bits (int)
+        """
+        bitboards = {}
+        for row in range(self.size):
+            for col in range(self.size):
+                name = board_list[row][col]
+                if name != " ":
+                    bitboards[name] = bitboards.get(name, 0) | self.get_bit(row, col)
+        return bitboards
+
+    def to_list(self, bitboards: dict) -> list:
+        """ converts the bitboards into the 2D list
+
+        Args:
+            bitboards (dict): pairs name (str): bits (int)
+
+        Returns:
+            list: board represented as the 2D list
+        """
+        board_list = [self.size * [" "] for _ in range(self.size)]
+        for name, bits in bitboards.items():
+            for cell in range(self.cells):
+                if bits >> cell & 1:
+                    row, col = self.get_coordinates_of_cell(cell)
+                    board_list[row][col] = name
+        return board_list
+
+    def build_symmetry_tables(self):
+        """ precomputes the lookup tables of the 8 symmetries (built on the first use, as only the search needs them).
+            Small boards get one table per symmetry for the whole bitboard, bigger ones one table per row
+        """
+        size = self.size
+        if self.cells <= Geometry.MAX_CELLS_FOR_FULL_SYMMETRY_TABLES:
+            chunk_length, chunks = self.cells, 1
+        else:
+            chunk_length, chunks = size, size
+        tables = []
+        for symmetry in range(8):
+            chunk_tables = []
+            for chunk in range(chunks):
+                chunk_table = []
+                for chunk_bits in range(1 << chunk_length):
+                    bits = 0
+                    for i in range(chunk_length):
+                        if chunk_bits >> i & 1:
+                            row, col = divmod(chunk * chunk_length + i, size)
+                            bits |= self.get_bit(*_transform(row, col, size, symmetry))
+                    chunk_table.append(bits)
+                chunk_tables.append(tuple(chunk_table))
+            tables.append(tuple(chunk_tables))
+        self.symmetry_tables = tuple(tables)
+
+    def get_canonical_key(self, first_bits: int, second_bits: int) -> int:
+        """ returns the key of the position which is the same for all 8 rotations and reflections of it
+            (the lowest of the 8 transformed positions, each packed into one integer)
+
+        Args:
+            first_bits (int): bitboard of the first player
+            second_bits (int): bitboard of the second player
+
+        Returns:
+            int: canonical key (2 * cells bits)
+        """
+        if self.symmetry_tables is None:
+            self.build_symmetry_tables()
+        cells = self.cells
+        if len(self.symmetry_tables[0]) == 1:
+            return min((table[first_bits] << cells) | table[second_bits] for (table,) in self.symmetry_tables)
+
+        size, row_mask = self.size, (1 << self.size) - 1
+        keys = []
+        for row_tables in self.symmetry_tables:
+            first, second = 0, 0
+            for row in range(size):
+                first |= row_tables[row][first_bits >> (row * size) & row_mask]
+                second |= row_tables[row][second_bits >> (row * size) & row_mask]
+            keys.append((first << cells) | second)
+        return min(keys)
+
+
+_geometries = {}
+
+
+def get_geometry(size: int = 3, win_length: int = 3) -> Geometry:
+    """ returns the Geometry of the board, created once per size and win length
+
+    Args:
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+
+    Returns:
+        Geometry: shared geometry instance
+    """
+    geometry = _geometries.get((size, win_length))
+    if geometry is None:
+        geometry = _geometries[(size, win_length)] = Geometry(size, win_length)
+    return geometry
+
+
+# mask of one 64-bit Zobrist key
+ZOBRIST_KEY_MASK = (1 << 64) - 1
+_zobrist_numbers = {}
+
+
+def get_zobrist_numbers(name: str, size: int = 3) -> tuple:
+    """ returns the random 64-bit Zobrist numbers of the player's fields for all 8 symmetries at once: numbers[cell] packs 8 numbers of 64 bits,
+        the symmetry s in the bits 64 * s ... 64 * s + 63 holding the number of the field to which the symmetry moves the cell. So the XOR of
+        numbers over the player's fields holds the keys of all 8 transformed positions (the lowest 64 bits are the key of the position itself).
+        The numbers are derived from the name and the size only, so the keys are the same in every process and run
+
+    Args:
+        name (str): player name
+        size (int): number of rows (and columns) of the board
+
+    Returns:
+        tuple: size * size packed numbers
+    """
+    numbers = _zobrist_numbers.get((name, size))
+    if numbers is None:
+        rng = Random("zobrist {} {}".format(size, name))
+        cell_numbers = [rng.getrandbits(64) for _ in range(size * size)]
+        numbers = _zobrist_numbers[(name, size)] = tuple(
+            sum(cell_numbers[row * size + col] << (64 * symmetry) for symmetry, (row, col) in
+                enumerate(_transform(*divmod(cell, size), size, symmetry) for symmetry in range(8)))
+            for cell in range(size * size))
+    return numbers
+
+
+def get_winner(bitboards: dict, masks: tuple):
+    """ returns the name of the first player (in order of the given masks) who occupies a whole line
+
+    Args:
+        bitboards (dict): pairs name (str): bits (int)
+        masks (tuple): line masks to be checked
+
+    Returns:
+        str or None: name of the winner, None if nobody has a full line
+    """
+    for mask in masks:
+        for name, bits in bitboards.items():
+            if bits & mask == mask:
+                return name
+    return None
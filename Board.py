@@ -1,13 +1,40 @@
 from Exceptions import WrongCoordinatesError, WrongFieldIDError, WrongBoardError
+import Bitboard
+
+from random import choice
 
 class Board:
-    board = []
+    __slots__ = ("geometry", "size", "win_length", "bitboards", "last_move", "zobrist_keys", "free_cells", "free_cell_indexes")
 
-    def __init__(self):
-        """ initializes a new instance of the Board class. Sets a board variable with all empty slots (with " ")
+    def __init__(self, size: int = 3, win_length: int = 3):
+        """ initializes a new instance of the Board class. Sets the geometry (see Bitboard module) and the bitboards (one integer per player) with all empty slots
         
+        Args:
+            size (int): number of rows (and columns) of the board
+            win_length (int): number of fields in a line needed to win
+        """
+        self.geometry = Bitboard.get_geometry(size, win_length)
+        self.size = size
+        self.win_length = win_length
+        self.bitboards = {}
+        #bit number of the last move (None if there was no move yet)
+        self.last_move = None
+        #64-bit Zobrist keys of the position transformed by each of the 8 symmetries packed into one int (the lowest 64 bits are the key
+        #of the position itself, see Bitboard.get_zobrist_numbers), updated with one XOR on every change of a field
+        self.zobrist_keys = 0
+        #bit numbers of the free fields (in any order) and the index of each field in that list (-1 for the occupied ones),
+        #so a field is added or removed in O(1) (the removed one is swapped with the last one)
+        self.free_cells = list(range(self.geometry.cells))
+        self.free_cell_indexes = list(range(self.geometry.cells))
+
+    @property
+    def board(self) -> list:
+        """ the board as the 2D list with the players names (empty slots filled with " "), built from the bitboards
+
+        Returns:
+            list: board represented as the 2D list
         """
-        self.board = [3*[" "] for _ in range(3)]
+        return self.geometry.to_list(self.bitboards)
 
    
     def __repr__(self):
@@ -17,8 +44,11 @@ class Board:
             str: board list + helper list
         """
         rep = ""
-        for i in range(3):
-            rep += (" | ".join(self.board[i]) + "              {} | {} | {}  ".format(i*3+1, i*3+2, i*3+3) + "\n")
+        board = self.board
+        width = len(str(self.size * self.size))
+        for i in range(self.size):
+            field_IDs = " | ".join(str(i*self.size + j + 1).rjust(width) for j in range(self.size))
+            rep += (" | ".join(board[i]) + "              " + field_IDs + "  " + "\n")
         return rep
 
     def update_with_field_ID(self, name: str, fieldID: int):
@@ -28,15 +58,61 @@ class Board:
             name (str): player name (X, O)
             fieldID (int): ID of the board's field
         """
-        coords = Board.get_coordinates(fieldID)
-        row = coords[0]
-        col = coords[1]
-        self.board[row][col] = name
+        self.update_with_coords(name, Board.get_coordinates(fieldID, self.size))
 
     def reset(self):
         """ resets the board
         """
-        self.board = [[" "] for _ in range(3)]
+        self.bitboards = {}
+        self.last_move = None
+        self.zobrist_keys = 0
+        self.free_cells = list(range(self.geometry.cells))
+        self.free_cell_indexes = list(range(self.geometry.cells))
+
+    @staticmethod
+    def from_string(position: str, win_length: int = 3):
+        """ creates the board from the fields written row by row in one string ("." or "-" for the empty field, any other character is the player name),
+            e.g. "O...X...." for the 3x3 board
+
+        Args:
+            position (str): fields of the board (the board size is the square root of the length)
+            win_length (int): number of fields in a line needed to win
+
+        Returns:
+            Board: board with the position
+        """
+        size = int(round(len(position) ** 0.5))
+        if size * size != len(position) or size == 0:
+            raise ValueError("the position should have size * size fields, got {}".format(len(position)))
+        board = Board(size, win_length)
+        for cell, name in enumerate(position):
+            if name not in ".- ":
+                board.set_bit(name, 1 << cell)
+        #the order of the moves is unknown
+        board.last_move = None
+        return board
+
+    def to_string(self) -> str:
+        """ returns the fields of the board row by row in one string ("." for the empty field), the format of from_string
+
+        Returns:
+            str: position
+        """
+        return "".join(name if name != " " else "." for row in self.board for name in row)
+
+    def copy(self):
+        """ returns the independent copy of the board (e.g. for the search running in another thread)
+
+        Returns:
+            Board: copy of the board
+        """
+        board = Board(self.size, self.win_length)
+        board.bitboards = dict(self.bitboards)
+        board.last_move = self.last_move
+        board.zobrist_keys = self.zobrist_keys
+        board.free_cells = list(self.free_cells)
+        board.free_cell_indexes = list(self.free_cell_indexes)
+        return board
 
     def update_with_coords(self, name: str, coords: tuple):
         """ updates the board field with the player name, given the row and column coordinates
@@ -47,81 +123,155 @@ class Board:
         """
         row = coords[0]
         col = coords[1]
-        if row in range(0,3) and col in range(0,3) and type(row) == int and type(col) == int:
-            self.board[row][col] = name
+        if row in range(0, self.size) and col in range(0, self.size) and type(row) == int and type(col) == int:
+            self.set_bit(name, self.geometry.get_bit(row, col))
         else:
-            raise WrongCoordinatesError(row, col)
-            
+            raise WrongCoordinatesError(row, col, self.size)
+
+    def set_bit(self, name: str, bit: int):
+        """ updates the board field given as a single bit mask with the player name (" " clears the field), without the validation
+
+        Args:
+            name (str): player name (X, O) or " "
+            bit (int): single bit mask of the field
+        """
+        cell = bit.bit_length() - 1
+        for other_name, bits in self.bitboards.items():
+            if bits & bit:
+                self.bitboards[other_name] = bits & ~bit
+                self.toggle_zobrist_keys(other_name, cell)
+        if name != " ":
+            self.bitboards[name] = self.bitboards.get(name, 0) | bit
+            self.toggle_zobrist_keys(name, cell)
+            self.remove_free_cell(cell)
+            self.last_move = cell
+        else:
+            self.add_free_cell(cell)
+            if self.last_move == cell:
+                self.last_move = None
+
+    def add_free_cell(self, cell: int):
+        """ adds the field to the free fields (if it is not there yet), O(1)
+
+        Args:
+            cell (int): bit number of the field
+        """
+        if self.free_cell_indexes[cell] == -1:
+            self.free_cell_indexes[cell] = len(self.free_cells)
+            self.free_cells.append(cell)
+
+    def remove_free_cell(self, cell: int):
+        """ removes the field from the free fields (if it is there), O(1): the last free field takes its place
+
+        Args:
+            cell (int): bit number of the field
+        """
+        index = self.free_cell_indexes[cell]
+        if index == -1:
+            return
+        last_cell = self.free_cells.pop()
+        if last_cell != cell:
+            self.free_cells[index] = last_cell
+            self.free_cell_indexes[last_cell] = index
+        self.free_cell_indexes[cell] = -1
+
+    def get_free_cells(self) -> list:
+        """ returns the bit numbers of the free fields (in no particular order), O(number of the free fields)
+
+        Returns:
+            list: bit numbers of the free fields
+        """
+        return list(self.free_cells)
+
+    def get_random_free_cell(self) -> int:
+        """ returns the bit number of the free field chosen uniformly at random, O(1)
+
+        Returns:
+            int: bit number of the free field (-1 if the board is full)
+        """
+        return choice(self.free_cells) if self.free_cells else -1
+
+    def toggle_zobrist_keys(self, name: str, cell: int):
+        """ adds the player's field to the Zobrist keys or removes it from them (XOR of the field's numbers, see Bitboard.get_zobrist_numbers)
+
+        Args:
+            name (str): player name (X, O)
+            cell (int): bit number of the field
+        """
+        self.zobrist_keys ^= Bitboard.get_zobrist_numbers(name, self.size)[cell]
+
+    def get_zobrist_key(self) -> int:
+        """ returns the 64-bit Zobrist key of the position, kept up to date with every move (O(1))
+
+        Returns:
+            int: Zobrist key
+        """
+        return self.zobrist_keys & Bitboard.ZOBRIST_KEY_MASK
+
+    def get_canonical_zobrist_key(self) -> int:
+        """ returns the 64-bit Zobrist key which is the same for all 8 rotations and reflections of the position (the lowest of their keys)
+
+        Returns:
+            int: canonical Zobrist key
+        """
+        keys = self.zobrist_keys
+        return min(keys >> (64 * symmetry) & Bitboard.ZOBRIST_KEY_MASK for symmetry in range(8))
+
+    def get_bitboard(self, name: str) -> int:
+        """ returns the bits of the fields occupied by the player
+
+        Args:
+            name (str): player name (X, O)
+
+        Returns:
+            int: player's bitboard
+        """
+        return self.bitboards.get(name, 0)
+
+    def get_occupied(self) -> int:
+        """ returns the bits of all the occupied fields
+
+        Returns:
+            int: bitboard of both players
+        """
+        occupied = 0
+        for bits in self.bitboards.values():
+            occupied |= bits
+        return occupied
+
     @staticmethod
-    def get_coordinates(field_ID: int) -> tuple:
+    def get_coordinates(field_ID: int, size: int = 3) -> tuple:
         """ returns the coordinates of the board's fields, given the field ID (static method)
 
         Args:
             fieldID (int): ID of the board's field
+            size (int): number of rows (and columns) of the board
 
         Returns:
             tuple: (row, col)
         """
-        if field_ID in range(1,10) and type(field_ID) == int:
-            if field_ID == 1:
-                return (0, 0)
-            elif field_ID == 2:
-                return (0, 1)
-            elif field_ID == 3:
-                return (0, 2)
-            elif field_ID == 4:
-                return (1, 0)
-            elif field_ID == 5:
-                return (1, 1)
-            elif field_ID == 6:
-                return (1, 2)   
-            elif field_ID == 7:
-                return (2, 0) 
-            elif field_ID == 8:
-                return (2, 1) 
-            elif field_ID == 9:
-                return (2, 2)
-            else:
-                return (0, 0)
+        if field_ID in range(1, size*size + 1) and type(field_ID) == int:
+            return divmod(field_ID - 1, size)
         else:
-            raise WrongFieldIDError(field_ID)
+            raise WrongFieldIDError(field_ID, size)
 
     @staticmethod
-    def get_field_ID(coords: tuple) -> int:
+    def get_field_ID(coords: tuple, size: int = 3) -> int:
         """ returns the board's field ID based on the given coordinates (static method)
 
         Args:
             coords (tuple): (row, col)
+            size (int): number of rows (and columns) of the board
 
         Returns:
             int: board's field ID
         """
         row = coords[0]
         col = coords[1]
-        if row in range(0,3) and col in range(0,3) and type(row) == int and type(col) == int:
-            if row == 0:
-                if col == 0:
-                    return 1
-                elif col == 1:
-                    return 2
-                else:
-                    return 3
-            elif row == 1:
-                if col == 0:
-                    return 4
-                elif col == 1:
-                    return 5
-                else:
-                    return 6
-            else:
-                if col == 0:
-                    return 7
-                elif col == 1:
-                    return 8
-                else:
-                    return 9
+        if row in range(0, size) and col in range(0, size) and type(row) == int and type(col) == int:
+            return row*size + col + 1
         else:
-            raise WrongCoordinatesError(row, col)
+            raise WrongCoordinatesError(row, col, size)
 
     def replace(self, replacement_board: list):
         """ replaces the current board with another provided board
@@ -129,10 +279,29 @@ class Board:
         Args:
             replacementBoard (list): a new board
         """
-        if len(replacement_board) == 3 and len(replacement_board[0] == 3):
-            self.board = replacement_board
+        if len(replacement_board) == self.size and all(len(row) == self.size for row in replacement_board):
+            self.set_bitboards(self.geometry.from_list(replacement_board))
         else:
-            raise WrongBoardError(replacement_board)
+            raise WrongBoardError(replacement_board, self.size)
+
+    def set_bitboards(self, bitboards: dict):
+        """ replaces the current board with the given bitboards, and rebuilds the free fields and the Zobrist keys from them
+
+        Args:
+            bitboards (dict): player name: bitboard (see Bitboard module)
+        """
+        self.bitboards = dict(bitboards)
+        self.last_move = None
+        self.zobrist_keys = 0
+        geometry = self.geometry
+        self.free_cells = list(geometry.get_free_cells(self.get_occupied()))
+        self.free_cell_indexes = [-1] * geometry.cells
+        for index, cell in enumerate(self.free_cells):
+            self.free_cell_indexes[cell] = index
+        for name, bits in self.bitboards.items():
+            #the free fields of the player's complement are the player's fields
+            for cell in geometry.get_free_cells(geometry.full_mask ^ bits):
+                self.toggle_zobrist_keys(name, cell)
 
     def get_validate_move(self) -> int:
         """ takes the user input (should be one of the board's fields ID's), validates it and returns it
@@ -141,14 +310,15 @@ class Board:
             int: empty and existing field ID
         """
         while True:
-            print ("choose the empty existing field (1-9): ")
-            choice = int(input())
-            if choice not in range(1, 10):
+            print ("choose the empty existing field (1-{}): ".format(self.size * self.size))
+            try:
+                choice = int(input())
+            except ValueError:
+                continue
+            if choice not in range(1, self.size*self.size + 1):
                 continue
-            coords = Board.get_coordinates(choice)
-            row = coords[0]
-            col = coords[1]
-            if self.board[row][col] == " ":
+            row, col = Board.get_coordinates(choice, self.size)
+            if self.is_given_field_empty(row, col):
                 return choice
 
     @staticmethod
@@ -162,10 +332,11 @@ class Board:
         Returns:
             bool: if the AI move is validate
         """
-        coords = Board.get_coordinates(move)
+        size = len(board)
+        coords = Board.get_coordinates(move, size)
         row = coords[0]
         col = coords[1]
-        if board[row][col] == " " and move in range(1, 10):
+        if board[row][col] == " " and move in range(1, size*size + 1):
             return True
         return False
 
@@ -175,14 +346,8 @@ class Board:
         Returns:
             str: one of the game statuses
         """
-        for i in range(3):
-    
-            if self.board[i][0] != ' ' and self.board[i][0] == self.board[i][1] and self.board[i][0] == self.board[i][2]:
-                return self.board[i][0]
-            if self.board[0][i] != ' ' and self.board[0][i] == self.board[1][i] and self.board[0][i] == self.board[2][i]:
-                return self.board[0][i]
-    
-        return "1"
+        winner = Bitboard.get_winner(self.bitboards, self.geometry.rows_and_cols_masks)
+        return "1" if winner is None else winner
 
     def get_game_status_for_diagonals(self) -> str:
         """ returns one of the game statuses (1 for ongoing game, D for draw, player name for player win) based ONLY on the diagonals situation
@@ -190,11 +355,22 @@ class Board:
         Returns:
             str: one of the game statuses
         """
-        if self.board[0][0] != " " and self.board[0][0] == self.board[1][1] and self.board[1][1] == self.board[2][2]:
-            return self.board[0][0]
-        if self.board[0][2] != " " and self.board[0][2] == self.board[1][1] and self.board[0][2] == self.board[2][0]:
-            return self.board[0][2]
-        return "1"    
+        winner = Bitboard.get_winner(self.bitboards, self.geometry.diagonal_masks)
+        return "1" if winner is None else winner
+
+    def get_game_status_for_last_move(self) -> str:
+        """ returns one of the game statuses (1 for ongoing game, player name for player win) based ONLY on the lines going through the last move,
+            which is enough if the board was checked after every move. It costs O(win_length) whatever the board size
+
+        Returns:
+            str: one of the game statuses
+        """
+        if self.last_move is None:
+            return "1"
+        for name, bits in self.bitboards.items():
+            if bits >> self.last_move & 1:
+                return name if self.geometry.is_winning_move(bits, self.last_move) else "1"
+        return "1"
 
     def is_there_free_field(self) -> bool:
         """ returns true if there is at least one free (filled with ' ') field on the board
@@ -202,10 +378,7 @@ class Board:
         Returns:
             bool: if there is any free field
         """
-        for row in self.board:
-            if row.count(" ") > 0:
-                return True
-        return False
+        return len(self.free_cells) > 0
     
     def is_given_field_empty(self, row: int, col: int) -> bool:
         """ returns true if a field of the given coordinates is empty
@@ -217,7 +390,7 @@ class Board:
         Returns:
             bool: if given board's field is empty
         """
-        return self.board[row][col] == " "
+        return self.free_cell_indexes[row * self.size + col] != -1
 
     
         
@@ -0,0 +1,296 @@
+""" the AI as a long-lived process driven by the line-based text protocol over stdin / stdout (in the spirit of UCI), so other programs
+    can ask for the moves without starting Python and filling the caches again for every question. Start it with:
+
+    python Engine.py
+
+Commands (one per line, the answers are written one per line):
+
+    isready                                 readyok
+    newgame [size] [win_length]             ok (the caches are kept, clearcache drops them)
+    position <fields|startpos> [moves <field_ID> ...]
+                                            ok (fields row by row, "." for the empty field, e.g. O...X....)
+    strategy <random|smart|mcts>            ok
+    go [time <seconds>] [nodes <n>]         info ... and bestmove <field_ID> (bestmove none if the game is over), the search runs in the background
+    stop                                    stops the running search, which then answers with its best move so far
+    status                                  status <1|0|name> (1 for ongoing game, 0 for draw, otherwise the winner)
+    stats                                   stats <JSON of the last search counters>
+    clearcache                              ok
+    quit
+
+The commands other than stop, isready and quit wait for the running search to finish. Wrong commands are answered with: error <message>
+"""
+from AI import AI
+from Board import Board
+from Exceptions import WrongCoordinatesError, WrongFieldIDError, WrongBoardError
+from GameMaster import GameMaster
+from TranspositionTable import TranspositionTable
+
+import json
+import sys
+import threading
+
+# the first player always starts
+FIRST_NAME = "O"
+SECOND_NAME = "X"
+
+
+class Engine:
+
+    def __init__(self, output = None):
+        """ initializes a new instance of the Engine class - the state of the protocol session: the position, the strategy and the computer players,
+            which are kept (with their transposition tables shared per board) for the whole session
+
+        Args:
+            output (file): where the answers are written (sys.stdout if not provided)
+        """
+        self.output = sys.stdout if output is None else output
+        self.output_lock = threading.Lock()
+        self.size = 3
+        self.win_length = 3
+        self.board = Board()
+        self.strategy = "smart"
+        # (size, win_length): transposition table shared by all the players of the board
+        self.transposition_tables = {}
+        # (strategy, name, size, win_length): AI
+        self.players = {}
+        self.search_thread = None
+        # event stopping the running search
+        self.stop_event = None
+        self.last_stats = None
+        self.commands = {
+            "isready": self.isready,
+            "newgame": self.newgame,
+            "position": self.position,
+            "strategy": self.set_strategy,
+            "go": self.go,
+            "stop": self.stop,
+            "status": self.status,
+            "stats": self.stats,
+            "clearcache": self.clearcache,
+        }
+
+    def send(self, line: str):
+        """ writes one answer line (from any thread)
+
+        Args:
+            line (str): answer
+        """
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def run(self, lines = None):
+        """ reads and handles the commands until quit or the end of the input
+
+        Args:
+            lines (iterable): command lines (sys.stdin if not provided)
+        """
+        for line in sys.stdin if lines is None else lines:
+            if not self.handle(line):
+                break
+        self.stop()
+        self.wait_for_search()
+
+    def handle(self, line: str) -> bool:
+        """ handles one command line
+
+        Args:
+            line (str): command with its arguments
+
+        Returns:
+            bool: false if the session should end (quit)
+        """
+        words = line.split()
+        if not words:
+            return True
+        command, arguments = words[0], words[1:]
+        if command == "quit":
+            return False
+        if command not in self.commands:
+            self.send("error unknown command: {}".format(command))
+            return True
+        if command not in ["stop", "isready"]:
+            self.wait_for_search()
+        try:
+            self.commands[command](arguments)
+        except (WrongCoordinatesError, WrongFieldIDError, WrongBoardError) as error:
+            self.send("error " + repr(error))
+        except ValueError as error:
+            self.send("error {}".format(error))
+        return True
+
+    def wait_for_search(self):
+        """ waits until the running search (if there is one) answers
+        """
+        if self.search_thread is not None:
+            self.search_thread.join()
+            self.search_thread = None
+
+    def get_player(self, name: str) -> AI:
+        """ returns the computer player of the current strategy and board, created on the first use
+
+        Args:
+            name (str): name of the player
+
+        Returns:
+            AI: player
+        """
+        key = (self.strategy, name, self.size, self.win_length)
+        player = self.players.get(key)
+        if player is None:
+            transposition_table = self.transposition_tables.setdefault((self.size, self.win_length), TranspositionTable())
+            player = self.players[key] = AI(name, AI.STRATEGIES[self.strategy], transposition_table, size = self.size, win_length = self.win_length)
+        return player
+
+    def isready(self, arguments: list):
+        """ answers readyok (at once, even during the search)
+
+        Args:
+            arguments (list): words of the command after its name
+        """
+        self.send("readyok")
+
+    def newgame(self, arguments: list):
+        """ starts the new game on the empty board of the given size and win length (the current ones if not given)
+
+        Args:
+            arguments (list): words of the command after its name
+        """
+        size = int(arguments[0]) if arguments else self.size
+        win_length = int(arguments[1]) if len(arguments) > 1 else min([self.win_length, size])
+        self.board = Board(size, win_length)
+        self.size, self.win_length = size, win_length
+        self.send("ok")
+
+    def position(self, arguments: list):
+        """ sets the position from the fields or the empty board (startpos), then makes the moves given by the field IDs, the players taking turns
+
+        Args:
+            arguments (list): words of the command after its name
+        """
+        if not arguments:
+            raise ValueError("position needs the fields or startpos")
+        # checked before the board is created, as the win length of the current board may not fit the board of the position
+        if arguments[0] != "startpos" and len(arguments[0]) != self.size * self.size:
+            raise ValueError("the position has {} fields, the board {}x{} needs {} (use newgame to change the board)".format(
+                len(arguments[0]), self.size, self.size, self.size * self.size))
+        board = Board(self.size, self.win_length) if arguments[0] == "startpos" else Board.from_string(arguments[0], self.win_length)
+        if len(arguments) > 1:
+            if arguments[1] != "moves":
+                raise ValueError("expected moves, got {}".format(arguments[1]))
+            for field_ID in arguments[2:]:
+                row, col = Board.get_coordinates(int(field_ID), self.size)
+                if not board.is_given_field_empty(row, col):
+                    raise ValueError("the field {} is not empty".format(field_ID))
+                board.update_with_coords(GameMaster.get_player_to_move(board, FIRST_NAME, SECOND_NAME), (row, col))
+        self.board = board
+        self.send("ok")
+
+    def set_strategy(self, arguments: list):
+        """ sets the strategy of the next searches (random, smart or mcts)
+
+        Args:
+            arguments (list): words of the command after its name
+        """
+        if not arguments or arguments[0] not in AI.STRATEGIES:
+            raise ValueError("strategy should be one of: {}".format(", ".join(AI.STRATEGIES)))
+        self.strategy = arguments[0]
+        self.send("ok")
+
+    def go(self, arguments: list):
+        """ starts the search of the move of the player to move in the background thread (see search), with the time and node limits if given
+
+        Args:
+            arguments (list): words of the command after its name
+        """
+        if len(arguments) % 2:
+            raise ValueError("go takes the pairs: time <seconds>, nodes <n>")
+        limits = {"time": None, "nodes": None}
+        for name, value in zip(arguments[::2], arguments[1::2]):
+            if name not in limits:
+                raise ValueError("unknown limit: {}".format(name))
+            limits[name] = float(value) if name == "time" else int(value)
+        if self.get_game_status() != "1":
+            self.send("bestmove none")
+            return
+        name = GameMaster.get_player_to_move(self.board, FIRST_NAME, SECOND_NAME)
+        player = self.get_player(name)
+        time_limit = limits["time"]
+        if time_limit is None and limits["nodes"] is None and (self.size, self.win_length) != (3, 3):
+            time_limit = AI.DEFAULT_TIME_LIMIT
+        player.set_limits(time_limit, limits["nodes"])
+        self.stop_event = threading.Event()
+        opponent_name = SECOND_NAME if name == FIRST_NAME else FIRST_NAME
+        self.search_thread = threading.Thread(target = self.search, args = (player, self.board.copy(), opponent_name, self.stop_event), daemon = True)
+        self.search_thread.start()
+
+    def search(self, player: AI, board: Board, opponent_name: str, stop_event: threading.Event):
+        """ searches the move (run in the background thread) and answers with the info and bestmove lines
+
+        Args:
+            player (AI): player to move
+            board (Board): copy of the position
+            opponent_name (str): name of the other player
+            stop_event (threading.Event): event stopping the search
+        """
+        move = player.get_player_move_on_board(board, opponent_name, stop_event)
+        self.last_stats = player.get_search_stats()
+        stats = self.last_stats
+        self.send("info source {} nodes {} cutoffs {} cachehits {} cachemisses {} depth {} time {:.1f}".format(
+            stats.source, stats.nodes, stats.cutoffs, stats.cache_hits, stats.cache_misses, stats.max_depth, stats.seconds * 1000))
+        self.send("bestmove {}".format(Board.get_field_ID(move, board.size)))
+
+    def stop(self, arguments: list = None):
+        """ asks the running search to stop (it answers with its best move so far)
+
+        Args:
+            arguments (list): words of the command after its name
+        """
+        if self.search_thread is not None:
+            self.stop_event.set()
+
+    def get_game_status(self) -> str:
+        """ returns the status of the current position
+
+        Returns:
+            str: '1' for ongoing game, '0' for draw, otherwise the winner's name
+        """
+        gm = GameMaster(self.size, self.win_length)
+        gm.evaluate_the_board(self.board)
+        return gm.get_the_game_status()
+
+    def status(self, arguments: list):
+        """ answers with the status of the current position
+
+        Args:
+            arguments (list): words of the command after its name
+        """
+        self.send("status {}".format(self.get_game_status()))
+
+    def stats(self, arguments: list):
+        """ answers with the counters of the last search as JSON (null if there was no search yet)
+
+        Args:
+            arguments (list): words of the command after its name
+        """
+        self.send("stats {}".format(json.dumps(None if self.last_stats is None else self.last_stats.to_dict())))
+
+    def clearcache(self, arguments: list):
+        """ drops the players with their transposition tables and MCTS trees
+
+        Args:
+            arguments (list): words of the command after its name
+        """
+        for player in self.players.values():
+            player.close()
+        self.players = {}
+        self.transposition_tables = {}
+        self.send("ok")
+
+
+def main():
+    Engine().run()
+
+
+if __name__ == "__main__":
+    main()
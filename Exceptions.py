@@ -1,19 +1,38 @@
+
 class WrongCoordinatesError(Exception):
-    def __init__(self, row, col):
+    def __init__(self, row, col, size = 3):
         self.row = row
         self.col = col
+        self.size = size
     def __repr__(self):
-        return "Coords should be pairs of the integers from 0 to 2, meanwhile provided coords: {} {}".format(self.row, self.col)
-    
+        return "Coords should be pairs of the integers from 0 to {}, meanwhile provided coords: {} {}".format(self.size - 1, self.row, self.col)
+
 class WrongFieldIDError(Exception):
-     def __init__(self, field_ID):
+     def __init__(self, field_ID, size = 3):
         self.field_ID = field_ID
+        self.size = size
      def __repr__(self):
-        return "Field ID should be an integer between 1 and 9, meanwhile provided Field ID: {}".format(self.field_ID)   
+        return "Field ID should be an integer between 1 and {}, meanwhile provided Field ID: {}".format(self.size * self.size, self.field_ID)
 
 
 class WrongBoardError(Exception):
-    def __init__(self, board):
+    def __init__(self, board, size = 3):
         self.board = board
+        self.size = size
+    def __repr__(self):
+        return "The board should be 2D list {}x{}. Provided board: {}".format(self.size, self.size, self.board)
+
+
+class SearchLimitError(Exception):
+    def __init__(self, nodes):
+        self.nodes = nodes
+    def __repr__(self):
+        return "The search ran out of its time or node budget after {} nodes".format(self.nodes)
+
+
+class TruncatedRecordError(Exception):
+    def __init__(self, path, offset):
+        self.path = path
+        self.offset = offset
     def __repr__(self):
-        return "The board should be 2D list 3x3. Provided board: {}".format(self.board)
\ No newline at end of file
+        return "The game records file {} ends in the middle of the record starting at the byte {}".format(self.path, self.offset)
@@ -1,7 +1,34 @@
 from Board import Board
 
 class GameMaster:
-    game_status = '1'
+    __slots__ = ("size", "win_length", "game_status")
+
+    def __init__(self, size: int = 3, win_length: int = 3):
+        """ initializes a new instance of the GameMaster class for the boards of the given size and win length
+
+        Args:
+            size (int): number of rows (and columns) of the board
+            win_length (int): number of fields in a line needed to win
+        """
+        self.size = size
+        self.win_length = win_length
+        self.game_status = '1'
+
+    @staticmethod
+    def get_player_to_move(board: Board, first_name: str = "O", second_name: str = "X") -> str:
+        """ returns the name of the player to move (the first player starts, so it is their turn if both have the same number of fields)
+
+        Args:
+            board (Board): board
+            first_name (str): name of the player who started
+            second_name (str): name of the other player
+
+        Returns:
+            str: name of the player to move
+        """
+        if board.get_bitboard(first_name).bit_count() == board.get_bitboard(second_name).bit_count():
+            return first_name
+        return second_name
 
     def get_the_game_status(self) -> str:
         """ returns the game status (1 for ongoing game, 0 for draw, player name for each player victory)
@@ -15,10 +42,18 @@ class GameMaster:
         """ evaluate game status to one of the four statuses (1 for ongoing game, 0 for draw, player name for each player victory) using Board class methods to check for game status
 
         Args:
-            board (list): board represented as the 2D 9 grid list
+            board (list): board represented as the 2D list
         """
-        board = Board()
+        board = Board(self.size, self.win_length)
         board.replace(board_list)
+        self.evaluate_the_board(board)
+
+    def evaluate_the_board(self, board: Board):
+        """ evaluate game status of the Board instance, working directly on its bitboards (no list conversion)
+
+        Args:
+            board (Board): board to be evaluated
+        """
         game_status = board.get_game_status_for_diagonals()
         if game_status == '1':
             game_status = board.get_game_status_for_rows_and_cols()
@@ -27,4 +62,30 @@ class GameMaster:
                 game_status = '1'
             else:
                 game_status = '0'
-        self.game_status = game_status
\ No newline at end of file
+        self.game_status = game_status
+
+    def evaluate_the_last_move(self, board: Board):
+        """ evaluate game status of the Board instance checking only the lines through its last move (the board has to be evaluated after every move).
+            The cost does not grow with the board size
+
+        Args:
+            board (Board): board to be evaluated
+        """
+        game_status = board.get_game_status_for_last_move()
+        if game_status == '1' and not board.is_there_free_field():
+            game_status = '0'
+        self.game_status = game_status
+
+    def evaluate_the_game_statuses(self, positions):
+        """ evaluate game statuses of many positions at once with NumPy (see BatchEvaluation module), without any loop over the boards
+
+        Args:
+            positions (numpy.ndarray): (n, 2) bitboards of the first and the second player or (n, size * size) fields (0 empty, 1 first player, 2 second player)
+
+        Returns:
+            numpy.ndarray: (n,) statuses (BatchEvaluation.DRAW, ONGOING, FIRST_PLAYER_WINS or SECOND_PLAYER_WINS)
+        """
+        import BatchEvaluation
+        if len(positions.shape) == 2 and positions.shape[1] == 2:
+            return BatchEvaluation.evaluate_bitboards(positions, self.size, self.win_length)
+        return BatchEvaluation.evaluate_cells(positions, self.size, self.win_length)
\ No newline at end of file
@@ -0,0 +1,183 @@
+""" compact binary format of the finished games. The file starts with the header (MAGIC, VERSION), then the records follow one after another:
+
+    byte 0      kinds of the players: first player (low 4 bits), second player (high 4 bits), indexes of PLAYER_KINDS
+    byte 1      result: DRAW, FIRST_PLAYER_WINS, SECOND_PLAYER_WINS or UNFINISHED
+    byte 2      board: size (low 4 bits), win length (high 4 bits)
+    byte 3      number of the moves
+    moves       field IDs (Board.get_field_ID), two 4-bit IDs per byte (the first move in the low bits) on the boards with up to 15 fields,
+                one byte per ID on the bigger ones
+
+so a 3x3 game takes at most 9 bytes. The writer appends every record with one write, the reader is a generator going through the
+memory-mapped file, so archives of millions of games are never loaded into memory.
+"""
+from Board import Board
+from Exceptions import TruncatedRecordError
+
+import mmap
+import os
+import struct
+
+MAGIC = b"TTTGAMES"
+VERSION = 1
+FILE_HEADER = struct.Struct("<8sH")
+RECORD_HEADER = struct.Struct("<BBBB")
+DEFAULT_PATH = "game_records.bin"
+
+# kinds of the players, their index is stored in the record (the players of the other kinds, e.g. the engines registered in the Simulator, are saved as "other")
+PLAYER_KINDS = ["human", "random", "smart", "mcts", "other"]
+# game modes of the game window: kinds of the first and the second player
+GAME_MODE_KINDS = {
+    "Player vs Player": ("human", "human"),
+    "Player vs Random Computer": ("human", "random"),
+    "Player vs Smart Computer": ("human", "smart"),
+    "Player vs MCTS Computer": ("human", "mcts"),
+}
+# results
+DRAW = 0
+FIRST_PLAYER_WINS = 1
+SECOND_PLAYER_WINS = 2
+UNFINISHED = 3
+# the biggest board which moves fit into 4 bits (field IDs 1 - 15, 0 is the padding)
+MAX_CELLS_FOR_NIBBLES = 15
+# both 4-bit IDs of every byte, so the reader does not split the bytes one by one
+BYTE_NIBBLES = [(byte & 15, byte >> 4) for byte in range(256)]
+
+
+class GameRecord:
+    __slots__ = ("first_player", "second_player", "result", "size", "win_length", "moves")
+
+    def __init__(self, first_player: str, second_player: str, result: int, size: int, win_length: int, moves: list):
+        """ initializes a new instance of the GameRecord class - one saved game
+
+        Args:
+            first_player (str): kind of the player who started (one of PLAYER_KINDS)
+            second_player (str): kind of the other player
+            result (int): DRAW, FIRST_PLAYER_WINS, SECOND_PLAYER_WINS or UNFINISHED
+            size (int): number of rows (and columns) of the board (at most 15)
+            win_length (int): number of fields in a line needed to win (at most 15)
+            moves (list): field IDs of the moves, the players taking turns
+        """
+        self.first_player = first_player
+        self.second_player = second_player
+        self.result = result
+        self.size = size
+        self.win_length = win_length
+        self.moves = moves
+
+    def __repr__(self):
+        return "GameRecord({} vs {}, {}x{} ({} in a row), result {}, moves {})".format(
+            self.first_player, self.second_player, self.size, self.size, self.win_length, self.result, self.moves)
+
+    def to_board(self, first_name: str = "O", second_name: str = "X", moves: int = None) -> Board:
+        """ replays the game on the new board
+
+        Args:
+            first_name (str): name of the player who started
+            second_name (str): name of the other player
+            moves (int): number of the moves to be replayed (all of them if not provided)
+
+        Returns:
+            Board: board after the moves
+        """
+        board = Board(self.size, self.win_length)
+        for i, field_ID in enumerate(self.moves[:moves]):
+            board.update_with_field_ID(second_name if i % 2 else first_name, field_ID)
+        return board
+
+    def encode(self) -> bytes:
+        """ returns the record in the binary format (see the module description)
+
+        Returns:
+            bytes: record
+        """
+        if not (1 <= self.size <= 15 and 1 <= self.win_length <= 15) or len(self.moves) > 255:
+            raise ValueError("the records hold the boards up to 15x15, with up to 255 moves")
+        first_player, second_player = [PLAYER_KINDS.index(kind if kind in PLAYER_KINDS else "other") for kind in [self.first_player, self.second_player]]
+        header = RECORD_HEADER.pack(first_player | second_player << 4, self.result, self.size | self.win_length << 4, len(self.moves))
+        if self.size * self.size > MAX_CELLS_FOR_NIBBLES:
+            return header + bytes(self.moves)
+        moves = list(self.moves) + [0] * (len(self.moves) % 2)
+        return header + bytes(low | high << 4 for low, high in zip(moves[::2], moves[1::2]))
+
+
+def get_result(game_status: str, first_name: str, second_name: str) -> int:
+    """ converts the status of the GameMaster into the result of the record
+
+    Args:
+        game_status (str): '1' for ongoing game, '0' for draw, otherwise the winner's name
+        first_name (str): name of the player who started
+        second_name (str): name of the other player
+
+    Returns:
+        int: DRAW, FIRST_PLAYER_WINS, SECOND_PLAYER_WINS or UNFINISHED
+    """
+    return {"0": DRAW, "1": UNFINISHED, first_name: FIRST_PLAYER_WINS, second_name: SECOND_PLAYER_WINS}[game_status]
+
+
+class GameRecordWriter:
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        """ initializes a new instance of the GameRecordWriter class - opens the file for appending the records (the file header is written if the file is new).
+            Every record is appended with one write, so many processes can append to the same file
+
+        Args:
+            path (str): path of the file
+        """
+        self.path = path
+        self.file = open(path, "ab", buffering = 0)
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def write(self, record: GameRecord):
+        """ appends the record
+
+        Args:
+            record (GameRecord): game
+        """
+        self.file.write(record.encode())
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_game_records(path: str = DEFAULT_PATH):
+    """ yields the records of the file one by one, going through the memory-mapped file. If the file ends in the middle of a record
+        (e.g. cut off or still being written), the records before it are yielded and then TruncatedRecordError with its offset is raised
+
+    Args:
+        path (str): path of the file
+
+    Yields:
+        GameRecord: game
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size <= FILE_HEADER.size:
+            return
+        with mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as data:
+            magic, version = FILE_HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("{} is not the game records file of the version {}".format(path, VERSION))
+            offset, end = FILE_HEADER.size, len(data)
+            while offset < end:
+                # the record being written by another process (or cut off) is not read past the end of the file
+                if offset + RECORD_HEADER.size > end:
+                    raise TruncatedRecordError(path, offset)
+                players, result, board, count = RECORD_HEADER.unpack_from(data, offset)
+                size, win_length = board & 15, board >> 4
+                length = count if size * size > MAX_CELLS_FOR_NIBBLES else (count + 1) // 2
+                if offset + RECORD_HEADER.size + length > end:
+                    raise TruncatedRecordError(path, offset)
+                offset += RECORD_HEADER.size
+                if size * size > MAX_CELLS_FOR_NIBBLES:
+                    moves = list(data[offset:offset + length])
+                else:
+                    moves = [field_ID for byte in data[offset:offset + length] for field_ID in BYTE_NIBBLES[byte]]
+                    del moves[count:]
+                offset += length
+                yield GameRecord(PLAYER_KINDS[players & 15], PLAYER_KINDS[players >> 4], result, size, win_length, moves)
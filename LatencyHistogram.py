@@ -0,0 +1,83 @@
+import math
+
+
+class LatencyHistogram:
+    # the smallest value told apart from zero (in seconds), and the number of buckets between a value and its double
+    MIN_VALUE = 1e-7
+    BUCKETS_PER_DOUBLING = 8
+
+    def __init__(self):
+        """ initializes a new instance of the LatencyHistogram class - the constant memory histogram of the durations with the logarithmic buckets,
+            so millions of them can be counted and the percentiles are still accurate within a few percent
+        """
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max_value = 0.0
+
+    def add(self, seconds: float):
+        """ counts one duration
+
+        Args:
+            seconds (float): duration
+        """
+        bucket = 0 if seconds <= LatencyHistogram.MIN_VALUE else 1 + int(math.log2(seconds / LatencyHistogram.MIN_VALUE) * LatencyHistogram.BUCKETS_PER_DOUBLING)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max_value = max([self.max_value, seconds])
+
+    def merge(self, other):
+        """ adds all the durations counted by the other histogram (e.g. from another process)
+
+        Args:
+            other (LatencyHistogram): histogram to be added
+        """
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max_value = max([self.max_value, other.max_value])
+
+    def get_mean(self) -> float:
+        """ returns the mean duration (0 if nothing was counted)
+
+        Returns:
+            float: mean in seconds
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def get_percentile(self, percent: float) -> float:
+        """ returns the duration below which the given percent of the counted durations are (the upper bound of the bucket)
+
+        Args:
+            percent (float): percent (0 - 100)
+
+        Returns:
+            float: duration in seconds (0 if nothing was counted)
+        """
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= max([rank, 1]):
+                upper_bound = LatencyHistogram.MIN_VALUE * 2 ** (bucket / LatencyHistogram.BUCKETS_PER_DOUBLING)
+                return min([upper_bound, self.max_value])
+        return self.max_value
+
+    def to_dict(self) -> dict:
+        """ returns the summary of the histogram, ready to be saved as JSON
+
+        Returns:
+            dict: count, mean, p50, p90, p99 and max (in seconds)
+        """
+        return {
+            "count": self.count,
+            "mean": self.get_mean(),
+            "p50": self.get_percentile(50),
+            "p90": self.get_percentile(90),
+            "p99": self.get_percentile(99),
+            "max": self.max_value,
+        }
@@ -0,0 +1,224 @@
+import Bitboard
+
+from random import shuffle
+import math
+import time
+
+
+class MCTSNode:
+    __slots__ = ("ai_bits", "opponent_bits", "is_ai_turn", "cell", "parent", "children", "untried_cells", "visits", "score", "result")
+
+    def __init__(self, ai_bits: int, opponent_bits: int, is_ai_turn: bool, cell: int, parent, result: float, free_cells: list):
+        """ initializes a new instance of the MCTSNode class - one position in the search tree
+
+        Args:
+            ai_bits (int): bitboard of the AI
+            opponent_bits (int): bitboard of the opponent
+            is_ai_turn (bool): if the AI is to move in this position
+            cell (int): bit number of the move which led to this position (-1 for the root)
+            parent (MCTSNode): position before the move (None for the root)
+            result (float): result of the finished game for the player who made the move (1 win, 0.5 draw), None if the game goes on
+            free_cells (list): bit numbers of the free fields
+        """
+        self.ai_bits = ai_bits
+        self.opponent_bits = opponent_bits
+        self.is_ai_turn = is_ai_turn
+        self.cell = cell
+        self.parent = parent
+        self.children = {}
+        self.untried_cells = [] if result is not None else free_cells
+        shuffle(self.untried_cells)
+        self.visits = 0
+        # sum of the playout results for the player who made the move
+        self.score = 0.0
+        self.result = result
+
+
+class MCTS:
+    # the playouts per move used when there is neither the playout nor the time limit
+    DEFAULT_PLAYOUTS = 5000
+    # exploration constant of the UCT formula
+    EXPLORATION = math.sqrt(2)
+    # how many playouts are made between two checks of the clock
+    TIME_CHECK_INTERVAL = 16
+
+    def __init__(self, size: int = 3, win_length: int = 3, playouts: int = None, time_limit: float = None):
+        """ initializes a new instance of the MCTS class - Monte Carlo Tree Search with the UCT selection. Its cost is set by the number of
+            the playouts or the time per move, not by the board size, and the tree of the chosen move is kept for the next turn
+
+        Args:
+            size (int): number of rows (and columns) of the board
+            win_length (int): number of fields in a line needed to win
+            playouts (int): playouts per move (DEFAULT_PLAYOUTS if there is no time limit either)
+            time_limit (float): seconds per move
+        """
+        self.geometry = Bitboard.get_geometry(size, win_length)
+        self.playouts = MCTS.DEFAULT_PLAYOUTS if playouts is None and time_limit is None else playouts
+        self.time_limit = time_limit
+        self.root = None
+        # playouts and the deepest tree node (in moves from the root) of the last move search
+        self.last_playouts = 0
+        self.last_max_depth = 0
+
+    def create_node(self, ai_bits: int, opponent_bits: int, is_ai_turn: bool, cell: int, parent: MCTSNode) -> MCTSNode:
+        """ returns the new node of the position, checking if the move ended the game
+
+        Args:
+            ai_bits (int): bitboard of the AI
+            opponent_bits (int): bitboard of the opponent
+            is_ai_turn (bool): if the AI is to move in this position
+            cell (int): bit number of the move which led to this position (-1 for the root)
+            parent (MCTSNode): position before the move
+
+        Returns:
+            MCTSNode: new node
+        """
+        result = None
+        occupied = ai_bits | opponent_bits
+        if cell != -1 and self.geometry.is_winning_move(opponent_bits if is_ai_turn else ai_bits, cell):
+            result = 1.0
+        elif self.geometry.is_full(occupied):
+            result = 0.5
+        free_cells = list(self.geometry.get_free_cells(occupied))
+        return MCTSNode(ai_bits, opponent_bits, is_ai_turn, cell, parent, result, free_cells)
+
+    def find_root(self, ai_bits: int, opponent_bits: int) -> MCTSNode:
+        """ returns the node of the position from the tree of the previous turn (the position itself, or up to two moves below it), or a new one
+
+        Args:
+            ai_bits (int): bitboard of the AI
+            opponent_bits (int): bitboard of the opponent
+
+        Returns:
+            MCTSNode: root of the search
+        """
+        nodes = [] if self.root is None else [self.root]
+        for _ in range(3):
+            for node in nodes:
+                if node.ai_bits == ai_bits and node.opponent_bits == opponent_bits and node.is_ai_turn:
+                    node.parent = None
+                    return node
+            nodes = [child for node in nodes for child in node.children.values()]
+        return self.create_node(ai_bits, opponent_bits, True, -1, None)
+
+    def get_best_move(self, ai_bits: int, opponent_bits: int, stop_event = None) -> int:
+        """ returns the move of the AI: the winning move or the block of the opponent's winning move if there is one,
+            otherwise the most visited move of the search
+
+        Args:
+            ai_bits (int): bitboard of the AI
+            opponent_bits (int): bitboard of the opponent
+            stop_event (threading.Event): when set, the search stops and the best move found so far is played
+
+        Returns:
+            int: bit number of the move (-1 if there is no free field)
+        """
+        self.last_playouts, self.last_max_depth = 0, 0
+        root = self.find_root(ai_bits, opponent_bits)
+        if root.result is not None or not (root.untried_cells or root.children):
+            self.root = None
+            return -1
+
+        cell = self.get_forced_move(ai_bits, opponent_bits)
+        if cell == -1:
+            self.search(root, stop_event)
+            cell = max(root.children.values(), key = lambda child: child.visits).cell
+        self.root = root.children.get(cell)
+        return cell
+
+    def get_forced_move(self, ai_bits: int, opponent_bits: int) -> int:
+        """ returns the move winning right away, or blocking the opponent's win in one move
+
+        Args:
+            ai_bits (int): bitboard of the AI
+            opponent_bits (int): bitboard of the opponent
+
+        Returns:
+            int: bit number of the move (-1 if there is no such move)
+        """
+        free_cells = self.geometry.get_free_cells(ai_bits | opponent_bits)
+        for bits in [ai_bits, opponent_bits]:
+            for cell in free_cells:
+                if self.geometry.is_winning_move(bits | 1 << cell, cell):
+                    return cell
+        return -1
+
+    def search(self, root: MCTSNode, stop_event = None):
+        """ runs the selection, expansion, playout and backpropagation until the playout or the time limit is reached, or the search is stopped
+
+        Args:
+            root (MCTSNode): root of the search
+            stop_event (threading.Event): event stopping the search
+        """
+        deadline = None if self.time_limit is None else time.monotonic() + self.time_limit
+        playouts = 0
+        while True:
+            if self.playouts is not None and playouts >= self.playouts:
+                break
+            if playouts % MCTS.TIME_CHECK_INTERVAL == 0 and playouts and (
+                    stop_event is not None and stop_event.is_set() or deadline is not None and time.monotonic() >= deadline):
+                break
+            playouts += 1
+
+            # selection
+            node = root
+            depth = 0
+            while node.result is None and not node.untried_cells:
+                node = self.select_child(node)
+                depth += 1
+            # expansion
+            if node.result is None:
+                cell = node.untried_cells.pop()
+                bit = 1 << cell
+                if node.is_ai_turn:
+                    child = self.create_node(node.ai_bits | bit, node.opponent_bits, False, cell, node)
+                else:
+                    child = self.create_node(node.ai_bits, node.opponent_bits | bit, True, cell, node)
+                node.children[cell] = child
+                node = child
+                depth += 1
+            self.last_max_depth = max([self.last_max_depth, depth])
+            # playout
+            result = node.result if node.result is not None else self.playout(node)
+            # backpropagation
+            while node is not None:
+                node.visits += 1
+                node.score += result
+                result = 1.0 - result
+                node = node.parent
+        self.last_playouts = playouts
+
+    def select_child(self, node: MCTSNode) -> MCTSNode:
+        """ returns the child with the highest UCT value (average result plus the exploration bonus for the rarely visited ones)
+
+        Args:
+            node (MCTSNode): fully expanded node
+
+        Returns:
+            MCTSNode: selected child
+        """
+        log_visits = math.log(node.visits)
+        exploration = MCTS.EXPLORATION
+        return max(node.children.values(), key = lambda child: child.score / child.visits + exploration * math.sqrt(log_visits / child.visits))
+
+    def playout(self, node: MCTSNode) -> float:
+        """ plays random moves from the position until the game ends
+
+        Args:
+            node (MCTSNode): position in which the game goes on
+
+        Returns:
+            float: result for the player who made the move leading to the node (1 win, 0.5 draw, 0 loss)
+        """
+        is_winning_move = self.geometry.is_winning_move
+        free_cells = list(self.geometry.get_free_cells(node.ai_bits | node.opponent_bits))
+        shuffle(free_cells)
+        # bits[0] belong to the player to move in the node
+        bits = [node.ai_bits, node.opponent_bits] if node.is_ai_turn else [node.opponent_bits, node.ai_bits]
+        turn = 0
+        for cell in free_cells:
+            bits[turn] |= 1 << cell
+            if is_winning_move(bits[turn], cell):
+                return 0.0 if turn == 0 else 1.0
+            turn = 1 - turn
+        return 0.5
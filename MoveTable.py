@@ -0,0 +1,112 @@
+import mmap
+import os
+import struct
+import zlib
+
+MAGIC = b"TTTMOVES"
+VERSION = 1
+# magic, version, number of the board's fields, crc32 of the entries
+HEADER = struct.Struct("<8sHHI")
+# the table covers only the classic 3x3 board
+CELLS = 9
+ENTRIES = 3 ** CELLS
+NO_ENTRY = 0xFF
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "move_table.bin")
+
+# TERNARY[bits] is the sum of 3^cell for all the cells set in bits, so a position index is TERNARY[ai] + 2 * TERNARY[opponent]
+TERNARY = tuple(sum(3 ** cell for cell in range(CELLS) if bits >> cell & 1) for bits in range(1 << CELLS))
+
+
+def get_position_index(ai_bits: int, opponent_bits: int) -> int:
+    """ returns the index of the position in the move table (base 3 number: 0 for empty field, 1 for AI, 2 for opponent)
+
+    Args:
+        ai_bits (int): bitboard of the player to move
+        opponent_bits (int): bitboard of the other player
+
+    Returns:
+        int: position index (0 - 3^9-1)
+    """
+    return TERNARY[ai_bits] + 2 * TERNARY[opponent_bits]
+
+
+def encode_entry(cell: int, score: int) -> int:
+    """ packs the best move and its score into one byte (score + 1 in the high nibble, cell in the low nibble)
+
+    Args:
+        cell (int): bit number of the best move
+        score (int): minimax score of the best move (-1, 0, 1)
+
+    Returns:
+        int: one byte entry
+    """
+    return (score + 1) << 4 | cell
+
+
+def write_table(path: str, entries: bytes):
+    """ writes the entries with the header to the file
+
+    Args:
+        path (str): path of the file
+        entries (bytes): one byte per position index
+    """
+    if len(entries) != ENTRIES:
+        raise ValueError("move table should have {} entries, got {}".format(ENTRIES, len(entries)))
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, CELLS, zlib.crc32(entries)))
+        file.write(entries)
+
+
+class MoveTable:
+
+    def __init__(self, path: str):
+        """ initializes a new instance of the MoveTable class - the read-only, memory-mapped table of the precomputed best moves
+            (written by generate_move_table.py). Raises ValueError if the file is corrupted.
+
+        Args:
+            path (str): path of the table file
+        """
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+        if len(self.data) != HEADER.size + ENTRIES:
+            self.data.close()
+            raise ValueError("wrong size of the move table file: {}".format(path))
+        magic, version, cells, crc = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION or cells != CELLS or zlib.crc32(self.data[HEADER.size:]) != crc:
+            self.data.close()
+            raise ValueError("corrupted move table file: {}".format(path))
+
+    def get_best_move(self, ai_bits: int, opponent_bits: int):
+        """ returns the precomputed best move of the player to move
+
+        Args:
+            ai_bits (int): bitboard of the player to move
+            opponent_bits (int): bitboard of the other player
+
+        Returns:
+            tuple or None: (cell, score) or None if the position is not in the table
+        """
+        entry = self.data[HEADER.size + get_position_index(ai_bits, opponent_bits)]
+        if entry == NO_ENTRY:
+            return None
+        return entry & 0x0F, (entry >> 4) - 1
+
+
+_default_table = None
+_is_default_table_loaded = False
+
+
+def get_default_table():
+    """ returns the move table shipped with the game, loaded once per process
+
+    Returns:
+        MoveTable or None: the table or None if the file is missing or corrupted
+    """
+    global _default_table, _is_default_table_loaded
+    if not _is_default_table_loaded:
+        _is_default_table_loaded = True
+        try:
+            _default_table = MoveTable(DEFAULT_PATH)
+        except (OSError, ValueError):
+            _default_table = None
+    return _default_table
@@ -0,0 +1,237 @@
+from AI import AI
+from Exceptions import SearchLimitError
+from SearchStats import SearchStats
+
+from concurrent.futures import ProcessPoolExecutor, wait
+import math
+import multiprocessing
+import time
+
+# set in every worker process by _init_worker
+_shared_scores = None
+_shared_stop_event = None
+_worker_ais = {}
+
+
+def _init_worker(shared_scores, shared_stop_event):
+    """ initializes the worker process with the array of the root moves scores and the event stopping the search, shared by all the workers
+
+    Args:
+        shared_scores (multiprocessing.Array): scores of the root moves (nan for the moves not searched yet)
+        shared_stop_event (multiprocessing.Event): when set, the depth limited searches of the root moves stop
+    """
+    global _shared_scores, _shared_stop_event
+    _shared_scores = shared_scores
+    _shared_stop_event = shared_stop_event
+
+
+def _get_worker_ai(size: int, win_length: int) -> AI:
+    """ returns the AI of the worker process for the board, created once per process so its transposition table stays warm between the searches
+
+    Args:
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+
+    Returns:
+        AI: AI of the worker
+    """
+    ai = _worker_ais.get((size, win_length))
+    if ai is None:
+        ai = _worker_ais[(size, win_length)] = AI("X", "Player vs Smart Computer", use_move_table = False, size = size, win_length = win_length)
+    return ai
+
+
+def _get_shared_alpha(index: int, is_full_search: bool) -> float:
+    """ returns the alpha for the root move from the scores of the root moves already searched by any of the workers.
+        The full search needs the exact scores of the moves as good as the best one (the depth tie-break), so its alpha is lowered by 0.5
+        (the scores are -1, 0 or 1). The depth limited search keeps the first of the equal moves, so only the moves before the index count
+
+    Args:
+        index (int): index of the root move
+        is_full_search (bool): full minimax search (true) or depth limited search (false)
+
+    Returns:
+        float: alpha
+    """
+    with _shared_scores.get_lock():
+        scores = _shared_scores[:] if is_full_search else _shared_scores[:index]
+    scores = [score for score in scores if not math.isnan(score)]
+    if not scores:
+        return -math.inf
+    return max(scores) - 0.5 if is_full_search else max(scores)
+
+
+def search_root_move(task: tuple) -> tuple:
+    """ searches one root move in the worker process (the move is already made on the given bitboards)
+
+    Args:
+        task (tuple): size, win_length, ai_bits, opponent_bits, index, cell, max_depth (None for the full search), deadline, node_limit
+
+    Returns:
+        tuple: index, score, depth (score and depth are None if the search ran out of its budget), SearchStats of the search
+    """
+    size, win_length, ai_bits, opponent_bits, index, cell, max_depth, deadline, node_limit = task
+    ai = _get_worker_ai(size, win_length)
+    alpha = _get_shared_alpha(index, max_depth is None)
+    context = ai.create_search_context("parallel", _shared_stop_event)
+    if max_depth is None:
+        score, depth = ai.minimax(context, ai_bits, opponent_bits, 0, alpha, math.inf, False, cell)
+    else:
+        context.deadline = deadline
+        context.node_limit = node_limit
+        try:
+            score, depth = ai.limited_minimax(context, ai_bits, opponent_bits, max_depth - 1, alpha, math.inf, False, cell, 1), max_depth
+        except SearchLimitError:
+            score, depth = None, None
+        context.stats.nodes += context.nodes
+    ai.finish_search_stats(context)
+    if score is not None:
+        with _shared_scores.get_lock():
+            _shared_scores[index] = score
+    return index, score, depth, context.stats
+
+
+class ParallelSearch:
+    # how often (in seconds) the event stopping the search is checked while waiting for the workers
+    STOP_CHECK_INTERVAL = 0.05
+
+    def __init__(self, size: int, win_length: int, workers: int, time_limit: float = None, node_limit: int = None):
+        """ initializes a new instance of the ParallelSearch class - the pool of processes searching the root moves of the AI at the same time.
+            The workers share the scores of the searched root moves, so the later ones start with the alpha already raised.
+            The full search returns exactly the same move as AI.get_best_move in one process
+
+        Args:
+            size (int): number of rows (and columns) of the board
+            win_length (int): number of fields in a line needed to win
+            workers (int): number of processes
+            time_limit (float): seconds per move for the iterative deepening search (None with no node limit for the full search)
+            node_limit (int): nodes per move for the iterative deepening search, split evenly between the root moves
+        """
+        self.size = size
+        self.win_length = win_length
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        # the AI of this process is used for the move ordering only
+        self.ai = AI("X", "Player vs Smart Computer", use_move_table = False, size = size, win_length = win_length)
+        self.shared_scores = multiprocessing.Array("d", size * size)
+        # the workers do not see the threading.Event of this process, so it is passed to them through this one
+        self.shared_stop_event = multiprocessing.Event()
+        self.executor = ProcessPoolExecutor(workers, initializer = _init_worker, initargs = (self.shared_scores, self.shared_stop_event))
+        # counters of all the workers searches of the last move
+        self.stats = SearchStats("parallel")
+
+    def close(self):
+        """ stops the worker processes
+        """
+        self.executor.shutdown()
+
+    def search_root_moves(self, ai_bits: int, opponent_bits: int, root_moves: list, max_depth: int = None, deadline: float = None,
+                          stop_event = None) -> list:
+        """ searches all the root moves in the worker processes
+
+        Args:
+            ai_bits (int): bitboard of the AI
+            opponent_bits (int): bitboard of the opponent
+            root_moves (list): bit numbers of the moves in the order of the search
+            max_depth (int): depth of the search (None for the full search)
+            deadline (float): time.monotonic() value at which the search has to stop
+            stop_event (threading.Event): when set, the workers' depth limited searches stop (the full search is not stopped)
+
+        Returns:
+            list: (score, depth) for every root move, score is None if the search ran out of its budget
+        """
+        with self.shared_scores.get_lock():
+            self.shared_scores[:] = [math.nan] * len(self.shared_scores)
+        node_limit = None if self.node_limit is None else max(1, self.node_limit // len(root_moves))
+        tasks = [(self.size, self.win_length, ai_bits | 1 << cell, opponent_bits, index, cell, max_depth, deadline, node_limit)
+                 for index, cell in enumerate(root_moves)]
+        futures = [self.executor.submit(search_root_move, task) for task in tasks]
+        pending = futures
+        while pending and stop_event is not None:
+            pending = wait(pending, timeout = ParallelSearch.STOP_CHECK_INTERVAL).not_done
+            if stop_event.is_set():
+                self.shared_stop_event.set()
+                break
+        results = [None] * len(root_moves)
+        for future in futures:
+            index, score, depth, stats = future.result()
+            results[index] = (score, depth)
+            self.stats.merge(stats)
+        return results
+
+    def get_best_move(self, ai_bits: int, opponent_bits: int, stop_event = None) -> int:
+        """ returns the best move of the AI, with the full search if there are no limits or with the iterative deepening search otherwise
+
+        Args:
+            ai_bits (int): bitboard of the AI
+            opponent_bits (int): bitboard of the opponent
+            stop_event (threading.Event): when set, the iterative deepening search returns the best move found so far
+
+        Returns:
+            int: bit number of the best move (-1 if there is no free field), the counters of the search are kept in stats
+        """
+        self.stats = SearchStats("parallel")
+        self.shared_stop_event.clear()
+        occupied = ai_bits | opponent_bits
+        free_cells = self.ai.geometry.get_free_cells(occupied)
+        if not free_cells:
+            return -1
+        if self.time_limit is None and self.node_limit is None:
+            return self.get_best_move_full(ai_bits, opponent_bits, free_cells)
+        return self.get_best_move_iterative(ai_bits, opponent_bits, free_cells, stop_event)
+
+    def get_best_move_full(self, ai_bits: int, opponent_bits: int, free_cells: list) -> int:
+        """ the parallel version of the full search of AI.get_best_move, with the same depth tie-break
+
+        Args:
+            ai_bits (int): bitboard of the AI
+            opponent_bits (int): bitboard of the opponent
+            free_cells (list): bit numbers of the free fields
+
+        Returns:
+            int: bit number of the best move
+        """
+        best_score = -math.inf
+        best_move = {'cell': -1, 'depth': 0}
+        for cell, (temp_score, temp_depth) in zip(free_cells, self.search_root_moves(ai_bits, opponent_bits, free_cells)):
+            if best_score < temp_score or (best_score == temp_score and best_move['depth'] > temp_depth): # depth optimization
+                best_move.update({'cell': cell, 'depth': temp_depth})
+                best_score = temp_score
+        return best_move['cell']
+
+    def get_best_move_iterative(self, ai_bits: int, opponent_bits: int, free_cells: list, stop_event = None) -> int:
+        """ the parallel version of AI.get_best_move_iterative: every iteration searches all the root moves in the workers
+
+        Args:
+            ai_bits (int): bitboard of the AI
+            opponent_bits (int): bitboard of the opponent
+            free_cells (list): bit numbers of the free fields
+            stop_event (threading.Event): event stopping the search
+
+        Returns:
+            int: bit number of the best move
+        """
+        for cell in free_cells:
+            if self.ai.geometry.is_winning_move(ai_bits | 1 << cell, cell):
+                return cell
+
+        deadline = None if self.time_limit is None else time.monotonic() + self.time_limit
+        root_moves = self.ai.get_root_moves(self.ai.create_search_context("parallel"), free_cells)
+        best_cell = root_moves[0]
+
+        for max_depth in range(1, len(free_cells) + 1):
+            results = self.search_root_moves(ai_bits, opponent_bits, root_moves, max_depth, deadline, stop_event)
+            if any(score is None for score, _ in results):
+                break
+            best_score, iteration_best_cell = -math.inf, root_moves[0]
+            for cell, (temp_score, _) in zip(root_moves, results):
+                if temp_score > best_score:
+                    best_score, iteration_best_cell = temp_score, cell
+            best_cell = iteration_best_cell
+            root_moves.remove(best_cell)
+            root_moves.insert(0, best_cell)
+            # the result of the game is already known, deeper search will not change it
+            if best_score in [-1, 1]:
+                break
+
+        return best_cell
@@ -0,0 +1,192 @@
+""" opt-in profiling of the game window: the latency of every turn (the handling of one window event) and of the wrapped methods of the window and
+    of the AI is counted in the histograms, and the slowest turns and move searches are profiled with cProfile. The report is written at exit.
+    It is enabled by the environment variable (TIC_TAC_TOE_PROFILE=report.txt) or by `python tic_tac_toe.py gui --profile report.txt`.
+
+    The turns of the window and the searches of the computer run in different threads, so each of them is profiled separately; the methods called
+    inside the profiled call (e.g. check_the_game_status inside the turn) are only timed, their time is also in the profile of the turn.
+"""
+from LatencyHistogram import LatencyHistogram
+
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+
+ENVIRONMENT_VARIABLE = "TIC_TAC_TOE_PROFILE"
+
+
+class Profiler:
+    # number of the slowest profiled calls kept per section, and the number of the functions printed for each of them
+    SLOWEST_CALLS = 5
+    REPORT_FUNCTIONS = 25
+
+    def __init__(self, path: str):
+        """ initializes a new instance of the Profiler class
+
+        Args:
+            path (str): file where the report is written
+        """
+        self.path = path
+        # histograms and the slowest profiled calls ((seconds, profile) sorted from the slowest) by the section name
+        self.histograms = {}
+        self.slowest = {}
+        self.lock = threading.Lock()
+        # the profiled call running in the thread (only one cProfile can run in a thread)
+        self.local = threading.local()
+        # the turn of the window being handled: (event kind, start, profile)
+        self.turn = None
+
+    def record(self, section: str, seconds: float, profile: cProfile.Profile = None):
+        """ counts the duration of the call, and keeps its profile if it is among the slowest of the section
+
+        Args:
+            section (str): name of the section
+            seconds (float): duration
+            profile (cProfile.Profile): profile of the call (None if it was not profiled)
+        """
+        with self.lock:
+            self.histograms.setdefault(section, LatencyHistogram()).add(seconds)
+            if profile is None:
+                return
+            slowest = self.slowest.setdefault(section, [])
+            if len(slowest) < Profiler.SLOWEST_CALLS or seconds > slowest[-1][0]:
+                slowest.append((seconds, profile))
+                slowest.sort(key = lambda call: call[0], reverse = True)
+                del slowest[Profiler.SLOWEST_CALLS:]
+
+    def start_profile(self):
+        """ starts profiling the call in this thread, unless a profiled call is already running in it
+
+        Returns:
+            cProfile.Profile or None: started profile
+        """
+        if getattr(self.local, "profile", None) is not None:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # since Python 3.12 only one cProfile can run in the whole process, the call is only timed then
+            return None
+        self.local.profile = profile
+        return profile
+
+    def stop_profile(self, profile: cProfile.Profile):
+        """ stops the profile started by start_profile
+
+        Args:
+            profile (cProfile.Profile): started profile (None is ignored)
+        """
+        if profile is not None:
+            profile.disable()
+            self.local.profile = None
+
+    def wrap(self, owner, name: str, section: str = None, profile: bool = False):
+        """ replaces the method of the object (only this instance) with the one counting its duration
+
+        Args:
+            owner (object): object with the method
+            name (str): name of the method
+            section (str): name of the section (the class and method name if not provided)
+            profile (bool): profile the calls with cProfile and keep the slowest ones
+        """
+        method = getattr(owner, name)
+        section = "{}.{}".format(type(owner).__name__, name) if section is None else section
+        def timed(*args, **kwargs):
+            started_profile = self.start_profile() if profile else None
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                self.stop_profile(started_profile)
+                self.record(section, seconds, started_profile)
+        setattr(owner, name, timed)
+
+    def wrap_turns(self, window):
+        """ replaces the read method of the window (only this instance), so every turn - from the event returned by read to the next read - is timed
+            and profiled. The turns are counted in the "turn" section and in the section of the event kind
+
+        Args:
+            window (sg.Window): window of the game
+        """
+        read = window.read
+        def timed_read(*args, **kwargs):
+            self.finish_turn()
+            event, values = read(*args, **kwargs)
+            kind = event if type(event) == str else "tile" if type(event) == tuple else str(event)
+            self.turn = (kind, time.perf_counter(), self.start_profile())
+            return event, values
+        window.read = timed_read
+
+    def finish_turn(self):
+        """ counts the turn being handled (if there is one), e.g. when the window is closed
+        """
+        if self.turn is None:
+            return
+        kind, start, profile = self.turn
+        seconds = time.perf_counter() - start
+        self.stop_profile(profile)
+        self.turn = None
+        self.record("turn", seconds, profile)
+        self.record("turn: " + kind, seconds)
+
+    def format(self) -> str:
+        """ returns the report: the histogram of every section and the cProfile statistics of the slowest calls
+
+        Returns:
+            str: report
+        """
+        lines = ["{:<55} {:>7} {:>10} {:>10} {:>10} {:>10}".format("section", "count", "mean ms", "p50 ms", "p99 ms", "max ms")]
+        with self.lock:
+            for section in sorted(self.histograms):
+                histogram = self.histograms[section]
+                lines.append("{:<55} {:>7} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.2f}".format(section, histogram.count, histogram.get_mean() * 1000,
+                             histogram.get_percentile(50) * 1000, histogram.get_percentile(99) * 1000, histogram.max_value * 1000))
+            slowest = {section: list(calls) for section, calls in self.slowest.items()}
+        for section in sorted(slowest):
+            for place, (seconds, profile) in enumerate(slowest[section], 1):
+                stream = io.StringIO()
+                pstats.Stats(profile, stream = stream).sort_stats("cumulative").print_stats(Profiler.REPORT_FUNCTIONS)
+                lines += ["", "=== {} - slowest call {}: {:.2f} ms ===".format(section, place, seconds * 1000), stream.getvalue().strip()]
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """ writes the report to the file (called at exit)
+        """
+        self.finish_turn()
+        with open(self.path, "w") as file:
+            file.write(self.format())
+
+
+_profiler = None
+
+
+def enable(path: str) -> Profiler:
+    """ enables the profiling for the whole process: the game windows created later are profiled, and the report is written at exit
+
+    Args:
+        path (str): file where the report is written
+
+    Returns:
+        Profiler: the profiler of the process
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(path)
+        atexit.register(_profiler.write)
+    return _profiler
+
+
+def get_profiler():
+    """ returns the profiler of the process, enabled by enable or by the environment variable
+
+    Returns:
+        Profiler or None: the profiler or None if the profiling is not enabled
+    """
+    if _profiler is None and os.environ.get(ENVIRONMENT_VARIABLE):
+        enable(os.environ[ENVIRONMENT_VARIABLE])
+    return _profiler
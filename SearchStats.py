@@ -0,0 +1,88 @@
+class SearchStats:
+    __slots__ = ("source", "nodes", "cutoffs", "cache_hits", "cache_misses", "max_depth", "seconds")
+
+    def __init__(self, source: str = "minimax"):
+        """ initializes a new instance of the SearchStats class - the counters of one move search of the AI
+
+        Args:
+            source (str): what found the move: "minimax", "iterative", "parallel", "move_table", "tablebase", "mcts", "random"
+                          or "analysis" (AI.analyze)
+        """
+        self.source = source
+        # searched positions (playouts for the MCTS)
+        self.nodes = 0
+        # alpha-beta cutoffs
+        self.cutoffs = 0
+        # transposition table lookups which found / did not find the position
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # the deepest position searched, in moves from the current position
+        self.max_depth = 0
+        # wall time of the search in seconds
+        self.seconds = 0.0
+
+    def merge(self, other):
+        """ adds the counters of the other search (e.g. of one root move searched in another process)
+
+        Args:
+            other (SearchStats): counters to be added
+        """
+        self.nodes += other.nodes
+        self.cutoffs += other.cutoffs
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        self.max_depth = max([self.max_depth, other.max_depth])
+
+    def get_nodes_per_second(self) -> float:
+        """ returns the searched positions per second (0 if the search took no measurable time)
+
+        Returns:
+            float: nodes per second
+        """
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict:
+        """ returns the counters, ready to be logged or saved as JSON
+
+        Returns:
+            dict: source, nodes, cutoffs, cache_hits, cache_misses, max_depth, seconds and nodes_per_second
+        """
+        return {
+            "source": self.source,
+            "nodes": self.nodes,
+            "cutoffs": self.cutoffs,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "max_depth": self.max_depth,
+            "seconds": self.seconds,
+            "nodes_per_second": self.get_nodes_per_second(),
+        }
+
+    def format(self) -> str:
+        """ returns the counters as the short human readable text (for the debug panel)
+
+        Returns:
+            str: counters
+        """
+        return "{}: {} nodes in {:.1f} ms, {} cutoffs, cache {} hits / {} misses, depth {}".format(
+            self.source, self.nodes, self.seconds * 1000, self.cutoffs, self.cache_hits, self.cache_misses, self.max_depth)
+
+
+def create_logging_sink(logger = None, level: int = None):
+    """ returns the stats sink (see AI.add_stats_sink) writing every record to the logger as one JSON line
+    (logging and json are imported here, so the search does not pay for them at the start)
+
+    Args:
+        logger (logging.Logger): logger (the "tic_tac_toe.search" one if not provided)
+        level (int): logging level of the records (logging.INFO if not provided)
+
+    Returns:
+        function: sink(stats) taking the dict of SearchStats.to_dict
+    """
+    import json
+    import logging
+    logger = logging.getLogger("tic_tac_toe.search") if logger is None else logger
+    level = logging.INFO if level is None else level
+    def sink(stats: dict):
+        logger.log(level, json.dumps(stats), extra = {"search_stats": stats})
+    return sink
@@ -0,0 +1,506 @@
+""" asyncio server hosting many games at once over TCP or a Unix socket, and the load generator measuring it. Usage examples:
+
+    python Server.py serve --port 8765 --workers 4
+    python Server.py load --port 8765 --connections 50 --games 2000
+
+Every request is one line and gets one answer line (error <message> for the wrong ones):
+
+    new [size] [win_length] [strategy]      game <ID> (the client plays O and starts, the computer plays X)
+    play <ID> <field_ID>                    bestmove <field_ID|none> <status> - the client's move and the computer's answer
+    move <ID> <field_ID>                    ok <status> - the client's move only
+    go <ID>                                 bestmove <field_ID|none> <status> - the computer's move only
+    status <ID>                             status <status> (1 for ongoing game, 0 for draw, otherwise the winner)
+    end <ID>                                ok
+    stats                                   stats <JSON of the server counters>
+
+The searches run in the pool of processes. Their results (for the strategies without the randomness and the time limit) are kept in one
+position cache shared by all the games, so a position any client has already asked about is answered without the search.
+"""
+from AI import AI
+from Board import Board
+from GameMaster import GameMaster
+from GameRecord import GameRecord, GameRecordWriter, get_result
+from LatencyHistogram import LatencyHistogram
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from random import choice
+import argparse
+import asyncio
+import json
+import os
+import time
+
+CLIENT_NAME = "O"
+COMPUTER_NAME = "X"
+
+# set in every worker process: (strategy, size, win_length): AI, created once per process so its caches stay warm
+_worker_players = {}
+
+
+def search_move(task: tuple) -> tuple:
+    """ searches the computer move in the worker process
+
+    Args:
+        task (tuple): strategy, size, win_length, computer_bits, client_bits, time_limit, node_limit
+
+    Returns:
+        tuple: (row, col)
+    """
+    strategy, size, win_length, computer_bits, client_bits, time_limit, node_limit = task
+    player = _worker_players.get((strategy, size, win_length))
+    if player is None:
+        player = _worker_players[(strategy, size, win_length)] = AI(COMPUTER_NAME, AI.STRATEGIES[strategy], size = size, win_length = win_length)
+    player.set_limits(time_limit, node_limit)
+    board = Board(size, win_length)
+    board.set_bitboards({COMPUTER_NAME: computer_bits, CLIENT_NAME: client_bits})
+    return player.get_player_move_on_board(board, CLIENT_NAME)
+
+
+class PositionCache:
+
+    def __init__(self, max_size: int = 100000):
+        """ initializes a new instance of the PositionCache class - the computer moves of the already searched positions, shared by all the games.
+            When the cache is full, the least recently used position is evicted
+
+        Args:
+            max_size (int): maximal number of the stored positions
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        """ returns the stored move of the position
+
+        Args:
+            key (tuple): strategy, size, win_length, computer_bits, client_bits, time_limit, node_limit
+
+        Returns:
+            tuple or None: (row, col) or None if the position is not stored
+        """
+        move = self.entries.get(key)
+        if move is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return move
+
+    def store(self, key: tuple, move: tuple):
+        """ stores the move of the position, evicting the least recently used one if the cache is full
+
+        Args:
+            key (tuple): see get
+            move (tuple): (row, col)
+        """
+        self.entries[key] = move
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last = False)
+
+
+class Game:
+    __slots__ = ("board", "gm", "strategy", "record_writer", "moves", "lock")
+
+    def __init__(self, size: int, win_length: int, strategy: str, record_writer: GameRecordWriter = None):
+        """ initializes a new instance of the Game class - one game hosted by the server
+
+        Args:
+            size (int): number of rows (and columns) of the board
+            win_length (int): number of fields in a line needed to win
+            strategy (str): strategy of the computer (one of AI.STRATEGIES)
+            record_writer (GameRecordWriter): writer saving the game when it ends (the game is not saved if not provided)
+        """
+        self.board = Board(size, win_length)
+        self.gm = GameMaster(size, win_length)
+        self.strategy = strategy
+        self.record_writer = record_writer
+        # field IDs of the moves
+        self.moves = []
+        # one request of the game at a time
+        self.lock = asyncio.Lock()
+
+    def make_move(self, name: str, move: tuple) -> str:
+        """ makes the move and returns the new game status
+
+        Args:
+            name (str): player name
+            move (tuple): (row, col)
+
+        Returns:
+            str: game status
+        """
+        self.board.update_with_coords(name, move)
+        self.moves.append(Board.get_field_ID(move, self.board.size))
+        self.gm.evaluate_the_last_move(self.board)
+        game_status = self.gm.get_the_game_status()
+        if game_status != "1" and self.record_writer is not None:
+            self.record_writer.write(GameRecord("human", self.strategy, get_result(game_status, CLIENT_NAME, COMPUTER_NAME),
+                                                self.board.size, self.board.win_length, self.moves))
+        return game_status
+
+
+class Server:
+
+    def __init__(self, workers: int = None, use_threads: bool = False, time_limit: float = None, node_limit: int = None, cache_size: int = 100000,
+                 record_path: str = None):
+        """ initializes a new instance of the Server class
+
+        Args:
+            workers (int): number of the processes (or threads) searching the moves (the number of the CPU cores if not provided)
+            use_threads (bool): search in the threads instead of the processes (no pickling, but the searches share one core)
+            time_limit (float): seconds per computer move (AI.DEFAULT_TIME_LIMIT on the boards bigger than 3x3 if there is no limit at all)
+            node_limit (int): nodes (playouts for mcts) per computer move
+            cache_size (int): maximal number of the positions in the shared position cache
+            record_path (str): file where every finished game is appended (see GameRecord module), the games are not saved if not provided
+        """
+        workers = workers or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(workers) if use_threads else ProcessPoolExecutor(workers)
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.position_cache = PositionCache(cache_size)
+        self.record_writer = None if record_path is None else GameRecordWriter(record_path)
+        self.games = {}
+        self.next_game_ID = 1
+        self.counters = {"games_created": 0, "requests": 0, "searches": 0, "errors": 0}
+        self.commands = {"new": self.new, "play": self.play, "move": self.move, "go": self.go, "status": self.status, "end": self.end, "stats": self.stats}
+
+    def close(self):
+        """ stops the worker processes and closes the game records file
+        """
+        self.executor.shutdown()
+        if self.record_writer is not None:
+            self.record_writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, path: str = None):
+        """ accepts the connections until cancelled
+
+        Args:
+            host (str): TCP host
+            port (int): TCP port
+            path (str): path of the Unix socket (used instead of TCP if given)
+        """
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """ answers the requests of one client, one after another
+
+        Args:
+            reader (asyncio.StreamReader): requests
+            writer (asyncio.StreamWriter): answers
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write((await self.handle(line.decode()) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle(self, line: str) -> str:
+        """ answers one request
+
+        Args:
+            line (str): request
+
+        Returns:
+            str: answer
+        """
+        self.counters["requests"] += 1
+        words = line.split()
+        if not words or words[0] not in self.commands:
+            self.counters["errors"] += 1
+            return "error unknown command: {}".format(words[0] if words else "")
+        try:
+            return await self.commands[words[0]](words[1:])
+        except Exception as error:
+            self.counters["errors"] += 1
+            return "error " + (str(error) or repr(error))
+
+    def get_game(self, arguments: list) -> Game:
+        """ returns the game of the ID given as the first argument (raises ValueError if there is no such game)
+
+        Args:
+            arguments (list): words of the request after the command
+
+        Returns:
+            Game: game
+        """
+        if not arguments or not arguments[0].isdigit() or int(arguments[0]) not in self.games:
+            raise ValueError("unknown game: {}".format(arguments[0] if arguments else ""))
+        return self.games[int(arguments[0])]
+
+    async def new(self, arguments: list) -> str:
+        """ creates the new game on the board of the given size and win length (3x3 by default) with the given strategy of the computer (smart by default)
+
+        Args:
+            arguments (list): words of the request after the command
+
+        Returns:
+            str: answer
+        """
+        size = int(arguments[0]) if arguments else 3
+        win_length = int(arguments[1]) if len(arguments) > 1 else min([3, size])
+        strategy = arguments[2] if len(arguments) > 2 else "smart"
+        if strategy not in AI.STRATEGIES:
+            raise ValueError("strategy should be one of: {}".format(", ".join(AI.STRATEGIES)))
+        game_ID = self.next_game_ID
+        self.games[game_ID] = Game(size, win_length, strategy, self.record_writer)
+        self.next_game_ID += 1
+        self.counters["games_created"] += 1
+        return "game {}".format(game_ID)
+
+    def make_client_move(self, game: Game, field_ID: str) -> str:
+        """ validates and makes the client's move
+
+        Args:
+            game (Game): game
+            field_ID (str): ID of the field
+
+        Returns:
+            str: game status
+        """
+        if game.gm.get_the_game_status() != "1":
+            raise ValueError("the game is over")
+        row, col = Board.get_coordinates(int(field_ID), game.board.size)
+        if not game.board.is_given_field_empty(row, col):
+            raise ValueError("the field {} is not empty".format(field_ID))
+        if GameMaster.get_player_to_move(game.board, CLIENT_NAME, COMPUTER_NAME) != CLIENT_NAME:
+            raise ValueError("it is the computer's turn")
+        return game.make_move(CLIENT_NAME, (row, col))
+
+    async def make_computer_move(self, game: Game) -> str:
+        """ makes the computer's move, answered from the shared position cache or searched in the executor
+
+        Args:
+            game (Game): game
+
+        Returns:
+            str: bestmove answer
+        """
+        if game.gm.get_the_game_status() != "1":
+            return "bestmove none {}".format(game.gm.get_the_game_status())
+        if GameMaster.get_player_to_move(game.board, CLIENT_NAME, COMPUTER_NAME) != COMPUTER_NAME:
+            raise ValueError("it is the client's turn")
+        board = game.board
+        time_limit = self.time_limit
+        if time_limit is None and self.node_limit is None and (board.size, board.win_length) != (3, 3):
+            time_limit = AI.DEFAULT_TIME_LIMIT
+        task = (game.strategy, board.size, board.win_length, board.get_bitboard(COMPUTER_NAME), board.get_bitboard(CLIENT_NAME), time_limit, self.node_limit)
+        # the random moves, MCTS and the time limited searches can differ every time, so only the rest is cached
+        is_cacheable = game.strategy == "smart" and time_limit is None
+        move = self.position_cache.get(task) if is_cacheable else None
+        if move is None:
+            self.counters["searches"] += 1
+            move = await asyncio.get_running_loop().run_in_executor(self.executor, search_move, task)
+            if is_cacheable:
+                self.position_cache.store(task, move)
+        status = game.make_move(COMPUTER_NAME, move)
+        return "bestmove {} {}".format(Board.get_field_ID(move, board.size), status)
+
+    async def play(self, arguments: list) -> str:
+        """ makes the client's move and the computer's answer
+
+        Args:
+            arguments (list): words of the request after the command
+
+        Returns:
+            str: answer
+        """
+        game = self.get_game(arguments)
+        if len(arguments) < 2:
+            raise ValueError("play needs the field ID")
+        async with game.lock:
+            status = self.make_client_move(game, arguments[1])
+            if status != "1":
+                return "bestmove none {}".format(status)
+            return await self.make_computer_move(game)
+
+    async def move(self, arguments: list) -> str:
+        """ makes the client's move only
+
+        Args:
+            arguments (list): words of the request after the command
+
+        Returns:
+            str: answer
+        """
+        game = self.get_game(arguments)
+        if len(arguments) < 2:
+            raise ValueError("move needs the field ID")
+        async with game.lock:
+            return "ok {}".format(self.make_client_move(game, arguments[1]))
+
+    async def go(self, arguments: list) -> str:
+        """ makes the computer's move only
+
+        Args:
+            arguments (list): words of the request after the command
+
+        Returns:
+            str: answer
+        """
+        game = self.get_game(arguments)
+        async with game.lock:
+            return await self.make_computer_move(game)
+
+    async def status(self, arguments: list) -> str:
+        """ returns the status of the game
+
+        Args:
+            arguments (list): words of the request after the command
+
+        Returns:
+            str: answer
+        """
+        return "status {}".format(self.get_game(arguments).gm.get_the_game_status())
+
+    async def end(self, arguments: list) -> str:
+        """ removes the game
+
+        Args:
+            arguments (list): words of the request after the command
+
+        Returns:
+            str: answer
+        """
+        self.get_game(arguments)
+        del self.games[int(arguments[0])]
+        return "ok"
+
+    async def stats(self, arguments: list) -> str:
+        """ returns the counters of the server and of the shared position cache
+
+        Args:
+            arguments (list): words of the request after the command
+
+        Returns:
+            str: answer
+        """
+        counters = dict(self.counters)
+        counters.update({"games": len(self.games), "cached_positions": len(self.position_cache.entries),
+                         "cache_hits": self.position_cache.hits, "cache_misses": self.position_cache.misses})
+        return "stats " + json.dumps(counters)
+
+
+async def _play_games(host: str, port: int, path: str, games: int, size: int, win_length: int, strategy: str, histogram: LatencyHistogram):
+    """ plays the games one after another over one connection, choosing the random free fields, and counts the latency of every request
+
+    Args:
+        host (str), port (int), path (str): address of the server (see Server.serve)
+        games (int): number of games
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+        strategy (str): strategy of the computer
+        histogram (LatencyHistogram): latencies of the requests
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+
+    async def request(line: str) -> list:
+        start = time.perf_counter()
+        writer.write((line + "\n").encode())
+        answer = (await reader.readline()).decode().split()
+        histogram.add(time.perf_counter() - start)
+        if not answer or answer[0] == "error":
+            raise RuntimeError("{} -> {}".format(line, " ".join(answer)))
+        return answer
+
+    for _ in range(games):
+        game_ID = (await request("new {} {} {}".format(size, win_length, strategy)))[1]
+        free_fields = list(range(1, size * size + 1))
+        while True:
+            field_ID = choice(free_fields)
+            free_fields.remove(field_ID)
+            _, computer_field_ID, status = await request("play {} {}".format(game_ID, field_ID))
+            if computer_field_ID != "none":
+                free_fields.remove(int(computer_field_ID))
+            if status != "1":
+                break
+        await request("end {}".format(game_ID))
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load(host: str = "127.0.0.1", port: int = 8765, path: str = None, connections: int = 10, games: int = 100,
+                   size: int = 3, win_length: int = 3, strategy: str = "smart") -> dict:
+    """ plays the games over many connections at once and reports the throughput and the latencies of the requests
+
+    Args:
+        host (str), port (int), path (str): address of the server (see Server.serve)
+        connections (int): number of the concurrent connections
+        games (int): number of games (split between the connections)
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+        strategy (str): strategy of the computer
+
+    Returns:
+        dict: requests, seconds, requests_per_second and latency (count, mean, p50, p90, p99, max in seconds)
+    """
+    histogram = LatencyHistogram()
+    chunks = [games // connections + (1 if i < games % connections else 0) for i in range(connections)]
+    start = time.perf_counter()
+    await asyncio.gather(*[_play_games(host, port, path, chunk, size, win_length, strategy, histogram) for chunk in chunks if chunk])
+    seconds = time.perf_counter() - start
+    return {
+        "requests": histogram.count,
+        "seconds": seconds,
+        "requests_per_second": histogram.count / seconds if seconds else float("inf"),
+        "latency": histogram.to_dict(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Server hosting many games at once and its load generator.")
+    subparsers = parser.add_subparsers(dest = "command", required = True)
+    serve_parser = subparsers.add_parser("serve", help = "run the server")
+    serve_parser.add_argument("--workers", type = int, default = None, help = "searching processes (CPU cores by default)")
+    serve_parser.add_argument("--threads", action = "store_true", help = "search in the threads instead of the processes")
+    serve_parser.add_argument("--time-limit", type = float, default = None, help = "seconds per computer move")
+    serve_parser.add_argument("--node-limit", type = int, default = None, help = "nodes (playouts for mcts) per computer move")
+    serve_parser.add_argument("--cache-size", type = int, default = 100000, help = "positions in the shared position cache")
+    serve_parser.add_argument("--record", default = None, help = "file where the finished games are appended (see GameRecord.py)")
+    load_parser = subparsers.add_parser("load", help = "play the games against the server and report the requests per second and latencies")
+    load_parser.add_argument("--connections", type = int, default = 10)
+    load_parser.add_argument("--games", type = int, default = 100)
+    load_parser.add_argument("--size", type = int, default = 3)
+    load_parser.add_argument("--win-length", type = int, default = 3)
+    load_parser.add_argument("--strategy", choices = sorted(AI.STRATEGIES), default = "smart")
+    for subparser in [serve_parser, load_parser]:
+        subparser.add_argument("--host", default = "127.0.0.1")
+        subparser.add_argument("--port", type = int, default = 8765)
+        subparser.add_argument("--unix-socket", default = None, help = "path of the Unix socket (instead of TCP)")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = Server(args.workers, args.threads, args.time_limit, args.node_limit, args.cache_size, args.record)
+        try:
+            asyncio.run(server.serve(args.host, args.port, args.unix_socket))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+        return
+
+    result = asyncio.run(run_load(args.host, args.port, args.unix_socket, args.connections, args.games, args.size, args.win_length, args.strategy))
+    latency = result["latency"]
+    print("{} requests in {:.2f} s ({:.1f} requests/s)".format(result["requests"], result["seconds"], result["requests_per_second"]))
+    print("latency: mean {:.2f} ms, p50 {:.2f} ms, p90 {:.2f} ms, p99 {:.2f} ms, max {:.2f} ms".format(
+        latency["mean"] * 1000, latency["p50"] * 1000, latency["p90"] * 1000, latency["p99"] * 1000, latency["max"] * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+""" headless self-play: plays many games between two strategies without the GUI and reports the games per second, the results
+    and the move times. Usage example:
+
+    python Simulator.py random smart --games 10000 --processes 4
+"""
+from AI import AI
+from Board import Board
+from GameMaster import GameMaster
+from GameRecord import GameRecord, GameRecordWriter, get_result
+from LatencyHistogram import LatencyHistogram
+import Bitboard
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _make_ai_factory(strategy: str):
+    """ returns the function creating the AI with the given strategy (see STRATEGIES)
+
+    Args:
+        strategy (str): AI strategy
+
+    Returns:
+        function: factory(name, size, win_length, time_limit, node_limit) returning the player
+    """
+    def factory(name: str, size: int, win_length: int, time_limit: float = None, node_limit: int = None):
+        return AI(name, strategy, size = size, win_length = win_length, time_limit = time_limit, node_limit = node_limit)
+    return factory
+
+
+# strategy name: factory of the player, the player has to provide get_player_move_on_board(board, opponent_name)
+STRATEGIES = {
+    "random": _make_ai_factory("Player vs Random Computer"),
+    "smart": _make_ai_factory("Player vs Smart Computer"),
+    "mcts": _make_ai_factory("Player vs MCTS Computer"),
+}
+
+
+def register_strategy(name: str, factory):
+    """ makes a new engine available to the simulator
+
+    Args:
+        name (str): strategy name
+        factory (function): factory(name, size, win_length, time_limit, node_limit) returning the player
+    """
+    STRATEGIES[name] = factory
+
+
+class Simulator:
+    # names of the players, the first one always starts
+    FIRST_NAME = "O"
+    SECOND_NAME = "X"
+
+    def __init__(self, first_strategy: str, second_strategy: str, size: int = 3, win_length: int = 3, time_limit: float = None, node_limit: int = None,
+                 record_path: str = None):
+        """ initializes a new instance of the Simulator class
+
+        Args:
+            first_strategy (str): strategy of the player who starts (one of STRATEGIES)
+            second_strategy (str): strategy of the other player
+            size (int): number of rows (and columns) of the board
+            win_length (int): number of fields in a line needed to win
+            time_limit (float): time limit per move of the search strategies
+            node_limit (int): node limit per move of the search strategies
+            record_path (str): file where every game is appended (see GameRecord module), the games are not saved if not provided
+        """
+        for strategy in [first_strategy, second_strategy]:
+            if strategy not in STRATEGIES:
+                raise ValueError("unknown strategy: {} (available: {})".format(strategy, ", ".join(STRATEGIES)))
+        self.first_strategy = first_strategy
+        self.second_strategy = second_strategy
+        self.size = size
+        self.win_length = win_length
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.record_path = record_path
+
+    def create_players(self) -> list:
+        """ returns the players of both strategies (they are kept for all the games, so their caches stay warm)
+
+        Returns:
+            list: first player, second player
+        """
+        return [
+            STRATEGIES[self.first_strategy](Simulator.FIRST_NAME, self.size, self.win_length, self.time_limit, self.node_limit),
+            STRATEGIES[self.second_strategy](Simulator.SECOND_NAME, self.size, self.win_length, self.time_limit, self.node_limit),
+        ]
+
+    def play_game(self, players: list, histograms: list, record_writer: GameRecordWriter = None) -> str:
+        """ plays one game and counts the move times of both players
+
+        Args:
+            players (list): first player, second player
+            histograms (list): move times histograms of the first and the second player
+            record_writer (GameRecordWriter): writer saving the game (the game is not saved if not provided)
+
+        Returns:
+            str: "first" or "second" for the winner, "draw" for the draw
+        """
+        names = [Simulator.FIRST_NAME, Simulator.SECOND_NAME]
+        board = Board(self.size, self.win_length)
+        gm = GameMaster(self.size, self.win_length)
+        moves = []
+        turn = 0
+        while True:
+            start = time.perf_counter()
+            move = players[turn].get_player_move_on_board(board, names[1 - turn])
+            histograms[turn].add(time.perf_counter() - start)
+            board.update_with_coords(names[turn], move)
+            moves.append(Board.get_field_ID(move, self.size))
+            gm.evaluate_the_last_move(board)
+            game_status = gm.get_the_game_status()
+            if game_status != "1" and record_writer is not None:
+                record_writer.write(GameRecord(self.first_strategy, self.second_strategy, get_result(game_status, *names), self.size, self.win_length, moves))
+            if game_status == "0":
+                return "draw"
+            if game_status != "1":
+                return "first" if game_status == names[0] else "second"
+            turn = 1 - turn
+
+    def run_serial(self, games: int) -> dict:
+        """ plays the games in this process
+
+        Args:
+            games (int): number of games
+
+        Returns:
+            dict: results (see run)
+        """
+        players = self.create_players()
+        histograms = [LatencyHistogram(), LatencyHistogram()]
+        counts = {"first": 0, "second": 0, "draw": 0}
+        record_writer = None if self.record_path is None else GameRecordWriter(self.record_path)
+        for _ in range(games):
+            counts[self.play_game(players, histograms, record_writer)] += 1
+        if record_writer is not None:
+            record_writer.close()
+        return {"counts": counts, "histograms": histograms}
+
+    def run(self, games: int, processes: int = 1, use_numpy: bool = False, seed: int = None) -> dict:
+        """ plays the games and returns the report
+
+        Args:
+            games (int): number of games
+            processes (int): number of processes playing the games
+            use_numpy (bool): play the games in batches with NumPy (random vs random only, no move times then)
+            seed (int): seed of the NumPy random generator
+
+        Returns:
+            dict: games, seconds, games_per_second, win / draw / loss counts and rates of the first player and the move times of both players
+        """
+        start = time.perf_counter()
+        if use_numpy:
+            if self.first_strategy != "random" or self.second_strategy != "random":
+                raise ValueError("the NumPy path plays only random vs random")
+            if self.record_path is not None:
+                raise ValueError("the NumPy path does not save the games")
+            counts = play_random_games_numpy(games, self.size, self.win_length, seed)
+            histograms = [LatencyHistogram(), LatencyHistogram()]
+        elif processes > 1:
+            chunks = [games // processes + (1 if i < games % processes else 0) for i in range(processes)]
+            tasks = [(self.first_strategy, self.second_strategy, self.size, self.win_length, self.time_limit, self.node_limit, self.record_path, chunk)
+                     for chunk in chunks if chunk]
+            if self.record_path is not None:
+                # the file header is written once here, the workers only append their games
+                GameRecordWriter(self.record_path).close()
+            counts = {"first": 0, "second": 0, "draw": 0}
+            histograms = [LatencyHistogram(), LatencyHistogram()]
+            with ProcessPoolExecutor(processes) as executor:
+                for result in executor.map(_run_chunk, tasks):
+                    for key, count in result["counts"].items():
+                        counts[key] += count
+                    for histogram, other in zip(histograms, result["histograms"]):
+                        histogram.merge(other)
+        else:
+            result = self.run_serial(games)
+            counts, histograms = result["counts"], result["histograms"]
+        seconds = time.perf_counter() - start
+
+        return {
+            "first_strategy": self.first_strategy,
+            "second_strategy": self.second_strategy,
+            "size": self.size,
+            "win_length": self.win_length,
+            "games": games,
+            "seconds": seconds,
+            "games_per_second": games / seconds if seconds else float("inf"),
+            "wins": counts["first"],
+            "draws": counts["draw"],
+            "losses": counts["second"],
+            "win_rate": counts["first"] / games if games else 0.0,
+            "draw_rate": counts["draw"] / games if games else 0.0,
+            "loss_rate": counts["second"] / games if games else 0.0,
+            "first_move_times": histograms[0].to_dict(),
+            "second_move_times": histograms[1].to_dict(),
+        }
+
+
+def _run_chunk(task: tuple) -> dict:
+    """ plays a part of the games in the worker process
+
+    Args:
+        task (tuple): first_strategy, second_strategy, size, win_length, time_limit, node_limit, record_path, games
+
+    Returns:
+        dict: counts and histograms (see Simulator.run_serial)
+    """
+    *settings, games = task
+    return Simulator(*settings).run_serial(games)
+
+
+def play_random_games_numpy(games: int, size: int = 3, win_length: int = 3, seed: int = None) -> dict:
+    """ plays random vs random games in batches with NumPy: every game is a random order of all the fields (the same distribution as
+        picking a random free field every move), the game ends at the first move which completes a line of one player
+
+    Args:
+        games (int): number of games
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+        seed (int): seed of the random generator
+
+    Returns:
+        dict: counts of the "first" and "second" player wins and the "draw"s
+    """
+    if np is None:
+        raise ImportError("NumPy is needed for the batched random games")
+    geometry = Bitboard.get_geometry(size, win_length)
+    cells = geometry.cells
+    rng = np.random.default_rng(seed)
+    # lines[line] are the bit numbers of the fields of the line
+    lines = np.array([[cell for cell in range(cells) if mask >> cell & 1] for mask in geometry.win_masks], dtype = np.intp)
+    batch_size = max(1, 4000000 // (len(lines) * win_length))
+    counts = {"first": 0, "second": 0, "draw": 0}
+
+    for batch_start in range(0, games, batch_size):
+        batch = min([batch_size, games - batch_start])
+        order = np.argsort(rng.random((batch, cells)), axis = 1)
+        # move_number[game, cell] is the number of the move which took the field (even for the first player)
+        move_number = np.empty((batch, cells), dtype = np.int16)
+        move_number[np.arange(batch)[:, None], order] = np.arange(cells, dtype = np.int16)
+        line_moves = move_number[:, lines]
+        is_one_player_line = (line_moves % 2 == line_moves[:, :, :1] % 2).all(axis = 2)
+        # the line is completed with its last move, if all its fields belong to one player
+        completed_at = np.where(is_one_player_line, line_moves.max(axis = 2), cells)
+        game_end = completed_at.min(axis = 1)
+        is_won = game_end < cells
+        first_wins = int(np.count_nonzero(is_won & (game_end % 2 == 0)))
+        counts["first"] += first_wins
+        counts["second"] += int(np.count_nonzero(is_won)) - first_wins
+        counts["draw"] += batch - int(np.count_nonzero(is_won))
+    return counts
+
+
+def format_report(result: dict) -> str:
+    """ returns the simulation results as the human readable text
+
+    Args:
+        result (dict): results of Simulator.run
+
+    Returns:
+        str: report
+    """
+    lines = [
+        "{} vs {} on {}x{} ({} in a row)".format(result["first_strategy"], result["second_strategy"], result["size"], result["size"], result["win_length"]),
+        "{} games in {:.2f} s ({:.1f} games/s)".format(result["games"], result["seconds"], result["games_per_second"]),
+        "first player: {:.1%} wins, {:.1%} draws, {:.1%} losses".format(result["win_rate"], result["draw_rate"], result["loss_rate"]),
+    ]
+    for player in ["first", "second"]:
+        times = result[player + "_move_times"]
+        if times["count"]:
+            lines.append("{} player move time: p50 {:.1f} us, p90 {:.1f} us, p99 {:.1f} us, max {:.1f} us".format(
+                player, times["p50"] * 1e6, times["p90"] * 1e6, times["p99"] * 1e6, times["max"] * 1e6))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Plays the games between two strategies without the GUI.")
+    parser.add_argument("first_strategy", choices = sorted(STRATEGIES), help = "strategy of the player who starts")
+    parser.add_argument("second_strategy", choices = sorted(STRATEGIES), help = "strategy of the other player")
+    parser.add_argument("--games", type = int, default = 1000)
+    parser.add_argument("--size", type = int, default = 3)
+    parser.add_argument("--win-length", type = int, default = 3)
+    parser.add_argument("--time-limit", type = float, default = None, help = "seconds per move of the search strategies")
+    parser.add_argument("--node-limit", type = int, default = None, help = "nodes per move of the search strategies")
+    parser.add_argument("--processes", type = int, default = 1)
+    parser.add_argument("--numpy", action = "store_true", help = "batched random vs random games with NumPy")
+    parser.add_argument("--seed", type = int, default = None)
+    parser.add_argument("--record", default = None, help = "file where the games are appended (see GameRecord.py)")
+    args = parser.parse_args()
+
+    simulator = Simulator(args.first_strategy, args.second_strategy, args.size, args.win_length, args.time_limit, args.node_limit, args.record)
+    print(format_report(simulator.run(args.games, args.processes, args.numpy, args.seed)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+""" tablebase: the exact value (win, draw or loss for the player to move, and the number of moves to the end of the game with the best play)
+    of every position of a board, written by solve_tablebase.py and read through the memory-mapped file.
+
+    The positions are indexed compactly, without the index space of the impossible positions: they are grouped into layers by the number of the
+    occupied fields m (the first player has (m + 1) // 2 of them, the second one m // 2), and inside the layer the index is
+    rank(occupied) * C(m, first player's fields) + rank(first player's fields among the occupied ones), both ranks in the colexicographic order
+    of the combinations (the order of the bitboards as the numbers). The 4x4 board has 10165779 such positions (3^16 = 43046721 in the base 3 index).
+"""
+import Bitboard
+
+from math import comb
+import mmap
+import os
+import struct
+import zlib
+
+MAGIC = b"TTTBASE1"
+VERSION = 1
+# magic, version, size, win_length, crc32 of the entries
+HEADER = struct.Struct("<8sHHHI")
+# entry: value << 6 | distance (number of moves to the end of the game), NO_ENTRY for the impossible positions
+LOSS = 0
+DRAW = 1
+WIN = 2
+NO_ENTRY = 0xFF
+MAX_DISTANCE = 62
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+# the bitboards are split into the chunks of this number of bits for the lookup tables
+CHUNK = 8
+POPCOUNT = tuple(bin(bits).count("1") for bits in range(1 << CHUNK))
+_pext_table = None
+
+
+def get_pext_table() -> tuple:
+    """ returns the table of the packed bits: table[occupied << CHUNK | bits] are the bits of the occupied fields only, packed together
+        (as the x86 pext instruction). It is built on the first use, as only the tablebase index needs it
+
+    Returns:
+        tuple: 2 ** (2 * CHUNK) packed bits
+    """
+    global _pext_table
+    if _pext_table is None:
+        _pext_table = tuple(sum(1 << i for i, cell in enumerate(cell for cell in range(CHUNK) if occupied >> cell & 1) if bits >> cell & 1)
+                            for occupied in range(1 << CHUNK) for bits in range(1 << CHUNK))
+    return _pext_table
+
+
+def get_default_path(size: int, win_length: int) -> str:
+    """ returns the path of the tablebase of the board next to the game's modules
+
+    Args:
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+
+    Returns:
+        str: path
+    """
+    return os.path.join(DIRECTORY, "tablebase_{}x{}_{}.bin".format(size, size, win_length))
+
+
+def encode_entry(value: int, distance: int) -> int:
+    """ packs the value and the distance into one byte
+
+    Args:
+        value (int): LOSS, DRAW or WIN for the player to move
+        distance (int): number of moves to the end of the game
+
+    Returns:
+        int: one byte entry
+    """
+    return value << 6 | distance
+
+
+class PositionIndex:
+
+    def __init__(self, cells: int):
+        """ initializes a new instance of the PositionIndex class - the compact index of the positions of the board (see the module description)
+
+        Args:
+            cells (int): number of the board's fields
+        """
+        if cells > MAX_DISTANCE:
+            raise ValueError("the tablebase holds the boards with up to {} fields".format(MAX_DISTANCE))
+        self.cells = cells
+        self.chunks = (cells + CHUNK - 1) // CHUNK
+        # layer_sizes[m] is the number of the positions with m occupied fields, layer_offsets[m] the index of the first of them
+        self.first_counts = [(m + 1) // 2 for m in range(cells + 1)]
+        self.subset_counts = [comb(m, self.first_counts[m]) for m in range(cells + 1)]
+        self.layer_sizes = [comb(cells, m) * self.subset_counts[m] for m in range(cells + 1)]
+        self.layer_offsets = [sum(self.layer_sizes[:m]) for m in range(cells + 1)]
+        self.size = sum(self.layer_sizes)
+        self.pext_table = get_pext_table()
+        # rank_tables[chunk][below][bits] is the part of the colexicographic rank given by the chunk's bits, with below bits set in the lower chunks
+        self.rank_tables = tuple(tuple(tuple(self.get_chunk_rank(chunk, below, bits) for bits in range(1 << CHUNK)) for below in range(cells + 1))
+                                 for chunk in range(self.chunks))
+
+    @staticmethod
+    def get_chunk_rank(chunk: int, below: int, bits: int) -> int:
+        """ returns the part of the colexicographic rank given by the bits of one chunk: C(cell, i + 1) for the i-th set bit of the whole bitboard
+
+        Args:
+            chunk (int): chunk number
+            below (int): number of the set bits in the lower chunks
+            bits (int): bits of the chunk
+
+        Returns:
+            int: part of the rank
+        """
+        rank = 0
+        for i in range(CHUNK):
+            if bits >> i & 1:
+                below += 1
+                rank += comb(chunk * CHUNK + i, below)
+        return rank
+
+    def rank(self, bits: int) -> int:
+        """ returns the colexicographic rank of the combination among the ones with the same number of the set bits
+
+        Args:
+            bits (int): bitboard
+
+        Returns:
+            int: rank
+        """
+        rank, below = 0, 0
+        for tables in self.rank_tables:
+            chunk_bits = bits & 0xFF
+            rank += tables[below][chunk_bits]
+            below += POPCOUNT[chunk_bits]
+            bits >>= CHUNK
+        return rank
+
+    def unrank(self, rank: int, count: int) -> int:
+        """ returns the combination of the given colexicographic rank
+
+        Args:
+            rank (int): rank
+            count (int): number of the set bits
+
+        Returns:
+            int: bitboard
+        """
+        bits = 0
+        cell = self.cells
+        for i in range(count, 0, -1):
+            cell -= 1
+            while comb(cell, i) > rank:
+                cell -= 1
+            bits |= 1 << cell
+            rank -= comb(cell, i)
+        return bits
+
+    def compress(self, bits: int, occupied: int) -> int:
+        """ returns the bits of the occupied fields only, packed together
+
+        Args:
+            bits (int): bitboard (a part of occupied)
+            occupied (int): bitboard of the occupied fields
+
+        Returns:
+            int: packed bits
+        """
+        pext_table = self.pext_table
+        packed, shift = 0, 0
+        while occupied:
+            chunk_occupied = occupied & 0xFF
+            packed |= pext_table[chunk_occupied << CHUNK | bits & 0xFF] << shift
+            shift += POPCOUNT[chunk_occupied]
+            occupied >>= CHUNK
+            bits >>= CHUNK
+        return packed
+
+    def get_layer_index(self, first_bits: int, second_bits: int) -> int:
+        """ returns the index of the position inside its layer
+
+        Args:
+            first_bits (int): bitboard of the player who started
+            second_bits (int): bitboard of the other player
+
+        Returns:
+            int: index in the layer
+        """
+        occupied = first_bits | second_bits
+        return self.rank(occupied) * self.subset_counts[occupied.bit_count()] + self.rank(self.compress(first_bits, occupied))
+
+    def get_index(self, first_bits: int, second_bits: int) -> int:
+        """ returns the index of the position in the whole tablebase (None if the numbers of the fields do not fit: the first player has
+            the same number of them as the second one, or one more)
+
+        Args:
+            first_bits (int): bitboard of the player who started
+            second_bits (int): bitboard of the other player
+
+        Returns:
+            int or None: index
+        """
+        if first_bits.bit_count() - second_bits.bit_count() not in (0, 1):
+            return None
+        return self.layer_offsets[(first_bits | second_bits).bit_count()] + self.get_layer_index(first_bits, second_bits)
+
+
+def write_table(path: str, size: int, win_length: int, layer_paths: list):
+    """ writes the tablebase file from the files of the solved layers
+
+    Args:
+        path (str): path of the tablebase
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+        layer_paths (list): paths of the layers 0, 1, ... size * size
+    """
+    crc = 0
+    for layer_path in layer_paths:
+        with open(layer_path, "rb") as layer:
+            crc = zlib.crc32(layer.read(), crc)
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, size, win_length, crc))
+        for layer_path in layer_paths:
+            with open(layer_path, "rb") as layer:
+                file.write(layer.read())
+    os.replace(temporary_path, path)
+
+
+class TableBase:
+
+    def __init__(self, path: str):
+        """ initializes a new instance of the TableBase class - the read-only, memory-mapped tablebase (written by solve_tablebase.py).
+            Raises ValueError if the file is corrupted.
+
+        Args:
+            path (str): path of the tablebase file
+        """
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+        try:
+            magic, version, self.size, self.win_length, crc = HEADER.unpack_from(self.data)
+        except struct.error:
+            self.data.close()
+            raise ValueError("corrupted tablebase file: {}".format(path))
+        self.index = PositionIndex(self.size * self.size) if magic == MAGIC else None
+        if (magic != MAGIC or version != VERSION or len(self.data) != HEADER.size + self.index.size
+                or zlib.crc32(self.data[HEADER.size:]) != crc):
+            self.data.close()
+            raise ValueError("corrupted tablebase file: {}".format(path))
+        self.geometry = Bitboard.get_geometry(self.size, self.win_length)
+
+    def get_entry(self, first_bits: int, second_bits: int):
+        """ returns the value of the position for the player to move and the number of moves to the end of the game
+
+        Args:
+            first_bits (int): bitboard of the player who started
+            second_bits (int): bitboard of the other player
+
+        Returns:
+            tuple or None: (LOSS, DRAW or WIN, distance) or None for the impossible position
+        """
+        index = self.index.get_index(first_bits, second_bits)
+        if index is None:
+            return None
+        entry = self.data[HEADER.size + index]
+        if entry == NO_ENTRY:
+            return None
+        return entry >> 6, entry & 0x3F
+
+    def get_position_entry(self, ai_bits: int, opponent_bits: int):
+        """ the same as get_entry, for the position where the AI is to move
+
+        Args:
+            ai_bits (int): bitboard of the player to move
+            opponent_bits (int): bitboard of the other player
+
+        Returns:
+            tuple or None: (LOSS, DRAW or WIN, distance) or None if the position is impossible or it is not the AI's turn
+        """
+        if ai_bits.bit_count() == opponent_bits.bit_count():
+            return self.get_entry(ai_bits, opponent_bits)
+        if opponent_bits.bit_count() == ai_bits.bit_count() + 1:
+            return self.get_entry(opponent_bits, ai_bits)
+        return None
+
+    def get_best_move(self, ai_bits: int, opponent_bits: int):
+        """ returns the best move of the player to move: the fastest win, else the draw, else the slowest loss
+            (the same interface as MoveTable.get_best_move)
+
+        Args:
+            ai_bits (int): bitboard of the player to move
+            opponent_bits (int): bitboard of the other player
+
+        Returns:
+            tuple or None: (cell, score) with the score 1 (win), 0 (draw) or -1 (loss), None if the position or one after its moves is not in
+                           the tablebase (e.g. it is not the turn of the player), or the game is over
+        """
+        entry = self.get_position_entry(ai_bits, opponent_bits)
+        if entry is None or entry[1] == 0:
+            return None
+        best_cell, best_key = None, None
+        occupied = ai_bits | opponent_bits
+        for cell in self.geometry.get_free_cells(occupied):
+            bits = ai_bits | 1 << cell
+            if self.geometry.is_winning_move(bits, cell):
+                return cell, 1
+            if occupied | 1 << cell == self.geometry.full_mask:
+                value, distance = DRAW, 0
+            else:
+                entry = self.get_position_entry(opponent_bits, bits)
+                if entry is None:
+                    return None
+                value, distance = entry
+            # the value of the position after the move is the opponent's one
+            key = {LOSS: (2, -distance), DRAW: (1, 0), WIN: (0, distance)}[value]
+            if best_key is None or key > best_key:
+                best_cell, best_key = cell, key
+        return best_cell, best_key[0] - 1
+
+    def close(self):
+        self.data.close()
+
+
+_default_tablebases = {}
+
+
+def get_default_tablebase(size: int, win_length: int):
+    """ returns the tablebase of the board from its default path (see get_default_path), loaded once per process
+
+    Args:
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+
+    Returns:
+        TableBase or None: the tablebase or None if the file is missing or corrupted
+    """
+    if (size, win_length) not in _default_tablebases:
+        try:
+            _default_tablebases[(size, win_length)] = TableBase(get_default_path(size, win_length))
+        except (OSError, ValueError):
+            _default_tablebases[(size, win_length)] = None
+    return _default_tablebases[(size, win_length)]
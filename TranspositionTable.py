@@ -0,0 +1,76 @@
+from collections import OrderedDict
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class TranspositionTable:
+
+    def __init__(self, max_size: int = 100000):
+        """ initializes a new instance of the TranspositionTable class - the cache of the already searched positions.
+            When the table is full, the least recently used entry is evicted.
+
+        Args:
+            max_size (int): maximal number of the stored positions
+        """
+        if type(max_size) != int or max_size < 1:
+            raise ValueError("\"max_size\" should be a positive int")
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: int):
+        """ returns the stored entry of the position and marks it as recently used
+
+        Args:
+            key (int): position key
+
+        Returns:
+            tuple or None: (score, depth, flag) or None if the position is not stored
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            self.entries.move_to_end(key)
+        except KeyError:
+            # evicted in the meantime by the search running in another thread (the entry is still valid)
+            pass
+        return entry
+
+    def store(self, key: int, score: int, depth: int, flag: int):
+        """ stores the search result of the position, evicting the least recently used entry if the table is full
+
+        Args:
+            key (int): position key
+            score (int): score of the position
+            depth (int): number of moves searched below the position
+            flag (int): EXACT, LOWER_BOUND or UPPER_BOUND - what the score means given the alpha-beta window
+        """
+        entries = self.entries
+        entries[key] = (score, depth, flag)
+        try:
+            entries.move_to_end(key)
+        except KeyError:
+            # evicted right away by the search running in another thread
+            pass
+        # more entries than max_size may be evicted at once if the searches of several threads store into the table at the same time
+        while len(entries) > self.max_size:
+            try:
+                entries.popitem(last = False)
+            except KeyError:
+                break
+
+    def clear(self):
+        """ removes all the entries and resets the counters
+        """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,325 @@
+""" computer player of Ultimate Tic Tac Toe (see UltimateBoard module). The whole-game minimax is impossible there (up to 81 moves per position),
+    so the engine runs the iterative deepening alpha-beta search within the fixed time budget per move, and returns the best move of the last
+    finished iteration. The search works on the bitboards of the sub-boards: a move changes one sub-board, so only the status of that sub-board
+    is updated (one table lookup), and the meta board only when the sub-board gets closed.
+"""
+from Exceptions import SearchLimitError
+from SearchStats import SearchStats
+from UltimateBoard import UltimateBoard
+import Bitboard
+
+import math
+import threading
+import time
+
+GEOMETRY = Bitboard.get_geometry(3, 3)
+FULL = GEOMETRY.full_mask
+# IS_WON[bits] is true if the 3x3 bitboard has a full line
+IS_WON = tuple(GEOMETRY.has_line(bits) for bits in range(FULL + 1))
+# score of the won game (minus the number of moves, so the faster win is better)
+WIN_SCORE = 1000000
+# heuristic weights: won sub-board, two and one own fields (or won sub-boards) in a line without the opponent's ones
+SUB_BOARD_WEIGHT = 100
+META_LINE_WEIGHTS = (0, 40, 300)
+SUB_LINE_WEIGHTS = (0, 1, 6)
+# the center and the corners are in more lines, both of the fields and of the sub-boards
+CELL_WEIGHTS = (3, 2, 3, 2, 4, 2, 3, 2, 3)
+# CELL_RANKS[cell] is the order in which the fields of a sub-board are tried (the center, the corners, then the rest)
+CELL_RANKS = (1, 5, 2, 6, 0, 7, 3, 8, 4)
+
+
+def _evaluate_lines(own: int, other: int, weights: tuple) -> int:
+    """ returns the weights of the lines with the own fields and without the other player's ones, minus the same for the other player
+
+    Args:
+        own (int): 3x3 bitboard of the player
+        other (int): 3x3 bitboard of the other player (and the blocked fields)
+        weights (tuple): weight by the number of the fields in the line
+
+    Returns:
+        int: score
+    """
+    score = 0
+    for mask in GEOMETRY.win_masks:
+        if not other & mask:
+            score += weights[(own & mask).bit_count()]
+        elif not own & mask:
+            score -= weights[(other & mask).bit_count()]
+    return score
+
+
+class UltimateSearchContext:
+    __slots__ = ("stats", "start", "bits", "meta", "closed", "nodes", "deadline", "node_limit", "stop_event")
+
+    def __init__(self, board: UltimateBoard, name: str, opponent_name: str, time_limit: float, node_limit: int, stop_event: threading.Event):
+        """ initializes a new instance of the UltimateSearchContext class - the state of one move search (the position on the bitboards, its counters
+            and limits), created by every search call, so the searches of one UltimateAI can run at the same time in different threads
+
+        Args:
+            board (UltimateBoard): current board
+            name (str): name of the AI player
+            opponent_name (str): name of the other player
+            time_limit (float): seconds for the search (None for no time limit)
+            node_limit (int): nodes for the search (None for no node limit)
+            stop_event (threading.Event): event stopping the search early (None if it can not be stopped)
+        """
+        self.stats = SearchStats("ultimate")
+        self.start = time.perf_counter()
+        # bitboards of the sub-boards, won sub-boards and closed (won or full) sub-boards of both players, the AI first
+        self.bits = [board.get_bitboards(name), board.get_bitboards(opponent_name)]
+        self.meta = [0, 0]
+        self.closed = 0
+        for sub_board, status in enumerate(board.sub_board_statuses):
+            if status != "1":
+                self.closed |= 1 << sub_board
+                if status == name:
+                    self.meta[0] |= 1 << sub_board
+                elif status == opponent_name:
+                    self.meta[1] |= 1 << sub_board
+        self.nodes = 0
+        self.deadline = None if time_limit is None else time.monotonic() + time_limit
+        self.node_limit = node_limit
+        self.stop_event = stop_event
+
+
+class UltimateAI:
+    # time budget (in seconds) of one move
+    DEFAULT_TIME_LIMIT = 0.5
+    # how many nodes are searched between two checks of the clock
+    TIME_CHECK_INTERVAL = 64
+
+    def __init__(self, name: str, time_limit: float = DEFAULT_TIME_LIMIT, node_limit: int = None):
+        """ initializes a new instance of the UltimateAI class
+
+        Args:
+            name (str): name of the AI player
+            time_limit (float): seconds per move (None for no time limit, then there has to be the node limit)
+            node_limit (int): nodes per move (None for no node limit)
+        """
+        if type(name) != str:
+            raise TypeError("\"name\" should be of str class")
+        if time_limit is None and node_limit is None:
+            raise ValueError("the search needs the time or node limit")
+        self.name = name
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        # counters of the last search
+        self.search_stats = SearchStats("ultimate")
+        # scores of the sub-board positions (evaluate_sub_board), filled on the first use
+        self.sub_board_scores = {}
+
+    def close(self):
+        """ nothing to release, for the same interface as AI
+        """
+
+    def get_search_stats(self) -> SearchStats:
+        """ returns the counters of the last move search
+
+        Returns:
+            SearchStats: counters
+        """
+        return self.search_stats
+
+    def get_player_move_on_board(self, board: UltimateBoard, opponent_name: str, stop_event: threading.Event = None) -> tuple:
+        """ returns the move found by the search within the time (or node) limit
+
+        Args:
+            board (UltimateBoard): current board
+            opponent_name (str): name of the other player
+            stop_event (threading.Event): when set (e.g. from the GUI thread), the search returns its best move so far
+
+        Returns:
+            tuple: (row, col) on the 9x9 grid ((-1, -1) if the game is over)
+        """
+        moves = board.get_legal_moves()
+        if not moves:
+            return (-1, -1)
+        context = UltimateSearchContext(board, self.name, opponent_name, self.time_limit, self.node_limit, stop_event)
+        sub_board, cell = self.search(context, moves)
+        return UltimateBoard.get_coords(sub_board, cell)
+
+    def search(self, context: UltimateSearchContext, moves: list) -> tuple:
+        """ the iterative deepening search: the alpha-beta search (negamax) is run with the depth 1, 2, ... until the time or node limit is reached,
+            and the best move of the last finished iteration is returned. Every iteration starts with the best move of the previous one
+
+        Args:
+            context (UltimateSearchContext): state of the search
+            moves (list): legal (sub-board, cell) moves of the AI
+
+        Returns:
+            tuple: (sub-board, cell)
+        """
+        moves = self.order_moves(context, moves, 0)
+        best_move = moves[0]
+        free_fields = sum(9 - (ai_bits | opponent_bits).bit_count() for ai_bits, opponent_bits in zip(*context.bits))
+
+        for max_depth in range(1, free_fields + 1):
+            best_score, iteration_best_move = -math.inf, moves[0]
+            alpha = -math.inf
+            try:
+                for move in moves:
+                    score = -self.negamax_move(context, 0, move, max_depth, -math.inf, -alpha, 1)
+                    if score > best_score:
+                        best_score, iteration_best_move = score, move
+                        alpha = max([alpha, score])
+            except SearchLimitError:
+                break
+            best_move = iteration_best_move
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+            context.stats.max_depth = max_depth
+            # the result of the game is already known, deeper search will not change it
+            if abs(best_score) >= WIN_SCORE - free_fields:
+                break
+
+        context.stats.nodes = context.nodes
+        context.stats.seconds = time.perf_counter() - context.start
+        self.search_stats = context.stats
+        return best_move
+
+    def negamax_move(self, context: UltimateSearchContext, player: int, move: tuple, depth_left: int, alpha: float, beta: float, ply: int) -> float:
+        """ makes the move, scores the position after it for the other player and undoes the move. Only the sub-board of the move is checked
+            (and the meta board if the sub-board got won)
+
+        Args:
+            context (UltimateSearchContext): state of the search
+            player (int): 0 for the AI, 1 for the opponent (who makes the move)
+            move (tuple): (sub-board, cell)
+            depth_left (int): number of moves to search ahead, including this one
+            alpha (float), beta (float): bounds of the other player's score
+            ply (int): number of moves made from the root of the search, including this one
+
+        Returns:
+            float: score for the other player (the player to move after the move)
+        """
+        sub_board, cell = move
+        bits, meta = context.bits[player], context.meta
+        old_bits, old_meta, old_closed = bits[sub_board], meta[player], context.closed
+        bits[sub_board] = new_bits = old_bits | 1 << cell
+        try:
+            if IS_WON[new_bits]:
+                meta[player] = old_meta | 1 << sub_board
+                context.closed = old_closed | 1 << sub_board
+                if IS_WON[meta[player]]:
+                    return -(WIN_SCORE - ply)
+            elif new_bits | context.bits[1 - player][sub_board] == FULL:
+                context.closed = old_closed | 1 << sub_board
+            if context.closed == FULL:
+                return 0
+            return self.negamax(context, 1 - player, cell, depth_left - 1, alpha, beta, ply)
+        finally:
+            bits[sub_board] = old_bits
+            meta[player] = old_meta
+            context.closed = old_closed
+
+    def negamax(self, context: UltimateSearchContext, player: int, sub_board: int, depth_left: int, alpha: float, beta: float, ply: int) -> float:
+        """ alpha-beta search (negamax: the score is always for the player to move) of the position where the player was sent to the sub-board.
+            The positions at the depth limit get the heuristic score (evaluate). Raises SearchLimitError when the time or node limit is reached
+            or the search is stopped
+
+        Args:
+            context (UltimateSearchContext): state of the search
+            player (int): 0 for the AI, 1 for the opponent (who is to move)
+            sub_board (int): sub-board where the player has to move (any open one if it is closed)
+            depth_left (int): number of moves to search ahead
+            alpha (float), beta (float): values needed for alpha-pruning
+            ply (int): number of moves made from the root of the search
+
+        Returns:
+            float: score for the player to move
+        """
+        context.nodes += 1
+        if context.node_limit is not None and context.nodes >= context.node_limit:
+            raise SearchLimitError(context.nodes)
+        if context.nodes % UltimateAI.TIME_CHECK_INTERVAL == 0 and (context.stop_event is not None and context.stop_event.is_set() or context.deadline is not None and time.monotonic() >= context.deadline):
+            raise SearchLimitError(context.nodes)
+        if depth_left == 0:
+            score = self.evaluate(context)
+            return score if player == 0 else -score
+
+        best_score = -math.inf
+        for move in self.order_moves(context, self.get_moves(context, sub_board), player):
+            score = -self.negamax_move(context, player, move, depth_left, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        context.stats.cutoffs += 1
+                        break
+        return best_score
+
+    def get_moves(self, context: UltimateSearchContext, sub_board: int) -> list:
+        """ returns the moves of the player sent to the sub-board
+
+        Args:
+            context (UltimateSearchContext): state of the search
+            sub_board (int): sub-board where the player has to move (any open one if it is closed)
+
+        Returns:
+            list: (sub-board, cell) pairs
+        """
+        ai_bits, opponent_bits = context.bits
+        closed = context.closed
+        sub_boards = [sub_board] if not closed >> sub_board & 1 else [other for other in range(9) if not closed >> other & 1]
+        return [(other, cell) for other in sub_boards for cell in GEOMETRY.get_free_cells(ai_bits[other] | opponent_bits[other])]
+
+    def order_moves(self, context: UltimateSearchContext, moves: list, player: int) -> list:
+        """ returns the moves in the order in which they should be searched: the moves winning a sub-board first, then the moves sending the other
+            player to a closed sub-board last (the free choice of the sub-board is usually good for them), the center and corners before the edges
+
+        Args:
+            context (UltimateSearchContext): state of the search
+            moves (list): (sub-board, cell) pairs
+            player (int): 0 for the AI, 1 for the opponent (who makes the moves)
+
+        Returns:
+            list: ordered moves
+        """
+        bits, closed = context.bits[player], context.closed
+        return sorted(moves, key = lambda move: (not IS_WON[bits[move[0]] | 1 << move[1]], closed >> move[1] & 1, CELL_RANKS[move[1]]))
+
+    def evaluate(self, context: UltimateSearchContext) -> int:
+        """ returns the heuristic score of the position for the AI: the won sub-boards and the lines of the meta board with the AI's won sub-boards
+            and without the opponent's ones (minus the same for the opponent), plus the scores of the open sub-boards weighted by their place
+
+        Args:
+            context (UltimateSearchContext): state of the search
+
+        Returns:
+            int: score
+        """
+        ai_meta, opponent_meta = context.meta
+        closed = context.closed
+        drawn = closed & ~(ai_meta | opponent_meta)
+        score = SUB_BOARD_WEIGHT * (sum(CELL_WEIGHTS[sub_board] for sub_board in range(9) if ai_meta >> sub_board & 1)
+                                    - sum(CELL_WEIGHTS[sub_board] for sub_board in range(9) if opponent_meta >> sub_board & 1))
+        for mask in GEOMETRY.win_masks:
+            if mask & drawn:
+                continue
+            if not mask & opponent_meta:
+                score += META_LINE_WEIGHTS[min([(mask & ai_meta).bit_count(), 2])]
+            elif not mask & ai_meta:
+                score -= META_LINE_WEIGHTS[min([(mask & opponent_meta).bit_count(), 2])]
+        ai_bits, opponent_bits = context.bits
+        for sub_board in range(9):
+            if not closed >> sub_board & 1:
+                score += CELL_WEIGHTS[sub_board] * self.evaluate_sub_board(ai_bits[sub_board], opponent_bits[sub_board])
+        return score
+
+    def evaluate_sub_board(self, ai_bits: int, opponent_bits: int) -> int:
+        """ returns the score of the open sub-board for the AI (the lines with one or two AI's fields and without the opponent's ones, minus the same
+            for the opponent), computed once per position of the sub-board
+
+        Args:
+            ai_bits (int): 3x3 bitboard of the AI
+            opponent_bits (int): 3x3 bitboard of the opponent
+
+        Returns:
+            int: score
+        """
+        key = ai_bits << 9 | opponent_bits
+        score = self.sub_board_scores.get(key)
+        if score is None:
+            score = self.sub_board_scores[key] = _evaluate_lines(ai_bits, opponent_bits, SUB_LINE_WEIGHTS)
+        return score
@@ -0,0 +1,186 @@
+""" Ultimate Tic Tac Toe: 9 sub-boards (3x3 Board each) in the 3x3 grid. The field of the move sends the opponent to the sub-board in the same
+    place of the grid; if that sub-board is already won or full, the opponent can play on any open sub-board. Winning a sub-board takes its place
+    on the meta board, and three won sub-boards in a line win the game. The game is a draw when all the sub-boards are closed without such a line.
+
+    The fields are given either as the global coordinates (row, col) on the 9x9 grid, or as the pair (sub-board, cell) of the bit numbers
+    (0 - 8, row by row) of the sub-board in the grid and of the field in the sub-board.
+"""
+from Board import Board
+from Exceptions import WrongCoordinatesError
+from GameMaster import GameMaster
+
+SUB_BOARDS = 9
+# number of rows (and columns) of the whole grid
+SIZE = 9
+
+
+class UltimateBoard:
+
+    def __init__(self):
+        """ initializes a new instance of the UltimateBoard class with all the sub-boards empty, so the first player can play anywhere
+        """
+        self.size = SIZE
+        self.sub_boards = [Board() for _ in range(SUB_BOARDS)]
+        #game status of every sub-board ('1' open, '0' draw, otherwise the winner's name), updated after every move on that sub-board only
+        self.sub_board_statuses = ["1"] * SUB_BOARDS
+        #won sub-boards marked with the winner's name
+        self.meta_board = Board()
+        self.gm = GameMaster()
+        self.game_status = "1"
+        #sub-board where the next move has to be made (None if any open sub-board can be chosen)
+        self.next_sub_board = None
+        #(sub-board, cell) of the last move (None if there was no move yet)
+        self.last_move = None
+
+    def __repr__(self):
+        """ prints the whole grid, the sub-boards separated with the lines
+
+        Returns:
+            str: grid
+        """
+        rows = []
+        for sub_row in range(3):
+            for row in range(3):
+                rows.append(" | ".join(" ".join(self.sub_boards[sub_row * 3 + sub_col].board[row]) for sub_col in range(3)))
+            if sub_row < 2:
+                rows.append("------+-------+------")
+        return "\n".join(rows) + "\n"
+
+    @staticmethod
+    def get_sub_board_and_cell(coords: tuple) -> tuple:
+        """ returns the sub-board and the cell of the field given by the global coordinates (static method)
+
+        Args:
+            coords (tuple): (row, col) on the 9x9 grid
+
+        Returns:
+            tuple: (sub-board, cell)
+        """
+        row, col = coords
+        if row in range(0, SIZE) and col in range(0, SIZE) and type(row) == int and type(col) == int:
+            return (row // 3) * 3 + col // 3, (row % 3) * 3 + col % 3
+        raise WrongCoordinatesError(row, col, SIZE)
+
+    @staticmethod
+    def get_coords(sub_board: int, cell: int) -> tuple:
+        """ returns the global coordinates of the field given by the sub-board and the cell (static method)
+
+        Args:
+            sub_board (int): bit number of the sub-board in the grid
+            cell (int): bit number of the field in the sub-board
+
+        Returns:
+            tuple: (row, col) on the 9x9 grid
+        """
+        return (sub_board // 3) * 3 + cell // 3, (sub_board % 3) * 3 + cell % 3
+
+    def copy(self):
+        """ returns the independent copy of the board (e.g. for the search running in another thread)
+
+        Returns:
+            UltimateBoard: copy of the board
+        """
+        board = UltimateBoard()
+        board.sub_boards = [sub_board.copy() for sub_board in self.sub_boards]
+        board.sub_board_statuses = list(self.sub_board_statuses)
+        board.meta_board = self.meta_board.copy()
+        board.game_status = self.game_status
+        board.next_sub_board = self.next_sub_board
+        board.last_move = self.last_move
+        return board
+
+    def reset(self):
+        """ resets the board
+        """
+        for sub_board in self.sub_boards:
+            sub_board.reset()
+        self.sub_board_statuses = ["1"] * SUB_BOARDS
+        self.meta_board.reset()
+        self.game_status = "1"
+        self.next_sub_board = None
+        self.last_move = None
+
+    def get_open_sub_boards(self) -> list:
+        """ returns the sub-boards where the next move can be made
+
+        Returns:
+            list: bit numbers of the sub-boards
+        """
+        if self.game_status != "1":
+            return []
+        if self.next_sub_board is not None:
+            return [self.next_sub_board]
+        return [sub_board for sub_board, status in enumerate(self.sub_board_statuses) if status == "1"]
+
+    def get_legal_moves(self) -> list:
+        """ returns all the moves which can be made now (only the free fields of the open sub-boards are checked)
+
+        Returns:
+            list: (sub-board, cell) pairs
+        """
+        return [(sub_board, cell) for sub_board in self.get_open_sub_boards() for cell in self.sub_boards[sub_board].get_free_cells()]
+
+    def is_legal_move(self, sub_board: int, cell: int) -> bool:
+        """ returns true if the move can be made now
+
+        Args:
+            sub_board (int): bit number of the sub-board in the grid
+            cell (int): bit number of the field in the sub-board
+
+        Returns:
+            bool: if the move is legal
+        """
+        return sub_board in self.get_open_sub_boards() and self.sub_boards[sub_board].free_cell_indexes[cell] != -1
+
+    def make_move(self, name: str, sub_board: int, cell: int):
+        """ makes the move, then updates the status of its sub-board (and of the whole game if the sub-board got closed) and the next sub-board
+
+        Args:
+            name (str): player name (X, O)
+            sub_board (int): bit number of the sub-board in the grid
+            cell (int): bit number of the field in the sub-board
+        """
+        if not self.is_legal_move(sub_board, cell):
+            raise ValueError("the field {} of the sub-board {} can not be played now".format(cell + 1, sub_board + 1))
+        board = self.sub_boards[sub_board]
+        board.update_with_field_ID(name, cell + 1)
+        self.last_move = (sub_board, cell)
+        self.gm.evaluate_the_last_move(board)
+        status = self.sub_board_statuses[sub_board] = self.gm.get_the_game_status()
+        if status != "1":
+            if status != "0":
+                self.meta_board.update_with_field_ID(name, sub_board + 1)
+                self.gm.evaluate_the_last_move(self.meta_board)
+                if self.gm.get_the_game_status() not in ["0", "1"]:
+                    self.game_status = name
+            if self.game_status == "1" and "1" not in self.sub_board_statuses:
+                self.game_status = "0"
+        self.next_sub_board = cell if self.sub_board_statuses[cell] == "1" else None
+
+    def update_with_coords(self, name: str, coords: tuple):
+        """ makes the move given by the global coordinates (see make_move)
+
+        Args:
+            name (str): player name (X, O)
+            coords (tuple): (row, col) on the 9x9 grid
+        """
+        self.make_move(name, *UltimateBoard.get_sub_board_and_cell(coords))
+
+    def get_game_status(self) -> str:
+        """ returns the status of the whole game
+
+        Returns:
+            str: '1' for ongoing game, '0' for draw, otherwise the winner's name
+        """
+        return self.game_status
+
+    def get_bitboards(self, name: str) -> list:
+        """ returns the bitboards of the player's fields of all the sub-boards
+
+        Args:
+            name (str): player name (X, O)
+
+        Returns:
+            list: 9 bitboards (see Bitboard module)
+        """
+        return [sub_board.get_bitboard(name) for sub_board in self.sub_boards]
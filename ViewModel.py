@@ -0,0 +1,69 @@
+class ViewModel:
+
+    def __init__(self, window):
+        """ initializes a new instance of the ViewModel class - the last rendered state of the window's elements (tiles, labels, buttons).
+            The changes are collected by set, and render pushes only the properties which differ from the rendered ones, once per frame,
+            so the elements which did not change are not updated at all (which matters on the big boards)
+
+        Args:
+            window (sg.Window): window with the elements
+        """
+        self.window = window
+        # key: {property: value} of what the element shows now, and of what it should show after the next render
+        self.rendered = {}
+        self.pending = {}
+
+    def track(self, key, **properties):
+        """ records the state the element already has (e.g. given in the layout), without updating it
+
+        Args:
+            key: key of the element
+            properties: its properties (the keyword arguments of the element's update method)
+        """
+        self.rendered.setdefault(key, {}).update(properties)
+
+    def set(self, key, **properties):
+        """ sets the state of the element, rendered on the next render (a property set back to its rendered value is not updated at all)
+
+        Args:
+            key: key of the element
+            properties: its properties (the keyword arguments of the element's update method, e.g. text, value, disabled, button_color)
+        """
+        rendered = self.rendered.get(key, {})
+        pending = self.pending.get(key)
+        for name, value in properties.items():
+            if name in rendered and rendered[name] == value:
+                if pending is not None:
+                    pending.pop(name, None)
+            else:
+                if pending is None:
+                    pending = self.pending[key] = {}
+                pending[name] = value
+
+    def get(self, key, name: str):
+        """ returns the property of the element as it will be after the next render
+
+        Args:
+            key: key of the element
+            name (str): name of the property
+
+        Returns:
+            value of the property (None if it was never tracked nor set)
+        """
+        pending = self.pending.get(key, {})
+        return pending[name] if name in pending else self.rendered.get(key, {}).get(name)
+
+    def render(self):
+        """ updates the elements with the properties changed since the last render (one update call per changed element)
+
+        Returns:
+            int: number of the updated elements
+        """
+        pending, self.pending = self.pending, {}
+        updated = 0
+        for key, properties in pending.items():
+            if properties:
+                self.window[key].update(**properties)
+                self.rendered.setdefault(key, {}).update(properties)
+                updated += 1
+        return updated
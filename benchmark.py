@@ -0,0 +1,276 @@
+""" benchmarks of the AI and game status hot paths. Every benchmark runs on the fixed positions, so the runs can be compared:
+
+    python benchmark.py run --output before.json
+    python benchmark.py run --output after.json
+    python benchmark.py compare before.json after.json --threshold 0.1
+
+compare exits with the code 1 if any benchmark got slower by more than the threshold (10% by default).
+Allocations are measured with tracemalloc: the peak of the memory allocated during one call and the number of the memory blocks left after it.
+"""
+from AI import AI
+from Board import Board
+from GameMaster import GameMaster
+from TranspositionTable import TranspositionTable
+
+import argparse
+import datetime
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+# fixed 3x3 positions (the AI is X and moves second)
+POSITIONS = [
+    [[" ", " ", " "], [" ", " ", " "], [" ", " ", " "]],
+    [["O", " ", " "], [" ", " ", " "], [" ", " ", " "]],
+    [[" ", " ", " "], [" ", "O", " "], [" ", " ", " "]],
+    [["O", " ", " "], [" ", "X", " "], [" ", " ", "O"]],
+    [["O", "X", " "], [" ", "O", " "], [" ", " ", " "]],
+    [["O", "X", "O"], [" ", "X", " "], [" ", "O", " "]],
+]
+# position of the bigger board for the depth limited search (fields of O and X as (row, col))
+LARGE_BOARD = {"size": 5, "win_length": 4, "node_limit": 20000, "O": [(2, 2), (1, 3)], "X": [(1, 1)]}
+
+
+def _create_ai(**kwargs) -> AI:
+    return AI("X", "Player vs Smart Computer", TranspositionTable(), use_move_table = False, **kwargs)
+
+
+def _create_board(board_list: list) -> Board:
+    board = Board()
+    board.replace(board_list)
+    return board
+
+
+def _create_large_board() -> Board:
+    board = Board(LARGE_BOARD["size"], LARGE_BOARD["win_length"])
+    for name in ["O", "X"]:
+        for coords in LARGE_BOARD[name]:
+            board.update_with_coords(name, coords)
+    return board
+
+
+def bench_get_best_move():
+    """ AI.get_best_move on all the fixed positions with the empty transposition table """
+    boards = [_create_board(position) for position in POSITIONS]
+    def run():
+        nodes = 0
+        for board in boards:
+            ai = _create_ai()
+            ai.get_best_move(board, "O")
+            nodes += ai.get_search_stats().nodes
+        return nodes
+    return run, run
+
+
+def bench_minimax():
+    """ one AI.minimax call (the root move in the corner) from all the fixed positions with the empty transposition table """
+    roots = []
+    for position in POSITIONS:
+        board = _create_board(position)
+        ai_bits, opponent_bits = board.get_bitboard("X"), board.get_bitboard("O")
+        cell = next(cell for cell in range(9) if not (ai_bits | opponent_bits) >> cell & 1)
+        roots.append((ai_bits | 1 << cell, opponent_bits, cell))
+    def run():
+        nodes = 0
+        for ai_bits, opponent_bits, cell in roots:
+            ai = _create_ai()
+            context = ai.create_search_context("minimax")
+            ai.minimax(context, ai_bits, opponent_bits, 0, -math.inf, math.inf, False, cell)
+            nodes += context.stats.nodes
+        return nodes
+    return run, run
+
+
+def bench_get_best_move_limited():
+    """ AI.get_best_move with the iterative deepening search and the node limit on the bigger board """
+    board = _create_large_board()
+    def run():
+        ai = _create_ai(size = LARGE_BOARD["size"], win_length = LARGE_BOARD["win_length"], node_limit = LARGE_BOARD["node_limit"])
+        ai.get_best_move(board, "O")
+        return ai.get_search_stats().nodes
+    return run, run
+
+
+def bench_evaluate_the_game_status():
+    """ GameMaster.evaluate_the_game_status on all the fixed positions """
+    gm = GameMaster()
+    def call():
+        for position in POSITIONS:
+            gm.evaluate_the_game_status(position)
+    return call, None
+
+
+def bench_board_move_and_undo():
+    """ Board.update_with_coords with the move and with " " (undo) on every field of the empty board """
+    board = Board()
+    coords = [(row, col) for row in range(3) for col in range(3)]
+    def call():
+        for field in coords:
+            board.update_with_coords("X", field)
+            board.update_with_coords(" ", field)
+    return call, None
+
+
+def bench_get_random_move():
+    """ AI.get_random_move on all the fixed positions """
+    ai = AI("X", "Player vs Random Computer")
+    def call():
+        for position in POSITIONS:
+            ai.get_random_move(position)
+    return call, None
+
+
+BENCHMARKS = {
+    "ai_get_best_move": bench_get_best_move,
+    "ai_minimax": bench_minimax,
+    "ai_get_best_move_limited": bench_get_best_move_limited,
+    "game_master_evaluate_the_game_status": bench_evaluate_the_game_status,
+    "board_move_and_undo": bench_board_move_and_undo,
+    "ai_get_random_move": bench_get_random_move,
+}
+
+
+def measure(call, count_nodes, min_time: float = 0.2, repeats: int = 5) -> dict:
+    """ times the call (the median of the repeats, each of them running the call for at least min_time) and measures its allocations
+
+    Args:
+        call (function): benchmarked call
+        count_nodes (function): the same call returning the number of the searched nodes (None if there is no search)
+        min_time (float): minimal time of one repeat in seconds
+        repeats (int): number of repeats
+
+    Returns:
+        dict: seconds_per_call, calls_per_second, nodes_per_call, nodes_per_second, peak_bytes_per_call, net_blocks_per_call
+    """
+    call()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+    timings = [elapsed / number]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        timings.append((time.perf_counter() - start) / number)
+    seconds_per_call = statistics.median(timings)
+
+    tracemalloc.start()
+    call()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    blocks_before = len(tracemalloc.take_snapshot().traces)
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    blocks_after = len(tracemalloc.take_snapshot().traces)
+    tracemalloc.stop()
+
+    result = {
+        "seconds_per_call": seconds_per_call,
+        "calls_per_second": 1 / seconds_per_call,
+        "peak_bytes_per_call": peak - before,
+        "net_blocks_per_call": blocks_after - blocks_before,
+    }
+    if count_nodes is not None:
+        nodes = count_nodes()
+        result["nodes_per_call"] = nodes
+        result["nodes_per_second"] = nodes / seconds_per_call
+    return result
+
+
+def run(names: list = None, min_time: float = 0.2, repeats: int = 5) -> dict:
+    """ runs the benchmarks
+
+    Args:
+        names (list): names of the benchmarks to be run (all of them if None)
+        min_time (float): minimal time of one repeat in seconds
+        repeats (int): number of repeats
+
+    Returns:
+        dict: environment and results of every benchmark
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        call, count_nodes = BENCHMARKS[name]()
+        results[name] = measure(call, count_nodes, min_time, repeats)
+    return {
+        "created": datetime.datetime.now().isoformat(timespec = "seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": results,
+    }
+
+
+def compare(old: dict, new: dict, threshold: float) -> list:
+    """ compares two runs
+
+    Args:
+        old (dict): results of the older run
+        new (dict): results of the newer run
+        threshold (float): relative slowdown counted as the regression (0.1 for 10%)
+
+    Returns:
+        list: (name, old seconds per call, new seconds per call, relative change, is regression) for the benchmarks present in both runs
+    """
+    rows = []
+    for name, new_result in new["benchmarks"].items():
+        old_result = old["benchmarks"].get(name)
+        if old_result is None:
+            continue
+        change = new_result["seconds_per_call"] / old_result["seconds_per_call"] - 1
+        rows.append((name, old_result["seconds_per_call"], new_result["seconds_per_call"], change, change > threshold))
+    return rows
+
+
+def format_results(results: dict) -> str:
+    lines = ["{:<40} {:>14} {:>16} {:>12} {:>10}".format("benchmark", "us per call", "nodes per s", "peak bytes", "net blocks")]
+    for name, result in results["benchmarks"].items():
+        nodes_per_second = "{:.0f}".format(result["nodes_per_second"]) if "nodes_per_second" in result else "-"
+        lines.append("{:<40} {:>14.2f} {:>16} {:>12} {:>10}".format(
+            name, result["seconds_per_call"] * 1e6, nodes_per_second, result["peak_bytes_per_call"], result["net_blocks_per_call"]))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Benchmarks of the AI and game status hot paths.")
+    subparsers = parser.add_subparsers(dest = "command", required = True)
+    run_parser = subparsers.add_parser("run", help = "run the benchmarks")
+    run_parser.add_argument("--output", help = "JSON file for the results")
+    run_parser.add_argument("--only", nargs = "+", choices = sorted(BENCHMARKS), help = "run only these benchmarks")
+    run_parser.add_argument("--min-time", type = float, default = 0.2, help = "minimal time of one repeat in seconds")
+    run_parser.add_argument("--repeats", type = int, default = 5)
+    compare_parser = subparsers.add_parser("compare", help = "compare two saved runs")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type = float, default = 0.1, help = "relative slowdown counted as the regression")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run(args.only, args.min_time, args.repeats)
+        print(format_results(results))
+        if args.output:
+            with open(args.output, "w") as file:
+                json.dump(results, file, indent = 2)
+        return 0
+
+    with open(args.old) as file:
+        old = json.load(file)
+    with open(args.new) as file:
+        new = json.load(file)
+    rows = compare(old, new, args.threshold)
+    for name, old_seconds, new_seconds, change, is_regression in rows:
+        print("{:<40} {:>12.2f} us -> {:>12.2f} us {:>+8.1%}{}".format(name, old_seconds * 1e6, new_seconds * 1e6, change, "  REGRESSION" if is_regression else ""))
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,73 +1,201 @@
 import PySimpleGUI as sg
+import os
+import threading
 from Board import Board
 from AI import AI
+from Exceptions import SearchLimitError
 from GameMaster import GameMaster
+from GameRecord import GameRecord, GameRecordWriter, GAME_MODE_KINDS, get_result
+from ViewModel import ViewModel
+import Profiler
 
 main_color = "LightGrey"
 other_color = "DarkBlue"
 
 class GameWindow:
+    #title and margins of the window
+    title = "Tic Tac Toe"
+    margins = (88,22)
 
-    def __init__(self, game_mode: str, player_1_name: str, player_2_name: str):
+    def __init__(self, game_mode: str, player_1_name: str, player_2_name: str, size: int = 3, win_length: int = 3, show_search_stats: bool = False,
+                 record_path: str = None):
         """ initializes an instance of the GameWindow object, sets the board, player, game mode, players names, object for AI, layout, theme and window
 
         Args:
-            game_mode (str): 'Player vs Player', 'Player vs Random Computer' or 'Player vs Smart Computer'
+            game_mode (str): 'Player vs Player', 'Player vs Random Computer', 'Player vs Smart Computer' or 'Player vs MCTS Computer'
             player_1_name (str): name of the first player (preferably 'O')
             player_2_name (str): name of the second player (preferably 'X')
+            size (int): number of rows (and columns) of the board
+            win_length (int): number of fields in a line needed to win
+            show_search_stats (bool): show the debug panel with the counters of the AI's last search
+            record_path (str): file where every finished game is appended (see GameRecord module), the games are not saved if not provided
         """
 
+        self.size = size
+        self.win_length = win_length
         self.board = {}
+        #the same board kept as the bitboards, updated with every move
+        self.game_board = self.create_the_game_board()
         #0 for player1, 1 for player2 (AI is always player2)
         self.player = 0
-        #Player vs Player, Player vs Random Computer or Player vs Smart Computer
+        #Player vs Player, Player vs Random Computer, Player vs Smart Computer or Player vs MCTS Computer
         self.game_mode = game_mode 
         self.player_1_name = player_1_name
         self.player_2_name = player_2_name
-        #AI
-        self.computer = AI(player_2_name, self.game_mode)
+        self.show_search_stats = show_search_stats
+        self.computer = self.create_the_computer()
+
+        #thread searching the computer move or the hint (None when the computer is not thinking) and the number of the search,
+        #so the result of the cancelled search is ignored
+        self.computer_thread = None
+        self.computer_search_ID = 0
+        #event stopping the search of the computer move or the hint (a new one for every search)
+        self.computer_stop_event = None
+
+        #field IDs of the moves of the current game and the writer saving the finished games
+        self.moves = []
+        self.record_writer = None if record_path is None else GameRecordWriter(record_path)
+
+        #'1' for ongoing game, '0' for draw, otherwise the winner's name
+        self.game_status = "1"
+        #if the free tiles show the evaluation of the moves (the hint), and the player info shown before the hint was asked for
+        self.hint_shown = False
+        self.player_info_before_hint = None
 
         self.players_names_validation()
 
         #buttons
         next_turn_button = [sg.Button('Next Turn', size = (44,1), visible = (False if self.game_mode == "Player vs Player" else True), disabled = True, pad = 5, key = "next_turn_button", button_color = main_color)]
-        reset_button = sg.Button('Reset', size = (13,2), pad = 5, button_color = other_color)
-        change_mode_button = sg.Button("Change mode", size = (13,2), pad = 5, button_color = other_color)
-        leave_button = sg.Button("Leave", size = (13,2), pad = 5, button_color = other_color)
-
-        tiles_buttons = [[sg.Button(size=(13, 5), key = (row, col), button_color = main_color) for col in range(3)] for row in range(3)]
+        tiles_buttons = self.create_the_tiles_buttons()
 
         #texts
-        game_mode_info = [sg.Text(self.game_mode, font = "Any 20", key = "mode_info", pad = 5, justification = "center")]
+        game_mode_info = [sg.Text(self.get_game_mode_info(), font = "Any 20", key = "mode_info", pad = 5, justification = "center")]
         player_info = [sg.Text("Player 1 move!", font = "Any 20", key = "player_info", pad = 5, justification = "center")]
+        search_stats_info = [sg.Text("", font = "Any 10", key = "search_stats", pad = 5, visible = show_search_stats and self.game_mode != "Player vs Player")]
 
         self.layout = [
             game_mode_info,
             player_info,
             next_turn_button,
             tiles_buttons,
-            [reset_button, change_mode_button, leave_button]
+            search_stats_info,
+            self.create_the_bottom_buttons()
         ]
         
         sg.theme('LightGrey')
-        self.window = sg.Window("Tic Tac Toe", self.layout, use_default_focus = False, margins = (88,22), finalize = True)
+        self.window = sg.Window(self.title, self.layout, use_default_focus = False, margins = self.margins, finalize = True)
+        self.create_the_view([(row, col) for row in range(size) for col in range(size)])
+        self.start_profiling()
+
+    def create_the_game_board(self) -> Board:
+        """ creates the board of the game, kept as the bitboards and updated with every move
+
+        Returns:
+            Board: empty board of the window's size and win length
+        """
+        return Board(self.size, self.win_length)
+
+    def create_the_computer(self) -> AI:
+        """ creates the computer player of the game mode (on the boards bigger than 3x3 the full search is too slow,
+            so the AI gets the time limit per move and searches on all the CPU cores)
+
+        Returns:
+            AI: computer player (the second player)
+        """
+        is_classic_board = (self.size, self.win_length) == (3, 3)
+        return AI(self.player_2_name, self.game_mode, size = self.size, win_length = self.win_length,
+                  time_limit = None if is_classic_board else AI.DEFAULT_TIME_LIMIT,
+                  workers = 1 if is_classic_board else (os.cpu_count() or 1))
+
+    def create_the_tiles_buttons(self) -> list:
+        """ creates the rows of the tiles buttons keyed with their coordinates (the tiles get smaller with the bigger boards,
+            so the window keeps roughly the same size)
+
+        Returns:
+            list: rows of the layout with the tiles
+        """
+        tile_size = (max(3, 39 // self.size), max(1, 15 // self.size))
+        return [[sg.Button(size = tile_size, key = (row, col), button_color = main_color) for col in range(self.size)] for row in range(self.size)]
+
+    def create_the_bottom_buttons(self) -> list:
+        """ creates the buttons below the board: reset, change mode, leave and hint
+
+        Returns:
+            list: row of the layout with the buttons
+        """
+        return [sg.Button(text, size = (13,2), pad = 5, button_color = other_color) for text in ["Reset", "Change mode", "Leave", "Hint"]]
+
+    def create_the_view(self, tiles: list):
+        """ creates the view model of the window (see ViewModel module) with the state of the tiles and labels given in the layout,
+            so only their changes are pushed to the window, once per frame
+
+        Args:
+            tiles (list): keys of the tiles buttons
+        """
+        self.view = ViewModel(self.window)
+        for tile in tiles:
+            self.view.track(tile, text = "", disabled = False, button_color = main_color)
+        self.view.track("next_turn_button", disabled = True, button_color = main_color)
+        self.view.track("mode_info", value = self.get_game_mode_info())
+        self.view.track("player_info", value = "Player 1 move!")
+        self.view.track("search_stats", value = "")
+
+    def start_profiling(self):
+        """ if the profiling is enabled (see Profiler module), wraps the turns of the window, the methods of the event loop, the board conversion,
+            the widget updates and the computer's move search, so their latency is counted
+        """
+        self.profiler = Profiler.get_profiler()
+        if self.profiler is None:
+            return
+        self.profiler.wrap_turns(self.window)
+        for name in ["event_loop", "computer_turn", "check_the_game_status", "convert_board_to_list", "update_the_tile_AI", "update_the_tile_human",
+                     "prepare_the_board_for_next_turn", "switch_turn", "show_the_hint", "finish_the_hint", "reset"]:
+            self.profiler.wrap(self, name)
+        self.profiler.wrap(self.view, "render")
+        #the search runs in the background thread, so it is profiled apart from the turns
+        for name in ["get_player_move", "get_player_move_on_board", "analyze"]:
+            if hasattr(self.computer, name):
+                self.profiler.wrap(self.computer, name, profile = True)
 
     #game loop
     def event_loop(self):
-        """ game (event) loop. Event are: leaving the game, resetting the game, changing game mode, clicking on one of the tiles or AI choosing one of the tile
+        """ game (event) loop. Event are: leaving the game, resetting the game, changing game mode, clicking on one of the tiles or AI choosing one of the tile.
+        The computer move is searched in the background thread, which sends it back as the "computer_move" event, so the window stays responsive.
+        The changes of the tiles and labels made while handling the event are pushed to the window at once, before waiting for the next one
         """
 
         while True:
-            event = self.window.read()[0]
+            self.view.render()
+            event, values = self.window.read()
 
             if event == "Leave" or event == sg.WIN_CLOSED:
+                self.cancel_computer_turn(wait = event == "Leave")
                 exit()
                 
             elif event == "Reset":
+                self.cancel_computer_turn()
                 self.reset()
 
             elif event == "Change mode":
+                self.cancel_computer_turn(wait = True)
                 break
+
+            #the background search has found the computer move
+            elif event == "computer_move":
+                self.finish_computer_turn(*values[event])
+
+            #the background analysis of the hint has finished
+            elif event == "hint":
+                self.finish_the_hint(*values[event])
+
+            #the hint is shown only on the human player's turn of the ongoing game
+            elif event == "Hint":
+                if self.computer_thread is None and self.game_status == "1" and not (self.player and self.game_mode != "Player vs Player"):
+                    self.show_the_hint()
+
+            #the computer is still thinking
+            elif self.computer_thread is not None:
+                pass
             
             #player2 turn and player2 == computer player
             elif self.player and self.game_mode != "Player vs Player":
@@ -77,18 +205,59 @@ class GameWindow:
             elif event not in self.board:
                 self.next_player_turn(event)
 
-            #refresh
-            else:
-                self.window.read(timeout=400)
-
     ## methods
 
     def computer_turn(self):
+        """ starts the computer (AI) turn: the move is searched in the background thread on the copy of the board
+        """
+        self.view.set("next_turn_button", disabled = True)
+        self.view.set("player_info", value = "Computer is thinking...")
+        self.computer_stop_event = threading.Event()
+        self.computer_search_ID += 1
+        self.computer_thread = threading.Thread(target = self.search_computer_move, daemon = True,
+                                                args = (self.game_board.copy(), self.computer_search_ID, self.computer_stop_event))
+        self.computer_thread.start()
+
+    def search_computer_move(self, board: Board, search_ID: int, stop_event: threading.Event):
+        """ searches the computer move (run in the background thread) and sends it to the event loop
+
+        Args:
+            board (Board): copy of the game board
+            search_ID (int): number of the search
+            stop_event (threading.Event): event stopping the search
+        """
+        event = self.computer.get_player_move_on_board(board, self.player_1_name, stop_event)
+        self.window.write_event_value("computer_move", (event, search_ID))
+
+    def finish_computer_turn(self, event: tuple, search_ID: int):
         """ computer (AI) turn in which one of the tile is updated and the board is evaluated, and then player switched
+
+        Args:
+            event (tuple): coordinates of the computer choice
+            search_ID (int): number of the search which found the move (the move of the cancelled search is ignored)
         """
-        self.update_the_tile_AI()
+        if search_ID != self.computer_search_ID:
+            return
+        self.computer_thread = None
+        self.update_the_tile_AI(event)
         self.evaluate_the_board()
 
+    def cancel_computer_turn(self, wait: bool = False):
+        """ stops the search of the computer move or the hint if there is one (its result will be ignored by its search ID). The thread is not
+            joined: it sends its result by write_event_value, which waits for the GUI thread, so joining it from the GUI thread would freeze
+            the window
+
+        Args:
+            wait (bool): read the window until the thread ends (before the window and the computer are closed)
+        """
+        if self.computer_thread is None:
+            return
+        self.computer_stop_event.set()
+        self.computer_search_ID += 1
+        thread, self.computer_thread = self.computer_thread, None
+        while wait and thread.is_alive():
+            self.window.read(timeout = 10)
+
     def next_player_turn(self, event):
         """ human player turn in which one of the tile is updated and the board is evaluated, and then player switched
 
@@ -98,12 +267,18 @@ class GameWindow:
         self.update_the_tile_human(event)
         self.evaluate_the_board()
 
-    def update_the_tile_AI(self):
+    def update_the_tile_AI(self, event):
         """ updates the tile with the AI name and disables it
+
+        Args:
+            event (tuple): coordinates of the computer choice
         """
-        event = self.computer.get_player_move(self.convert_board_to_list(), self.player_1_name)
         self.board[event] = self.player
-        self.window[event].update(self.player_2_name, disabled = True, button_color = "Black")
+        self.game_board.update_with_coords(self.player_2_name, event)
+        self.moves.append(Board.get_field_ID(event, self.size))
+        self.view.set(event, text = self.player_2_name, disabled = True, button_color = "Black")
+        if self.show_search_stats:
+            self.view.set("search_stats", value = self.computer.get_search_stats().format())
 
     def update_the_tile_human(self, event):
         """ updates the tile with the player name and disables it
@@ -112,11 +287,76 @@ class GameWindow:
             event (tuple): coordinates of the player choice
         """
         self.board[event] = self.player
-        self.window[event].update(self.player_2_name if self.player else self.player_1_name, disabled = True, button_color = ("Black" if self.player else "Purple"))
+        self.game_board.update_with_coords(self.player_2_name if self.player else self.player_1_name, event)
+        self.moves.append(Board.get_field_ID(event, self.size))
+        self.view.set(event, text = self.player_2_name if self.player else self.player_1_name, disabled = True, button_color = ("Black" if self.player else "Purple"))
+
+    def show_the_hint(self):
+        """ starts the analysis of the hint: the position is analyzed in the background thread on the copy of the board, as the computer move
+        """
+        name, opponent_name = (self.player_2_name, self.player_1_name) if self.player else (self.player_1_name, self.player_2_name)
+        self.player_info_before_hint = self.view.get("player_info", "value")
+        self.view.set("player_info", value = "Looking for the hint...")
+        self.computer_stop_event = threading.Event()
+        self.computer_search_ID += 1
+        self.computer_thread = threading.Thread(target = self.search_the_hint, daemon = True,
+                                                args = (self.game_board.copy(), name, opponent_name, self.computer_search_ID, self.computer_stop_event))
+        self.computer_thread.start()
+
+    def search_the_hint(self, board: Board, name: str, opponent_name: str, search_ID: int, stop_event: threading.Event):
+        """ analyzes the position (run in the background thread) and sends the analysis to the event loop
+
+        Args:
+            board (Board): copy of the game board
+            name (str): name of the player to move
+            opponent_name (str): name of the other player
+            search_ID (int): number of the search
+            stop_event (threading.Event): event stopping the analysis
+        """
+        try:
+            analysis = self.computer.analyze(board, name, opponent_name, stop_event)
+        except SearchLimitError:
+            analysis = None
+        self.window.write_event_value("hint", (analysis, search_ID))
+
+    def finish_the_hint(self, analysis: dict, search_ID: int):
+        """ shows the evaluation of every free tile for the player to move (see AI.analyze): W (win), D (draw) or L (loss) with the number of moves
+            to the end of the game, the best moves in the brackets. On the bigger boards without the tablebase the analysis may not finish in time
+
+        Args:
+            analysis (dict): analysis of the position (None if it did not finish in time)
+            search_ID (int): number of the search which analyzed the position (the analysis of the cancelled search is ignored)
+        """
+        if search_ID != self.computer_search_ID:
+            return
+        self.computer_thread = None
+        if self.show_search_stats:
+            self.view.set("search_stats", value = self.computer.get_search_stats().format())
+        if analysis is None:
+            self.view.set("player_info", value = "No hint, the position is too big.")
+            return
+        self.view.set("player_info", value = self.player_info_before_hint)
+        if not analysis:
+            return
+        best_rank = max(AI.get_move_rank(*entry) for entry in analysis.values())
+        for coords, (score, distance) in analysis.items():
+            text = "{}{}".format({1: "W", 0: "D", -1: "L"}[score], distance)
+            self.view.set(coords, text = "[{}]".format(text) if AI.get_move_rank(score, distance) == best_rank else text)
+        self.hint_shown = True
+
+    def clear_the_hint(self):
+        """ clears the evaluation from the free tiles
+        """
+        if not self.hint_shown:
+            return
+        for cell in self.game_board.get_free_cells():
+            self.view.set(self.game_board.geometry.get_coordinates_of_cell(cell), text = " ")
+        self.hint_shown = False
 
     def evaluate_the_board(self):
-        """ prepares the board for the next turn, switches the turn and checks if game is draw or if someone winned
+        """ clears the hint, prepares the board for the next turn, switches the turn and checks if game is draw or if someone winned
         """
+        self.clear_the_hint()
         self.prepare_the_board_for_next_turn()
         self.switch_turn()
         self.check_the_game_status()
@@ -128,7 +368,7 @@ class GameWindow:
         if self.player and self.game_mode != "Player vs Player":
             self.enable_the_tiles_buttons_disable_next_turn_button()
         else:
-            self.window["next_turn_button"].update(disabled = False, button_color = other_color)
+            self.view.set("next_turn_button", disabled = False, button_color = other_color)
             if self.game_mode != "Player vs Player":
                 self.disable_the_tile_buttons()
 
@@ -136,64 +376,82 @@ class GameWindow:
         """ changes the current player and updates the player info in the window
         """
         self.player = 1 - self.player
-        self.window['player_info'].update("Player {} move!".format(str(self.player+1)))
+        self.view.set("player_info", value = "Player {} move!".format(str(self.player+1)))
 
     def check_the_game_status(self):
         """ checks if game is draw or someone has winned and if so stop the game and show appropriate message
         """
-        gm = GameMaster() 
-        gm.evaluate_the_game_status(self.convert_board_to_list())
+        gm = GameMaster(self.size, self.win_length)
+        gm.evaluate_the_last_move(self.game_board)
         game_status = gm.get_the_game_status()
+        if game_status != "1":
+            self.save_the_game(game_status)
+        self.show_the_game_result(game_status)
+
+    def show_the_game_result(self, game_status: str):
+        """ if the game is draw or someone has winned, stops the game and shows appropriate message
+
+        Args:
+            game_status (str): '1' for ongoing game, '0' for draw, otherwise the winner's name
+        """
+        self.game_status = game_status
         if game_status == "0":
-            self.window['mode_info'].update("Draw!        ")
-            self.window['player_info'].update("Nobody wins.")
+            self.view.set("mode_info", value = "Draw!        ")
+            self.view.set("player_info", value = "Nobody wins.")
             self.disable_the_board()
-        elif game_status == "1":
-            pass
-        else:
-            self.window['mode_info'].update("Game over!    ")
-            self.window['player_info'].update("Player {} wins!".format("1" if game_status == self.player_1_name else "2"))
+        elif game_status != "1":
+            self.view.set("mode_info", value = "Game over!    ")
+            self.view.set("player_info", value = "Player {} wins!".format("1" if game_status == self.player_1_name else "2"))
             self.disable_the_board()
 
+    def save_the_game(self, game_status: str):
+        """ appends the finished game to the game records file (if the games are saved)
+
+        Args:
+            game_status (str): '0' for draw, otherwise the winner's name
+        """
+        if self.record_writer is None:
+            return
+        self.record_writer.write(GameRecord(*GAME_MODE_KINDS[self.game_mode], get_result(game_status, self.player_1_name, self.player_2_name),
+                                            self.size, self.win_length, self.moves))
+
+    def close(self):
+        """ closes the window, the computer player and the game records file
+        """
+        if self.profiler is not None:
+            self.profiler.finish_turn()
+        self.window.close()
+        self.computer.close()
+        if self.record_writer is not None:
+            self.record_writer.close()
+
     def convert_board_to_list(self) -> list:
         """ converts the board used by game window (which is dict with pairs: coords(tuple): player (0 or 1)) to pythonic 2D 9-grid list with board's fields
-        (to help evaluate the board in the minimax algorithm method)
+        (the game itself is evaluated on the bitboards of the game_board, the list is built from them only on demand)
 
         Returns:
             list: pythonic 2D 9-grid list with board's fields 
         """
-        board = Board()
-        for coords, player in self.board.items():
-            if player:
-                player_tag = self.player_2_name 
-            else:
-                player_tag = self.player_1_name
-            board.update_with_coords(player_tag, coords)
-        return board.board
+        return self.game_board.board
     
     def disable_the_board(self):
         """ disables the next turn button and tiles buttons
         """
-        self.window["next_turn_button"].update(disabled = True, button_color = main_color)
+        self.view.set("next_turn_button", disabled = True, button_color = main_color)
         self.disable_the_tile_buttons()
 
     def disable_the_tile_buttons(self):
-        """ disables the tiles buttons
+        """ disables the tiles buttons (only the empty ones, the taken tiles are disabled when they are taken)
         """
-        for row in range(3):
-            for col in range(3):
-                self.window[(row, col)].update(disabled = True)
+        for cell in self.game_board.get_free_cells():
+            self.view.set(self.game_board.geometry.get_coordinates_of_cell(cell), disabled = True)
 
     def enable_the_tiles_buttons_disable_next_turn_button(self):
         """ enables the tiles buttons but disables the next turn button
         """
-        self.window["next_turn_button"].update(disabled = True, button_color = other_color)
-        for row in range(3):
-            for col in range(3):
-                try:
-                    self.board[(row,col)]
-                except KeyError:
-                    self.window[(row, col)].update(disabled = False)
+        self.view.set("next_turn_button", disabled = True, button_color = other_color)
+        for cell in self.game_board.get_free_cells():
+            self.view.set(self.game_board.geometry.get_coordinates_of_cell(cell), disabled = False)
 
     def players_names_validation(self):
         """ if one at least one of player names are "0" or "1" they need to be changed in order to not interfere with GameMaster evaluate_the_game_status method
@@ -207,10 +465,24 @@ class GameWindow:
     def reset(self):
         """ resets the board and player attributes, next turn button and mode and player infos to their initial values, and cleans all the tiles buttons
         """
-        self.board, self.player = {}, 0
-        for row in range(3):
-            for col in range(3):
-                self.window[(row, col)].update(" ", disabled = False, button_color = main_color)
-        self.window["next_turn_button"].update(disabled = True)        
-        self.window['mode_info'].update(self.game_mode)
-        self.window['player_info'].update("Player 1 move!")
\ No newline at end of file
+        self.board, self.player, self.moves = {}, 0, []
+        self.game_status = "1"
+        self.hint_shown = False
+        self.game_board.reset()
+        for row in range(self.size):
+            for col in range(self.size):
+                self.view.set((row, col), text = " ", disabled = False, button_color = main_color)
+        self.view.set("next_turn_button", disabled = True)        
+        self.view.set("mode_info", value = self.get_game_mode_info())
+        self.view.set("player_info", value = "Player 1 move!")
+        self.view.set("search_stats", value = "")
+
+    def get_game_mode_info(self) -> str:
+        """ returns the game mode text, with the board size and win length if the board is not the classic one
+
+        Returns:
+            str: game mode info
+        """
+        if (self.size, self.win_length) == (3, 3):
+            return self.game_mode
+        return "{} ({}x{}, {} in a row)".format(self.game_mode, self.size, self.size, self.win_length)
\ No newline at end of file
@@ -0,0 +1,77 @@
+""" solves the 3x3 game with the AI minimax search (with the same depth tie-break) for every position in which the AI might be
+    asked for a move, and writes the results as the move table used by the AI (move_table.bin by default)
+"""
+from AI import AI
+from Board import Board
+from TranspositionTable import TranspositionTable
+import Bitboard
+import MoveTable
+
+import sys
+
+GEOMETRY = Bitboard.get_geometry(3, 3)
+
+
+def get_bits_of_position_index(index: int) -> tuple:
+    """ returns the bitboards of the position with the given move table index
+
+    Args:
+        index (int): position index
+
+    Returns:
+        tuple: ai_bits, opponent_bits
+    """
+    ai_bits, opponent_bits = 0, 0
+    for cell in range(GEOMETRY.cells):
+        index, value = divmod(index, 3)
+        if value == 1:
+            ai_bits |= 1 << cell
+        elif value == 2:
+            opponent_bits |= 1 << cell
+    return ai_bits, opponent_bits
+
+
+def is_position_to_solve(ai_bits: int, opponent_bits: int) -> bool:
+    """ returns true if it might be AI's turn in this position (AI started and both have the same number of fields
+        or opponent started and has one more) and the game is still ongoing
+
+    Args:
+        ai_bits (int): bitboard of the AI
+        opponent_bits (int): bitboard of the opponent
+
+    Returns:
+        bool: if the position should be in the table
+    """
+    ai_count, opponent_count = bin(ai_bits).count("1"), bin(opponent_bits).count("1")
+    if opponent_count - ai_count not in (0, 1):
+        return False
+    return not GEOMETRY.has_line(ai_bits) and not GEOMETRY.has_line(opponent_bits) and not GEOMETRY.is_full(ai_bits | opponent_bits)
+
+
+def solve() -> bytes:
+    """ runs the minimax search for every position to be solved
+
+    Returns:
+        bytes: move table entries
+    """
+    entries = bytearray([MoveTable.NO_ENTRY]) * MoveTable.ENTRIES
+    ai = AI("X", "Player vs Smart Computer", TranspositionTable(10 ** 6))
+    for index in range(MoveTable.ENTRIES):
+        ai_bits, opponent_bits = get_bits_of_position_index(index)
+        if not is_position_to_solve(ai_bits, opponent_bits):
+            continue
+        board = Board()
+        board.set_bitboards({"X": ai_bits, "O": opponent_bits})
+        row, col = ai.get_best_move(board, "O")
+        cell = row * GEOMETRY.size + col
+        # score of the chosen move, already in the transposition table
+        score = ai.minimax(ai.create_search_context("minimax"), ai_bits | 1 << cell, opponent_bits, 0, -float("inf"), float("inf"), False, cell)[0]
+        entries[index] = MoveTable.encode_entry(cell, score)
+    return bytes(entries)
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else MoveTable.DEFAULT_PATH
+    entries = solve()
+    MoveTable.write_table(path, entries)
+    print("{} positions written to {}".format(sum(entry != MoveTable.NO_ENTRY for entry in entries), path))
@@ -1,49 +1,108 @@
 import PySimpleGUI as sg
 from game_window import GameWindow
-
-sg.theme('LightGrey1')
+from ultimate_window import UltimateGameWindow
+from GameRecord import DEFAULT_PATH
 
 player1_name = "O"
 player2_name = "X"
 
 main_color = "DarkGrey"
 
-welcome_text = [
-            [sg.Text("Welcome to the Tic Tac Toe game!", font = "Any 25")],
-            [sg.Text("This is a two player game without the AI or in the player vs AI mode.", font = "Any 18")],
-            [sg.Text("Choose the game mode!", font = "Any 18")]
-]
+game_modes = ["Player vs Player", "Player vs Random Computer", "Player vs Smart Computer", "Player vs MCTS Computer"]
+board_sizes = list(range(3, 11))
+#buttons of the Ultimate Tic Tac Toe: game mode of the UltimateGameWindow
+ultimate_game_modes = {"Ultimate: Player vs Player": "Player vs Player", "Ultimate: Player vs Computer": "Player vs Ultimate Computer"}
+
+#the window is built by create_window (not on import), so the module can be imported without opening anything
+window = None
 
-pvp_button = [sg.Button("Player vs Player", font = "Any 15", size = (30,2))]
-pvr_button = [sg.Button("Player vs Random Computer", font = "Any 15", size = (30,2))]
-pvs_button = [sg.Button("Player vs Smart Computer", font = "Any 15", size = (30,2))]
-exit_button = [sg.Button("No, take me away!", font = "Any 14", size = (30,2), tooltip = "Press to exit")]
+def create_window():
+    """ builds the initial window with the game modes, custom board options and exit button
+
+    Returns:
+        sg.Window: initial window
+    """
+    sg.theme('LightGrey1')
+    welcome_text = [
+                [sg.Text("Welcome to the Tic Tac Toe game!", font = "Any 25")],
+                [sg.Text("This is a two player game without the AI or in the player vs AI mode.", font = "Any 18")],
+                [sg.Text("Choose the game mode!", font = "Any 18")]
+    ]
 
-options_layout = [
-            pvp_button, pvr_button, pvs_button, exit_button
-        ]
+    pvp_button = [sg.Button("Player vs Player", font = "Any 15", size = (30,2))]
+    pvr_button = [sg.Button("Player vs Random Computer", font = "Any 15", size = (30,2))]
+    pvs_button = [sg.Button("Player vs Smart Computer", font = "Any 15", size = (30,2))]
+    pvm_button = [sg.Button("Player vs MCTS Computer", font = "Any 15", size = (30,2), tooltip = "Computer playing with the Monte Carlo Tree Search")]
+    custom_board_options = [
+                sg.Text("Board size:", font = "Any 12"), sg.Combo(board_sizes, default_value = 3, key = "board_size", readonly = True, font = "Any 12"),
+                sg.Text("In a row:", font = "Any 12"), sg.Combo(board_sizes, default_value = 3, key = "win_length", readonly = True, font = "Any 12"),
+                sg.Combo(game_modes, default_value = game_modes[0], key = "custom_game_mode", readonly = True, font = "Any 12")
+    ]
+    ultimate_buttons = [sg.Button(button, font = "Any 12", size = (24,2), tooltip = "9 boards in one, your move decides where the opponent plays next") for button in ultimate_game_modes]
+    search_stats_checkbox = [sg.Checkbox("Show the search stats", key = "show_search_stats", font = "Any 12", tooltip = "Show how many positions the computer searched and how long it took")]
+    save_games_checkbox = [sg.Checkbox("Save the games", key = "save_games", font = "Any 12", tooltip = "Append every finished game to {} in the current directory".format(DEFAULT_PATH))]
+    custom_board_button = [sg.Button("Custom Board", font = "Any 15", size = (30,2), tooltip = "Play on the board of the chosen size, with the chosen number of fields in a row needed to win")]
+    exit_button = [sg.Button("No, take me away!", font = "Any 14", size = (30,2), tooltip = "Press to exit")]
 
-layout = [
-            welcome_text, [sg.Column(options_layout, expand_x=False, pad = 10)]
-        ]
+    options_layout = [
+                pvp_button, pvr_button, pvs_button, pvm_button, custom_board_options, custom_board_button, ultimate_buttons, search_stats_checkbox, save_games_checkbox, exit_button
+            ]
 
-window = sg.Window("Tic Tac Toe", layout, use_default_focus = False, margins=(150,150), element_justification='c')
+    layout = [
+                welcome_text, [sg.Column(options_layout, expand_x=False, pad = 10)]
+            ]
+
+    return sg.Window("Tic Tac Toe", layout, use_default_focus = False, margins=(150,150), element_justification='c')
 
 def event_loop():
-    """ event loop for initial window. Player has option to start one of the 3 game modes in game window or exit the initial window
+    """ event loop for initial window. Player has option to start one of the 4 game modes in game window (on the classic or custom board) or exit the initial window
         
     """
     while True:
-        event = window.read()[0]
-
-        if event in ["Player vs Player", "Player vs Random Computer", "Player vs Smart Computer"]:
-            window.Hide()
-            game_window = GameWindow (event, player1_name, player2_name)
-            game_window.event_loop()
-            game_window.window.close()
-            window.UnHide()
+        event, values = window.read()
+
+        if event in game_modes:
+            start_game(event, 3, 3, values["show_search_stats"], values["save_games"])
+
+        if event == "Custom Board":
+            if values["win_length"] > values["board_size"]:
+                sg.popup("The number of fields in a row can not be bigger than the board size.", title = "Tic Tac Toe")
+            else:
+                start_game(values["custom_game_mode"], values["board_size"], values["win_length"], values["show_search_stats"], values["save_games"])
+
+        if event in ultimate_game_modes:
+            start_game(ultimate_game_modes[event], 9, 3, values["show_search_stats"], ultimate = True)
             
         if event == sg.WIN_CLOSED or event == "No, take me away!":
             break
 
-event_loop()
\ No newline at end of file
+def start_game(game_mode: str, size: int, win_length: int, show_search_stats: bool = False, save_games: bool = False, ultimate: bool = False):
+    """ hides the initial window and plays in the game window until the player wants to change the mode
+
+    Args:
+        game_mode (str): 'Player vs Player', 'Player vs Random Computer', 'Player vs Smart Computer' or 'Player vs MCTS Computer' ('Player vs Player' or 'Player vs Ultimate Computer' for the Ultimate Tic Tac Toe)
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+        show_search_stats (bool): show the counters of the computer's search in the game window
+        save_games (bool): append the finished games to the game records file (DEFAULT_PATH of the GameRecord module)
+        ultimate (bool): play the Ultimate Tic Tac Toe (the size and the win length are not used then)
+    """
+    window.Hide()
+    if ultimate:
+        game_window = UltimateGameWindow (game_mode, player1_name, player2_name, show_search_stats)
+    else:
+        game_window = GameWindow (game_mode, player1_name, player2_name, size, win_length, show_search_stats, DEFAULT_PATH if save_games else None)
+    game_window.event_loop()
+    game_window.close()
+    window.UnHide()
+
+def main():
+    """ opens the initial window and runs its event loop until the player exits
+    """
+    global window
+    window = create_window()
+    event_loop()
+    window.close()
+
+if __name__ == "__main__":
+    main()
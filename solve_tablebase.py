@@ -0,0 +1,320 @@
+""" solves the whole game of the board offline by the retrograde analysis and writes the tablebase used by the AI (see TableBase module).
+    Usage examples:
+
+    python solve_tablebase.py solve --size 4 --win-length 4 --processes 8
+    python solve_tablebase.py verify --size 4 --win-length 4 --samples 200
+
+Every move adds one field, so the positions are solved layer by layer, from the full board back to the empty one: the value of a position
+with m occupied fields needs only the values of the layer m + 1, read from its memory-mapped file. Each layer is split into the chunks solved
+in a pool of processes. Every finished chunk and layer is written to the work directory first, so an interrupted run started again with the
+same arguments continues where it stopped.
+
+The 4x4 board has about 10 million positions (about 10 MB, a few minutes in one process). The 5x5 board has about 1.6 * 10^11 positions,
+which is far beyond what this tool can solve.
+"""
+from AI import AI
+from Board import Board
+from GameMaster import GameMaster
+from TableBase import PositionIndex, TableBase, encode_entry, write_table, get_default_path, LOSS, DRAW, WIN, NO_ENTRY
+import Bitboard
+
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+import argparse
+import math
+import mmap
+import os
+import random
+import time
+
+# positions solved by one task of the pool
+CHUNK_POSITIONS = 200000
+
+
+def get_layer_path(work_directory: str, layer: int) -> str:
+    return os.path.join(work_directory, "layer_{:02d}.bin".format(layer))
+
+
+def get_chunk_path(work_directory: str, layer: int, chunk: int) -> str:
+    return os.path.join(work_directory, "layer_{:02d}_chunk_{:05d}.bin".format(layer, chunk))
+
+
+def write_file(path: str, data: bytes):
+    """ writes the file at once (to the temporary file renamed at the end), so an interrupted run never leaves a half written checkpoint
+
+    Args:
+        path (str): path of the file
+        data (bytes): content
+    """
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(data)
+    os.replace(temporary_path, path)
+
+
+# state of the worker process: (size, win_length, layer) and the index, the geometry and the memory-mapped next layer
+_worker_key = None
+_worker_state = None
+
+
+def _get_worker_state(size: int, win_length: int, layer: int, work_directory: str) -> tuple:
+    """ returns the index, the geometry and the entries of the next layer (None for the full board), kept while the worker solves the same layer
+
+    Args:
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+        layer (int): number of the occupied fields
+        work_directory (str): directory of the checkpoints
+
+    Returns:
+        tuple: PositionIndex, Geometry, next layer entries (mmap or None)
+    """
+    global _worker_key, _worker_state
+    if _worker_key != (size, win_length, layer):
+        if _worker_state is not None and _worker_state[2] is not None:
+            _worker_state[2].close()
+        index = PositionIndex(size * size)
+        next_layer = None
+        if layer < size * size:
+            with open(get_layer_path(work_directory, layer + 1), "rb") as file:
+                next_layer = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+        _worker_key = (size, win_length, layer)
+        _worker_state = (index, Bitboard.get_geometry(size, win_length), next_layer)
+    return _worker_state
+
+
+def solve_chunk(task: tuple) -> tuple:
+    """ solves the positions of one chunk of the layer (run in the worker process) and writes them to the chunk file
+
+    Args:
+        task (tuple): size, win_length, layer, chunk, first and last (excluded) rank of the occupied fields, work_directory
+
+    Returns:
+        tuple: layer, chunk
+    """
+    size, win_length, layer, chunk, start, end, work_directory = task
+    index, geometry, next_layer = _get_worker_state(size, win_length, layer, work_directory)
+    full_mask, has_line, is_winning_move = geometry.full_mask, geometry.has_line, geometry.is_winning_move
+    first_count = index.first_counts[layer]
+    subset_count = index.subset_counts[layer]
+    next_subset_count = index.subset_counts[layer + 1] if next_layer is not None else 0
+    is_first_to_move = layer % 2 == 0
+    entries = bytearray()
+
+    occupied = index.unrank(start, layer)
+    for _ in range(start, end):
+        cells = [cell for cell in range(geometry.cells) if occupied >> cell & 1]
+        free_cells = geometry.get_free_cells(occupied)
+        # rank of the occupied fields after each move
+        next_ranks = {cell: index.rank(occupied | 1 << cell) * next_subset_count for cell in free_cells}
+        subset = (1 << first_count) - 1
+        for _ in range(subset_count):
+            first_bits = 0
+            for i, cell in enumerate(cells):
+                if subset >> i & 1:
+                    first_bits |= 1 << cell
+            second_bits = occupied ^ first_bits
+            mover_bits, other_bits = (first_bits, second_bits) if is_first_to_move else (second_bits, first_bits)
+            entries.append(solve_position(mover_bits, other_bits, occupied, free_cells, next_ranks, index, next_layer,
+                                          full_mask, has_line, is_winning_move, is_first_to_move))
+            # the next combination of the same number of bits (Gosper's hack), which is the next one in the colexicographic order
+            if subset:
+                lowest = subset & -subset
+                ripple = subset + lowest
+                subset = ripple | ((subset ^ ripple) >> 2) // lowest
+        # the next occupied fields
+        if occupied:
+            lowest = occupied & -occupied
+            ripple = occupied + lowest
+            occupied = ripple | ((occupied ^ ripple) >> 2) // lowest
+
+    write_file(get_chunk_path(work_directory, layer, chunk), bytes(entries))
+    return layer, chunk
+
+
+def solve_position(mover_bits: int, other_bits: int, occupied: int, free_cells: tuple, next_ranks: dict, index: PositionIndex, next_layer,
+                   full_mask: int, has_line, is_winning_move, is_first_to_move: bool) -> int:
+    """ returns the tablebase entry of one position from the entries of the positions after each move (the fastest win, else the draw,
+        else the slowest loss). The moves winning the game or filling the board are scored without the next layer
+
+    Args:
+        mover_bits (int): bitboard of the player to move
+        other_bits (int): bitboard of the other player
+        occupied (int): bitboard of both players
+        free_cells (tuple): bit numbers of the free fields
+        next_ranks (dict): cell: rank of the occupied fields after the move there, multiplied by the number of the subsets of the next layer
+        index (PositionIndex): position index
+        next_layer (mmap): entries of the next layer
+        full_mask (int), has_line (function), is_winning_move (function): of the board's geometry
+        is_first_to_move (bool): the player to move started
+
+    Returns:
+        int: entry
+    """
+    if has_line(mover_bits):
+        # the player to move can not have a line, the game would be over before
+        return NO_ENTRY
+    if has_line(other_bits):
+        return encode_entry(LOSS, 0)
+    if occupied == full_mask:
+        return encode_entry(DRAW, 0)
+    best_value, best_distance = -1, 0
+    for cell in free_cells:
+        bit = 1 << cell
+        bits = mover_bits | bit
+        if is_winning_move(bits, cell):
+            return encode_entry(WIN, 1)
+        if occupied | bit == full_mask:
+            value, distance = DRAW, 1
+        else:
+            next_occupied = occupied | bit
+            first_bits = bits if is_first_to_move else other_bits
+            entry = next_layer[next_ranks[cell] + index.rank(index.compress(first_bits, next_occupied))]
+            # the entry of the next position is for the other player
+            value, distance = 2 - (entry >> 6), (entry & 0x3F) + 1
+        if value > best_value or value == best_value and (distance < best_distance if value == WIN else distance > best_distance):
+            best_value, best_distance = value, distance
+    return encode_entry(best_value, best_distance)
+
+
+def get_chunks(index: PositionIndex, layer: int) -> list:
+    """ returns the ranges of the ranks of the occupied fields solved by the tasks of the layer
+
+    Args:
+        index (PositionIndex): position index
+        layer (int): number of the occupied fields
+
+    Returns:
+        list: (start, end) pairs
+    """
+    occupied_count = comb(index.cells, layer)
+    step = max(1, CHUNK_POSITIONS // index.subset_counts[layer])
+    return [(start, min([start + step, occupied_count])) for start in range(0, occupied_count, step)]
+
+
+def solve(size: int, win_length: int, processes: int = 1, work_directory: str = None, output: str = None) -> str:
+    """ solves all the layers (skipping the ones and the chunks already in the work directory) and writes the tablebase
+
+    Args:
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+        processes (int): number of processes solving the chunks
+        work_directory (str): directory of the checkpoints (tablebase_<size>x<size>_<win_length>_work if not provided)
+        output (str): path of the tablebase (TableBase.get_default_path if not provided)
+
+    Returns:
+        str: path of the tablebase
+    """
+    output = get_default_path(size, win_length) if output is None else output
+    work_directory = "tablebase_{}x{}_{}_work".format(size, size, win_length) if work_directory is None else work_directory
+    os.makedirs(work_directory, exist_ok = True)
+    index = PositionIndex(size * size)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(processes) as executor:
+        for layer in range(size * size, -1, -1):
+            layer_path = get_layer_path(work_directory, layer)
+            if os.path.exists(layer_path) and os.path.getsize(layer_path) == index.layer_sizes[layer]:
+                print("layer {}: done before".format(layer))
+                continue
+            chunks = get_chunks(index, layer)
+            tasks = [(size, win_length, layer, chunk, chunk_start, chunk_end, work_directory) for chunk, (chunk_start, chunk_end) in enumerate(chunks)
+                     if not os.path.exists(get_chunk_path(work_directory, layer, chunk))]
+            for _ in executor.map(solve_chunk, tasks):
+                pass
+            chunk_paths = [get_chunk_path(work_directory, layer, chunk) for chunk in range(len(chunks))]
+            data = b"".join(open(path, "rb").read() for path in chunk_paths)
+            if len(data) != index.layer_sizes[layer]:
+                raise ValueError("layer {} has {} entries instead of {}".format(layer, len(data), index.layer_sizes[layer]))
+            write_file(layer_path, data)
+            for path in chunk_paths:
+                os.remove(path)
+            print("layer {}: {} positions ({} chunks solved now), {:.1f} s".format(layer, index.layer_sizes[layer], len(tasks), time.perf_counter() - start))
+    write_table(output, size, win_length, [get_layer_path(work_directory, layer) for layer in range(size * size + 1)])
+    return output
+
+
+def verify(path: str, samples: int = 100, min_fields: int = None, seed: int = None) -> int:
+    """ compares the tablebase with the status of the GameMaster and the score of the AI's full minimax search on the random positions
+        (with at least min_fields occupied fields, so the search does not take too long)
+
+    Args:
+        path (str): path of the tablebase
+        samples (int): number of positions
+        min_fields (int): minimal number of the occupied fields (half of the board if not provided)
+        seed (int): seed of the random generator
+
+    Returns:
+        int: number of the positions where they differ
+    """
+    table = TableBase(path)
+    size, win_length = table.size, table.win_length
+    cells = size * size
+    min_fields = cells // 2 if min_fields is None else min_fields
+    rng = random.Random(seed)
+    ai = AI("O", "Player vs Smart Computer", use_move_table = False, size = size, win_length = win_length)
+    gm = GameMaster(size, win_length)
+    mismatches, checked = 0, 0
+    while checked < samples:
+        # random game up to the random number of the fields, stopped if it ends earlier
+        board = Board(size, win_length)
+        names = ["O", "X"]
+        for move in range(rng.randint(min_fields, cells - 1)):
+            board.update_with_field_ID(names[move % 2], rng.choice(board.get_free_cells()) + 1)
+            gm.evaluate_the_last_move(board)
+            if gm.get_the_game_status() != "1":
+                break
+        gm.evaluate_the_board(board)
+        status = gm.get_the_game_status()
+        moves = cells - len(board.get_free_cells())
+        mover, other = (names[0], names[1]) if moves % 2 == 0 else (names[1], names[0])
+        value, distance = table.get_entry(board.get_bitboard("O"), board.get_bitboard("X"))
+        if status != "1":
+            expected = {"0": DRAW}.get(status, LOSS)
+        else:
+            ai.name = mover
+            mover_bits, other_bits = board.get_bitboard(mover), board.get_bitboard(other)
+            score = -math.inf
+            for cell in board.get_free_cells():
+                if Bitboard.get_geometry(size, win_length).is_winning_move(mover_bits | 1 << cell, cell):
+                    score = 1
+                    break
+                score = max([score, ai.minimax(ai.create_search_context("minimax"), mover_bits | 1 << cell, other_bits, 0, -math.inf, math.inf, False, cell)[0]])
+            expected = {1: WIN, 0: DRAW, -1: LOSS}[score]
+        checked += 1
+        if value != expected:
+            mismatches += 1
+            print("mismatch: {} tablebase {} (distance {}), expected {}".format(board.to_string(), value, distance, expected))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Solves the board by the retrograde analysis and writes the tablebase.")
+    subparsers = parser.add_subparsers(dest = "command", required = True)
+    solve_parser = subparsers.add_parser("solve", help = "solve the board (continues the interrupted run)")
+    solve_parser.add_argument("--processes", type = int, default = os.cpu_count() or 1)
+    solve_parser.add_argument("--work-dir", default = None, help = "directory of the checkpoints")
+    verify_parser = subparsers.add_parser("verify", help = "compare the tablebase with the minimax search on random positions")
+    verify_parser.add_argument("--samples", type = int, default = 100)
+    verify_parser.add_argument("--min-fields", type = int, default = None, help = "minimal number of the occupied fields of the positions")
+    verify_parser.add_argument("--seed", type = int, default = None)
+    for subparser in [solve_parser, verify_parser]:
+        subparser.add_argument("--size", type = int, default = 4)
+        subparser.add_argument("--win-length", type = int, default = 4)
+        subparser.add_argument("--output", default = None, help = "path of the tablebase (next to the game's modules by default, where the AI finds it)")
+    args = parser.parse_args()
+
+    if args.command == "solve":
+        path = solve(args.size, args.win_length, args.processes, args.work_dir, args.output)
+        table = TableBase(path)
+        print("tablebase written to {}: the first player's {} in {} moves".format(
+            path, {WIN: "win", DRAW: "draw", LOSS: "loss"}[table.get_entry(0, 0)[0]], table.get_entry(0, 0)[1]))
+    else:
+        path = get_default_path(args.size, args.win_length) if args.output is None else args.output
+        mismatches = verify(path, args.samples, args.min_fields, args.seed)
+        print("{} mismatches in {} positions".format(mismatches, args.samples))
+        return 1 if mismatches else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+
+# the modules of the game are in the root of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Bitboard
+import solve_tablebase
+from TableBase import TableBase
+
+
+def get_positions(size: int = 3, win_length: int = 3):
+    """ yields every position of the board reachable by the alternating moves (the first player has the same number of fields as the second one,
+        or one more), also the ones where the game is already over
+
+    Args:
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+
+    Yields:
+        tuple: bitboard of the first player, bitboard of the second player
+    """
+    cells = Bitboard.get_geometry(size, win_length).cells
+    for code in range(3 ** cells):
+        first_bits, second_bits = 0, 0
+        for cell in range(cells):
+            code, field = divmod(code, 3)
+            if field == 1:
+                first_bits |= 1 << cell
+            elif field == 2:
+                second_bits |= 1 << cell
+        if first_bits.bit_count() - second_bits.bit_count() in (0, 1):
+            yield first_bits, second_bits
+
+
+@pytest.fixture(scope = "session")
+def tablebase_3x3(tmp_path_factory):
+    """ the tablebase of the 3x3 board, solved into the temporary directory """
+    directory = tmp_path_factory.mktemp("tablebase")
+    path = solve_tablebase.solve(3, 3, 1, str(directory / "work"), str(directory / "tablebase_3x3_3.bin"))
+    tablebase = TableBase(path)
+    yield tablebase
+    tablebase.close()
@@ -0,0 +1,66 @@
+from conftest import get_positions
+
+from AI import AI
+from Board import Board
+from Exceptions import SearchLimitError
+
+import threading
+
+import pytest
+
+
+def create_board(first_bits: int, second_bits: int) -> Board:
+    board = Board()
+    board.set_bitboards({"O": first_bits, "X": second_bits})
+    return board
+
+
+def test_empty_board_is_a_draw_everywhere():
+    analysis = AI("X", "Player vs Smart Computer").analyze(Board(), "O", "X")
+    assert analysis == {(row, col): (0, 9) for row in range(3) for col in range(3)}
+
+
+def test_analysis_is_not_stopped_by_a_stopped_search():
+    ai = AI("X", "Player vs MCTS Computer", time_limit = 5)
+    stop_event = threading.Event()
+    stop_event.set()
+    ai.get_player_move_on_board(Board(), "O", stop_event)
+    assert len(ai.analyze(Board(), "O", "X")) == 9
+
+
+def test_analysis_is_stopped_by_its_stop_event():
+    stop_event = threading.Event()
+    stop_event.set()
+    with pytest.raises(SearchLimitError):
+        AI("X", "Player vs Smart Computer").analyze(Board(), "O", "X", stop_event)
+
+
+def test_analysis_counts_its_search():
+    ai = AI("X", "Player vs Smart Computer")
+    ai.analyze(Board(), "O", "X")
+    stats = ai.get_search_stats()
+    assert stats.source == "analysis"
+    assert stats.nodes > 0
+    assert stats.cache_misses > 0
+
+
+def test_tablebase_analysis_matches_the_solved_one(tablebase_3x3):
+    solver = AI("X", "Player vs Smart Computer", use_move_table = False)
+    reader = AI("X", "Player vs Smart Computer", use_move_table = False)
+    reader.move_table = tablebase_3x3
+    for first_bits, second_bits in get_positions():
+        board = create_board(first_bits, second_bits)
+        # both players, also the one not to move (the tablebase does not hold the positions after its moves)
+        for name, opponent_name in [("O", "X"), ("X", "O")]:
+            assert reader.analyze(board, name, opponent_name) == solver.analyze(board, name, opponent_name)
+
+
+def test_analysis_of_the_player_not_to_move(tablebase_3x3):
+    # the first player has taken the center, it is the second player's turn
+    board = create_board(1 << 4, 0)
+    ai = AI("X", "Player vs Smart Computer", use_move_table = False)
+    ai.move_table = tablebase_3x3
+    analysis = ai.analyze(board, "O", "X")
+    assert len(analysis) == 8
+    # taking a corner as well wins
+    assert analysis[(0, 0)][0] == 1
@@ -0,0 +1,76 @@
+from conftest import get_positions
+
+from Board import Board
+from GameMaster import GameMaster
+import BatchEvaluation
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+STATUS_CODES = {"0": BatchEvaluation.DRAW, "1": BatchEvaluation.ONGOING, "O": BatchEvaluation.FIRST_PLAYER_WINS, "X": BatchEvaluation.SECOND_PLAYER_WINS}
+
+
+def get_statuses(positions: list, size: int, win_length: int) -> list:
+    """ statuses of the positions evaluated one by one by the GameMaster """
+    gm = GameMaster(size, win_length)
+    statuses = []
+    for first_bits, second_bits in positions:
+        board = Board(size, win_length)
+        board.set_bitboards({"O": first_bits, "X": second_bits})
+        gm.evaluate_the_board(board)
+        statuses.append(STATUS_CODES[gm.get_the_game_status()])
+    return statuses
+
+
+def get_random_positions(size: int, win_length: int, count: int) -> list:
+    rng = random.Random(size * 100 + win_length)
+    positions = []
+    for _ in range(count):
+        cells = list(range(size * size))
+        rng.shuffle(cells)
+        moves = rng.randrange(size * size + 1)
+        first_cells, second_cells = cells[:moves][::2], cells[:moves][1::2]
+        positions.append((sum(1 << cell for cell in first_cells), sum(1 << cell for cell in second_cells)))
+    return positions
+
+
+def to_cells(positions: list, size: int):
+    return np.array([[1 if first_bits >> cell & 1 else 2 if second_bits >> cell & 1 else 0 for cell in range(size * size)]
+                     for first_bits, second_bits in positions], dtype = np.int8).reshape(-1, size * size)
+
+
+def test_every_3x3_position_matches_the_game_master():
+    positions = list(get_positions())
+    expected = get_statuses(positions, 3, 3)
+    gm = GameMaster()
+    assert gm.evaluate_the_game_statuses(np.array(positions, dtype = np.uint64)).tolist() == expected
+    assert gm.evaluate_the_game_statuses(to_cells(positions, 3)).tolist() == expected
+
+
+@pytest.mark.parametrize("size, win_length", [(4, 3), (5, 4), (8, 5)])
+def test_random_positions_match_the_game_master(size, win_length):
+    positions = get_random_positions(size, win_length, 2000)
+    expected = get_statuses(positions, size, win_length)
+    gm = GameMaster(size, win_length)
+    assert gm.evaluate_the_game_statuses(np.array(positions, dtype = np.uint64)).tolist() == expected
+    assert gm.evaluate_the_game_statuses(to_cells(positions, size)).tolist() == expected
+
+
+def test_cells_of_the_board_bigger_than_8x8():
+    positions = get_random_positions(10, 5, 500)
+    assert GameMaster(10, 5).evaluate_the_game_statuses(to_cells(positions, 10)).tolist() == get_statuses(positions, 10, 5)
+    with pytest.raises(ValueError):
+        BatchEvaluation.evaluate_bitboards(np.zeros((1, 2), dtype = np.uint64), 10, 5)
+
+
+def test_encode_boards_and_small_batches(monkeypatch):
+    boards = [Board.from_string(position) for position in ["OOO.XX...", "OXOOXXXOO", "X.O.X.O.X", "........."]]
+    positions = BatchEvaluation.encode_boards(boards, "O", "X")
+    # the positions are split into many vectorized steps
+    monkeypatch.setattr(BatchEvaluation, "BATCH_ELEMENTS", 8)
+    assert BatchEvaluation.evaluate_bitboards(positions).tolist() == [BatchEvaluation.FIRST_PLAYER_WINS, BatchEvaluation.DRAW,
+                                                                      BatchEvaluation.SECOND_PLAYER_WINS, BatchEvaluation.ONGOING]
+    assert BatchEvaluation.encode_boards([], "O", "X").shape == (0, 2)
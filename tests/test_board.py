@@ -0,0 +1,74 @@
+from Board import Board
+
+import random
+
+
+def check_free_cells(board: Board):
+    """ the free-field list and its index agree with the bitboards """
+    occupied = board.get_occupied()
+    expected = [cell for cell in range(board.geometry.cells) if not occupied >> cell & 1]
+    assert sorted(board.get_free_cells()) == expected
+    for cell in range(board.geometry.cells):
+        index = board.free_cell_indexes[cell]
+        if cell in expected:
+            assert board.free_cells[index] == cell
+        else:
+            assert index == -1
+
+
+def play_random_moves(board: Board, moves: int):
+    for move in range(moves):
+        cell = board.get_random_free_cell()
+        board.set_bit("O" if move % 2 == 0 else "X", 1 << cell)
+
+
+def test_free_cells_follow_the_moves_and_the_cleared_fields():
+    rng = random.Random(1)
+    board = Board(5, 4)
+    for _ in range(200):
+        cell = rng.randrange(25)
+        board.set_bit(rng.choice(["O", "X", " "]), 1 << cell)
+        check_free_cells(board)
+
+
+def test_set_bitboards_rebuilds_the_free_cells_and_the_zobrist_key():
+    random.seed(2)
+    for size, win_length in [(3, 3), (5, 4), (7, 5)]:
+        played = Board(size, win_length)
+        play_random_moves(played, size * size // 2)
+        board = Board(size, win_length)
+        # the index of the empty board is replaced, not updated
+        board.set_bitboards({"O": played.get_bitboard("O"), "X": played.get_bitboard("X")})
+        check_free_cells(board)
+        assert board.get_zobrist_key() == played.get_zobrist_key()
+        for _ in range(50):
+            cell = board.get_random_free_cell()
+            assert not board.get_occupied() >> cell & 1
+
+
+def test_replace_and_copy_keep_the_free_cells():
+    board = Board()
+    board.replace([["O", " ", "X"], [" ", "O", " "], [" ", " ", "X"]])
+    check_free_cells(board)
+    copy = board.copy()
+    copy.update_with_coords("O", (1, 0))
+    check_free_cells(copy)
+    check_free_cells(board)
+    assert len(board.get_free_cells()) == len(copy.get_free_cells()) + 1
+
+
+def test_random_free_cell_of_the_full_board():
+    board = Board()
+    board.set_bitboards({"O": 0b101011010, "X": 0b010100101})
+    assert board.get_free_cells() == []
+    assert board.get_random_free_cell() == -1
+
+
+def test_server_random_moves_are_free():
+    from Server import search_move, COMPUTER_NAME, CLIENT_NAME
+    random.seed(3)
+    for _ in range(50):
+        played = Board(4, 3)
+        play_random_moves(played, 7)
+        row, col = search_move(("random", 4, 3, played.get_bitboard(COMPUTER_NAME), played.get_bitboard(CLIENT_NAME), None, None))
+        assert not played.get_occupied() >> (row * 4 + col) & 1
@@ -0,0 +1,39 @@
+from Engine import Engine
+
+import io
+import json
+
+
+def run_the_session(lines: list) -> list:
+    output = io.StringIO()
+    Engine(output).run(lines)
+    return output.getvalue().splitlines()
+
+
+def test_protocol_round_trip():
+    answers = run_the_session(["isready", "newgame 3 3", "position OO.XX.... moves", "go", "status", "stats", "quit"])
+    assert answers[:3] == ["readyok", "ok", "ok"]
+    assert answers[3].startswith("info source ")
+    # the first player wins at once with the third O in the top row
+    assert answers[4] == "bestmove 3"
+    assert answers[5] == "status 1"
+    stats = json.loads(answers[6][len("stats "):])
+    assert stats["nodes"] >= 0
+
+
+def test_moves_and_game_over():
+    answers = run_the_session(["position startpos moves 1 4 2 5 3", "status", "go"])
+    assert answers == ["ok", "status O", "bestmove none"]
+
+
+def test_wrong_commands_are_answered_with_errors():
+    answers = run_the_session(["unknown", "strategy best", "position startpos moves 1 1", "go time"])
+    assert all(answer.startswith("error ") for answer in answers)
+    assert len(answers) == 4
+
+
+def test_position_of_another_board_size():
+    answers = run_the_session(["newgame 4 4", "position O...X....", "position startpos", "newgame 3 3", "position O...X...."])
+    assert answers[0] == "ok"
+    assert answers[1] == "error the position has 9 fields, the board 4x4 needs 16 (use newgame to change the board)"
+    assert answers[2:] == ["ok", "ok", "ok"]
@@ -0,0 +1,68 @@
+from GameMaster import GameMaster
+from Board import Board
+from Exceptions import WrongCoordinatesError, WrongFieldIDError
+
+import random
+
+import pytest
+
+BOARDS = [(3, 3), (4, 3), (5, 4), (7, 5), (10, 5)]
+
+
+def get_full_status(board: Board) -> str:
+    gm = GameMaster(board.size, board.win_length)
+    gm.evaluate_the_board(board)
+    return gm.get_the_game_status()
+
+
+@pytest.mark.parametrize("size, win_length", BOARDS)
+def test_last_move_status_matches_the_full_scan(size, win_length):
+    rng = random.Random(size * 100 + win_length)
+    gm = GameMaster(size, win_length)
+    for _ in range(30):
+        board = Board(size, win_length)
+        cells = list(range(size * size))
+        rng.shuffle(cells)
+        for move, cell in enumerate(cells):
+            board.update_with_coords("X" if move % 2 else "O", divmod(cell, size))
+            gm.evaluate_the_last_move(board)
+            assert gm.get_the_game_status() == get_full_status(board)
+            if gm.get_the_game_status() != "1":
+                break
+
+
+@pytest.mark.parametrize("size, win_length", BOARDS)
+def test_lines_of_the_win_length(size, win_length):
+    # the row, the column and both diagonals starting in the corner, one field shorter and then of the full win length
+    for line in [[(0, i) for i in range(win_length)], [(i, size - 1) for i in range(win_length)],
+                 [(i, i) for i in range(win_length)], [(i, size - 1 - i) for i in range(win_length)]]:
+        board = Board(size, win_length)
+        for coords in line[:-1]:
+            board.update_with_coords("X", coords)
+        assert get_full_status(board) == "1"
+        board.update_with_coords("X", line[-1])
+        gm = GameMaster(size, win_length)
+        gm.evaluate_the_last_move(board)
+        assert gm.get_the_game_status() == "X" == get_full_status(board)
+
+
+def test_draw_of_the_full_board():
+    board = Board.from_string("OXOOXXXOO")
+    assert get_full_status(board) == "0"
+
+
+@pytest.mark.parametrize("size", [3, 4, 7, 10])
+def test_field_IDs_and_coordinates(size):
+    for field_ID in range(1, size * size + 1):
+        coords = Board.get_coordinates(field_ID, size)
+        assert Board.get_field_ID(coords, size) == field_ID
+    with pytest.raises(WrongFieldIDError):
+        Board.get_coordinates(size * size + 1, size)
+    with pytest.raises(WrongCoordinatesError):
+        Board.get_field_ID((size, 0), size)
+
+
+def test_evaluate_the_game_status_of_the_list():
+    gm = GameMaster(4, 3)
+    gm.evaluate_the_game_status([[" ", " ", " ", "O"], [" ", " ", "O", " "], [" ", "O", " ", " "], ["X", "X", " ", " "]])
+    assert gm.get_the_game_status() == "O"
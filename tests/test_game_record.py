@@ -0,0 +1,65 @@
+from GameRecord import GameRecord, GameRecordWriter, read_game_records, FILE_HEADER, DRAW, FIRST_PLAYER_WINS, UNFINISHED
+from Exceptions import TruncatedRecordError
+
+import pytest
+
+RECORDS = [
+    GameRecord("human", "smart", FIRST_PLAYER_WINS, 3, 3, [1, 4, 2, 5, 3]),
+    GameRecord("random", "mcts", DRAW, 3, 3, [5, 1, 9, 3, 2, 8, 7, 4, 6]),
+    GameRecord("smart", "engine", UNFINISHED, 5, 4, [13, 1, 25, 7]),
+    GameRecord("human", "human", UNFINISHED, 4, 3, []),
+]
+
+
+def get_fields(record: GameRecord) -> tuple:
+    return (record.first_player, record.second_player, record.result, record.size, record.win_length, record.moves)
+
+
+@pytest.fixture
+def records_path(tmp_path):
+    path = str(tmp_path / "games.bin")
+    with GameRecordWriter(path) as writer:
+        for record in RECORDS:
+            writer.write(record)
+    return path
+
+
+def test_records_round_trip(records_path):
+    # the kinds unknown to the records are saved as "other"
+    expected = [get_fields(record) for record in RECORDS]
+    expected[2] = ("smart", "other") + expected[2][2:]
+    assert [get_fields(record) for record in read_game_records(records_path)] == expected
+
+
+def test_records_are_appended(records_path):
+    with GameRecordWriter(records_path) as writer:
+        writer.write(RECORDS[0])
+    assert len(list(read_game_records(records_path))) == len(RECORDS) + 1
+
+
+def test_replay_of_the_record():
+    board = RECORDS[0].to_board()
+    assert board.to_string() == "OOOXX...."
+
+
+@pytest.mark.parametrize("cut", [1, 3, 5])
+def test_truncated_file(records_path, cut):
+    with open(records_path, "rb") as file:
+        data = file.read()
+    with open(records_path, "wb") as file:
+        file.write(data[:-cut])
+    records = []
+    with pytest.raises(TruncatedRecordError) as error:
+        for record in read_game_records(records_path):
+            records.append(record)
+    # the last record (empty 4x3 game) takes only its 4-byte header, the 5x5 one before it 4 + 4 bytes (one byte per move)
+    assert len(records) == (3 if cut < 5 else 2)
+    assert error.value.offset == len(data) - (4 if cut < 5 else 12)
+
+
+def test_empty_file(tmp_path):
+    path = str(tmp_path / "games.bin")
+    GameRecordWriter(path).close()
+    with open(path, "rb") as file:
+        assert len(file.read()) == FILE_HEADER.size
+    assert list(read_game_records(path)) == []
@@ -0,0 +1,62 @@
+from test_search_context import create_board, get_open_positions
+
+from AI import AI
+import Bitboard
+
+import math
+import random
+
+import pytest
+
+
+def plain_minimax(geometry, ai_bits: int, opponent_bits: int, is_maximizer_turn: bool) -> int:
+    """ score of the position by the whole-board checks after every move, without the pruning and the caches """
+    if geometry.has_line(ai_bits):
+        return 1
+    if geometry.has_line(opponent_bits):
+        return -1
+    occupied = ai_bits | opponent_bits
+    if geometry.is_full(occupied):
+        return 0
+    if is_maximizer_turn:
+        return max(plain_minimax(geometry, ai_bits | 1 << cell, opponent_bits, False) for cell in geometry.get_free_cells(occupied))
+    return min(plain_minimax(geometry, ai_bits, opponent_bits | 1 << cell, True) for cell in geometry.get_free_cells(occupied))
+
+
+@pytest.mark.parametrize("size, win_length", [(3, 3), (4, 3), (5, 4), (7, 5), (10, 5)])
+def test_line_counts_tell_the_winning_moves(size, win_length):
+    geometry = Bitboard.get_geometry(size, win_length)
+    rng = random.Random(size)
+    for _ in range(200):
+        bits = 0
+        for cell in rng.sample(range(geometry.cells), rng.randrange(geometry.cells // 2)):
+            bits |= 1 << cell
+        counts = geometry.get_line_counts(bits)
+        for cell in geometry.get_free_cells(bits):
+            wins = bool((counts + geometry.cell_line_increments[cell]) & geometry.cell_line_tops[cell])
+            assert wins == geometry.is_winning_move(bits | 1 << cell, cell)
+
+
+def test_incremental_line_counts_match_the_rebuilt_ones():
+    geometry = Bitboard.get_geometry(6, 4)
+    counts, bits = geometry.get_line_counts(0), 0
+    for cell in random.Random(4).sample(range(geometry.cells), 18):
+        counts += geometry.cell_line_increments[cell]
+        bits |= 1 << cell
+        assert counts == geometry.get_line_counts(bits)
+
+
+def test_minimax_matches_the_plain_minimax():
+    geometry = Bitboard.get_geometry(3, 3)
+    ai = AI("X", "Player vs Smart Computer", use_move_table = False)
+    for first_bits, second_bits in get_open_positions(60):
+        context = ai.create_search_context("minimax")
+        score, _ = ai.minimax(context, second_bits, first_bits, 0, -math.inf, math.inf, True)
+        assert score == plain_minimax(geometry, second_bits, first_bits, True)
+
+
+def test_search_takes_the_immediate_win():
+    # X wins in the middle row instead of blocking O in the top row
+    board = create_board(0b010000011, 0b000011000)
+    ai = AI("X", "Player vs Smart Computer", use_move_table = False)
+    assert ai.get_player_move_on_board(board, "O") == (1, 2)
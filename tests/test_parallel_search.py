@@ -0,0 +1,39 @@
+from test_search_context import create_board, get_open_positions
+
+from AI import AI
+from Board import Board
+
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def parallel_ai():
+    ai = AI("X", "Player vs Smart Computer", use_move_table = False, workers = 2)
+    yield ai
+    ai.close()
+
+
+def test_parallel_full_search_finds_the_serial_moves(parallel_ai):
+    for position in get_open_positions(12):
+        board = create_board(*position)
+        serial = AI("X", "Player vs Smart Computer", use_move_table = False)
+        assert parallel_ai.get_player_move_on_board(board, "O") == serial.get_player_move_on_board(board, "O")
+
+
+def test_stop_event_stops_the_workers():
+    ai = AI("X", "Player vs Smart Computer", size = 5, win_length = 4, time_limit = 30, workers = 2)
+    stop_event = threading.Event()
+    try:
+        # the pool is started before the search is timed
+        ai.get_parallel_search()
+        timer = threading.Timer(0.5, stop_event.set)
+        start = time.monotonic()
+        timer.start()
+        move = ai.get_player_move_on_board(Board(5, 4), "O", stop_event)
+        assert time.monotonic() - start < 10
+        assert move != (-1, -1)
+    finally:
+        ai.close()
@@ -0,0 +1,75 @@
+from conftest import get_positions
+
+from AI import AI, SearchContext
+from Board import Board
+from TranspositionTable import TranspositionTable, EXACT
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+
+def create_board(first_bits: int, second_bits: int, size: int = 3, win_length: int = 3) -> Board:
+    board = Board(size, win_length)
+    board.set_bitboards({"O": first_bits, "X": second_bits})
+    return board
+
+
+def get_open_positions(count: int) -> list:
+    """ positions of the 3x3 board where it is the second player's (X) turn and the game is not over """
+    geometry = Board().geometry
+    positions = [(first_bits, second_bits) for first_bits, second_bits in get_positions()
+                 if first_bits.bit_count() == second_bits.bit_count() + 1 and not geometry.has_line(first_bits) and not geometry.has_line(second_bits)
+                 and not geometry.is_full(first_bits | second_bits)]
+    return positions[::len(positions) // count][:count]
+
+
+def test_search_context_has_no_instance_dict():
+    context = AI("X", "Player vs Smart Computer").create_search_context("minimax")
+    assert isinstance(context, SearchContext)
+    assert not hasattr(context, "__dict__")
+
+
+def test_transposition_table_is_usable_from_many_threads():
+    table = TranspositionTable(8)
+    def work(seed: int):
+        for key in range(seed, seed + 20000):
+            table.store(key % 37, key, 0, EXACT)
+            table.get((key * 7) % 37)
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(work, range(8)))
+    assert len(table) <= 8
+    for key in list(table.entries):
+        assert table.get(key) is not None
+
+
+def test_concurrent_searches_of_one_ai_find_the_serial_moves():
+    boards = [create_board(*position) for position in get_open_positions(40)]
+    expected = [AI("X", "Player vs Smart Computer", use_move_table = False).get_player_move_on_board(board, "O") for board in boards]
+    shared = AI("X", "Player vs Smart Computer", use_move_table = False)
+    with ThreadPoolExecutor(8) as executor:
+        moves = list(executor.map(lambda board: shared.get_player_move_on_board(board, "O"), boards))
+    assert moves == expected
+
+
+def test_concurrent_searches_do_not_change_the_board():
+    board = create_board(1 << 4, 0)
+    ai = AI("X", "Player vs Smart Computer", use_move_table = False)
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda _: ai.get_player_move_on_board(board, "O"), range(8)))
+    assert board.get_bitboard("O") == 1 << 4 and board.get_bitboard("X") == 0
+    assert sorted(board.get_free_cells()) == [cell for cell in range(9) if cell != 4]
+
+
+def test_stop_event_stops_only_its_own_search():
+    ai = AI("X", "Player vs Smart Computer", size = 4, win_length = 4, node_limit = 20000)
+    records = []
+    ai.add_stats_sink(records.append)
+    stopped = threading.Event()
+    stopped.set()
+    with ThreadPoolExecutor(2) as executor:
+        futures = [executor.submit(ai.get_player_move_on_board, Board(4, 4), "O", stop_event) for stop_event in [stopped, threading.Event()]]
+        moves = [future.result() for future in futures]
+    assert all(move != (-1, -1) for move in moves)
+    nodes = sorted(record["nodes"] for record in records)
+    assert nodes[0] <= AI.TIME_CHECK_INTERVAL
+    assert nodes[1] >= 20000 // 2
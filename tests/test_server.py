@@ -0,0 +1,76 @@
+from Server import Server, run_load
+from GameRecord import read_game_records, FIRST_PLAYER_WINS
+
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.fixture
+def server():
+    server = Server(workers = 2, use_threads = True)
+    yield server
+    server.close()
+
+
+def ask(server: Server, lines: list) -> list:
+    async def ask_all():
+        return [await server.handle(line) for line in lines]
+    return asyncio.run(ask_all())
+
+
+def test_requests_and_answers(server):
+    answers = ask(server, ["new", "move 1 1", "status 1", "go 1", "end 1", "status 1"])
+    assert answers[:3] == ["game 1", "ok 1", "status 1"]
+    word, field_ID, status = answers[3].split()
+    assert word == "bestmove" and field_ID != "1" and 1 <= int(field_ID) <= 9 and status == "1"
+    assert answers[4] == "ok"
+    assert answers[5] == "error unknown game: 1"
+
+
+def test_wrong_requests(server):
+    answers = ask(server, ["", "jump 1", "new 3 3 best", "new", "go 1", "move 1 1", "move 1 2", "play 1 1", "play 1 10"])
+    assert [answer.split()[0] for answer in answers] == ["error", "error", "error", "game", "error", "ok", "error", "error", "error"]
+    stats = json.loads(ask(server, ["stats"])[0][len("stats "):])
+    assert stats["errors"] == 7 and stats["games"] == 1 and stats["requests"] == 10
+
+
+def test_position_cache_is_shared_by_the_games(server):
+    answers = ask(server, ["new", "new", "play 1 5", "play 2 5", "stats"])
+    assert answers[2] == answers[3]
+    stats = json.loads(answers[4][len("stats "):])
+    assert stats["searches"] == 1 and stats["cache_hits"] == 1
+
+
+def test_finished_games_are_saved(tmp_path):
+    path = str(tmp_path / "games.bin")
+    server = Server(workers = 1, use_threads = True, record_path = path)
+    try:
+        # the client wins with the first move on the 2x2 board with 1 in a row
+        answers = ask(server, ["new 2 1 random", "play 1 4"])
+    finally:
+        server.close()
+    assert answers == ["game 1", "bestmove none O"]
+    records = list(read_game_records(path))
+    assert len(records) == 1
+    assert (records[0].result, records[0].second_player, records[0].moves) == (FIRST_PLAYER_WINS, "random", [4])
+
+
+def test_load_over_the_unix_socket(server, tmp_path):
+    path = str(tmp_path / "server.sock")
+
+    async def serve_and_load():
+        serving = asyncio.ensure_future(server.serve(path = path))
+        while not (tmp_path / "server.sock").exists():
+            await asyncio.sleep(0.01)
+        try:
+            return await run_load(path = path, connections = 3, games = 7)
+        finally:
+            serving.cancel()
+
+    report = asyncio.run(serve_and_load())
+    assert report["requests"] == report["latency"]["count"] >= 7 * 3
+    assert report["requests_per_second"] > 0
+    stats = json.loads(ask(server, ["stats"])[0][len("stats "):])
+    assert stats["games_created"] == 7 and stats["games"] == 0 and stats["errors"] == 0
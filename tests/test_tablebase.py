@@ -0,0 +1,83 @@
+from conftest import get_positions
+
+from AI import AI
+import MoveTable
+from TableBase import PositionIndex, LOSS, DRAW
+
+import pytest
+
+
+@pytest.fixture(scope = "module")
+def ai():
+    return AI("X", "Player vs Smart Computer", use_move_table = False)
+
+
+def solve(ai: AI, mover_bits: int, other_bits: int) -> tuple:
+    geometry = ai.geometry
+    return ai.solve_position(ai.create_search_context("analysis"), mover_bits, other_bits,
+                             geometry.get_line_counts(mover_bits), geometry.get_line_counts(other_bits))
+
+
+def get_mover(first_bits: int, second_bits: int) -> tuple:
+    return (first_bits, second_bits) if first_bits.bit_count() == second_bits.bit_count() else (second_bits, first_bits)
+
+
+def test_index_is_a_bijection():
+    index = PositionIndex(9)
+    indexes = {index.get_index(first_bits, second_bits) for first_bits, second_bits in get_positions()}
+    assert indexes == set(range(index.size))
+
+
+def test_entries_match_the_exact_search(ai, tablebase_3x3):
+    geometry = ai.geometry
+    for first_bits, second_bits in get_positions():
+        mover_bits, other_bits = get_mover(first_bits, second_bits)
+        entry = tablebase_3x3.get_entry(first_bits, second_bits)
+        if geometry.has_line(mover_bits):
+            assert entry is None
+        elif geometry.has_line(other_bits):
+            assert entry == (LOSS, 0)
+        elif geometry.is_full(mover_bits | other_bits):
+            assert entry == (DRAW, 0)
+        else:
+            score, distance = solve(ai, mover_bits, other_bits)
+            assert entry == (score + 1, distance)
+
+
+def test_best_moves_keep_the_exact_score(ai, tablebase_3x3):
+    geometry = ai.geometry
+    for first_bits, second_bits in get_positions():
+        mover_bits, other_bits = get_mover(first_bits, second_bits)
+        if geometry.has_line(mover_bits) or geometry.has_line(other_bits) or geometry.is_full(mover_bits | other_bits):
+            assert tablebase_3x3.get_best_move(mover_bits, other_bits) is None
+            continue
+        cell, score = tablebase_3x3.get_best_move(mover_bits, other_bits)
+        assert score == solve(ai, mover_bits, other_bits)[0]
+        bits = mover_bits | 1 << cell
+        if not geometry.is_winning_move(bits, cell) and not geometry.is_full(bits | other_bits):
+            assert -solve(ai, other_bits, bits)[0] == score
+
+
+def test_best_move_of_the_player_not_to_move_is_not_found(tablebase_3x3):
+    # the first player has taken the center, it is the second player's turn
+    assert tablebase_3x3.get_position_entry(1 << 4, 0) is None
+    assert tablebase_3x3.get_best_move(1 << 4, 0) is None
+    assert tablebase_3x3.get_best_move(0, 1 << 4) is not None
+
+
+def test_move_table_matches_the_exact_search(ai):
+    table = MoveTable.get_default_table()
+    if table is None:
+        pytest.skip("move_table.bin is missing")
+    geometry = ai.geometry
+    checked = 0
+    for first_bits, second_bits in get_positions():
+        mover_bits, other_bits = get_mover(first_bits, second_bits)
+        entry = table.get_best_move(mover_bits, other_bits)
+        if entry is None:
+            continue
+        cell, score = entry
+        assert not (mover_bits | other_bits) >> cell & 1
+        assert score == solve(ai, mover_bits, other_bits)[0]
+        checked += 1
+    assert checked
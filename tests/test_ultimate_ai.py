@@ -0,0 +1,36 @@
+from UltimateAI import UltimateAI, UltimateSearchContext
+from UltimateBoard import UltimateBoard
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+
+def create_board(moves: list) -> UltimateBoard:
+    board = UltimateBoard()
+    for i, (sub_board, cell) in enumerate(moves):
+        board.make_move("X" if i % 2 else "O", sub_board, cell)
+    return board
+
+
+def test_search_context_has_no_instance_dict():
+    context = UltimateSearchContext(UltimateBoard(), "X", "O", None, 100, None)
+    assert not hasattr(context, "__dict__")
+
+
+def test_concurrent_searches_of_one_ai_find_the_serial_moves():
+    boards = [create_board(moves) for moves in [[(4, 4)], [(0, 0)], [(4, 0), (0, 4)], [(8, 8), (8, 4), (4, 8)]]]
+    expected = [UltimateAI("X", None, 5000).get_player_move_on_board(board, "O") for board in boards]
+    shared = UltimateAI("X", None, 5000)
+    with ThreadPoolExecutor(4) as executor:
+        moves = list(executor.map(lambda board: shared.get_player_move_on_board(board, "O"), boards))
+    assert moves == expected
+
+
+def test_stop_event_stops_the_search():
+    stop_event = threading.Event()
+    stop_event.set()
+    ai = UltimateAI("X", None, 1000000)
+    move = ai.get_player_move_on_board(create_board([(4, 4)]), "O", stop_event)
+    # the player is sent to the center sub-board
+    assert move[0] in range(3, 6) and move[1] in range(3, 6)
+    assert ai.get_search_stats().nodes <= UltimateAI.TIME_CHECK_INTERVAL
@@ -0,0 +1,79 @@
+from ViewModel import ViewModel
+
+
+class FakeElement:
+    def __init__(self, updates: list, key):
+        self.updates = updates
+        self.key = key
+
+    def update(self, **properties):
+        self.updates.append((self.key, properties))
+
+
+class FakeWindow:
+    """ window recording the update calls of its elements """
+    def __init__(self):
+        self.updates = []
+
+    def __getitem__(self, key):
+        return FakeElement(self.updates, key)
+
+
+def create_view() -> ViewModel:
+    view = ViewModel(FakeWindow())
+    for tile in [(0, 0), (0, 1)]:
+        view.track(tile, text = "", disabled = False)
+    view.track("player_info", value = "Player 1 move!")
+    return view
+
+
+def test_only_the_changed_properties_are_rendered():
+    view = create_view()
+    view.set((0, 0), text = "O", disabled = True)
+    view.set((0, 1), text = "", disabled = False)
+    view.set("player_info", value = "Player 2 move!")
+    assert view.render() == 2
+    assert view.window.updates == [((0, 0), {"text": "O", "disabled": True}), ("player_info", {"value": "Player 2 move!"})]
+
+
+def test_changes_of_one_frame_are_batched():
+    view = create_view()
+    view.set((0, 0), text = "O")
+    view.set((0, 0), disabled = True)
+    view.set((0, 0), text = "X")
+    view.render()
+    assert view.window.updates == [((0, 0), {"text": "X", "disabled": True})]
+
+
+def test_property_set_back_to_the_rendered_value_is_not_updated():
+    view = create_view()
+    view.set("player_info", value = "Looking for the hint...")
+    view.set("player_info", value = "Player 1 move!")
+    assert view.render() == 0
+    assert view.window.updates == []
+
+
+def test_second_render_without_changes_does_nothing():
+    view = create_view()
+    view.set((0, 1), text = "X")
+    view.render()
+    view.set((0, 1), text = "X")
+    assert view.render() == 0
+    assert len(view.window.updates) == 1
+
+
+def test_untracked_element_is_always_updated_first():
+    view = create_view()
+    view.set("search_stats", value = "")
+    view.render()
+    assert view.window.updates == [("search_stats", {"value": ""})]
+
+
+def test_get_returns_the_state_after_the_next_render():
+    view = create_view()
+    assert view.get("player_info", "value") == "Player 1 move!"
+    view.set("player_info", value = "Nobody wins.")
+    assert view.get("player_info", "value") == "Nobody wins."
+    view.render()
+    assert view.get("player_info", "value") == "Nobody wins."
+    assert view.get("mode_info", "value") is None
@@ -0,0 +1,85 @@
+from conftest import get_positions
+
+from Board import Board
+import Bitboard
+
+import random
+
+import pytest
+
+
+def get_symmetries(fields: list) -> list:
+    """ the 2D list transformed by the 4 rotations, each also mirrored """
+    symmetries = []
+    for _ in range(4):
+        fields = [list(row) for row in zip(*fields[::-1])]
+        symmetries += [fields, [row[::-1] for row in fields]]
+    return symmetries
+
+
+def play_random_moves(board: Board, rng: random.Random, moves: int):
+    for _ in range(moves):
+        board.set_bit(rng.choice(["O", "X", " "]), 1 << rng.randrange(board.geometry.cells))
+
+
+@pytest.mark.parametrize("size, win_length", [(3, 3), (4, 3), (5, 4), (8, 5), (11, 5)])
+def test_canonical_key_of_all_8_symmetries(size, win_length):
+    rng = random.Random(size)
+    for _ in range(20):
+        board = Board(size, win_length)
+        play_random_moves(board, rng, size * size)
+        keys = set()
+        for fields in get_symmetries(board.board):
+            transformed = Board(size, win_length)
+            transformed.replace(fields)
+            assert transformed.get_canonical_zobrist_key() == board.get_canonical_zobrist_key()
+            keys.add(transformed.get_zobrist_key())
+        assert board.get_zobrist_key() in keys
+
+
+@pytest.mark.parametrize("size, win_length", [(3, 3), (6, 4), (10, 5)])
+def test_incremental_key_matches_the_rebuilt_one(size, win_length):
+    rng = random.Random(size)
+    board = Board(size, win_length)
+    for _ in range(300):
+        play_random_moves(board, rng, 1)
+        rebuilt = Board(size, win_length)
+        rebuilt.set_bitboards(board.bitboards)
+        assert board.zobrist_keys == rebuilt.zobrist_keys
+    assert board.copy().get_zobrist_key() == board.get_zobrist_key()
+
+
+def test_cleared_fields_give_back_the_empty_key():
+    board = Board(4, 3)
+    for field_ID in [1, 6, 11, 16]:
+        board.update_with_field_ID("O", field_ID)
+    board.update_with_field_ID("X", 6)
+    assert board.get_zobrist_key() != 0
+    for field_ID in [1, 6, 11, 16]:
+        board.update_with_field_ID(" ", field_ID)
+    assert board.zobrist_keys == 0
+    board.update_with_coords("X", (3, 3))
+    board.reset()
+    assert board.get_zobrist_key() == 0
+
+
+def test_canonical_keys_tell_the_positions_apart():
+    # on the 3x3 board the canonical Zobrist keys are equal exactly for the positions with the same canonical bitboards
+    geometry = Bitboard.get_geometry(3, 3)
+    classes = {}
+    for first_bits, second_bits in get_positions():
+        board = Board()
+        board.set_bitboards({"O": first_bits, "X": second_bits})
+        assert classes.setdefault(board.get_canonical_zobrist_key(), geometry.get_canonical_key(first_bits, second_bits)) == \
+            geometry.get_canonical_key(first_bits, second_bits)
+    assert len(classes) == len(set(classes.values()))
+
+
+def test_keys_depend_on_the_player_and_the_board_size():
+    first, second = Board(), Board()
+    first.update_with_field_ID("O", 5)
+    second.update_with_field_ID("X", 5)
+    assert first.get_zobrist_key() != second.get_zobrist_key()
+    bigger = Board(5, 3)
+    bigger.update_with_coords("O", (1, 1))
+    assert bigger.get_zobrist_key() != first.get_zobrist_key()
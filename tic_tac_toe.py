@@ -0,0 +1,202 @@
+""" command line entry point: plays and analyzes the games in the console, without importing PySimpleGUI (the GUI is imported only by the gui command).
+    Usage examples:
+
+    python tic_tac_toe.py play --strategy smart
+    python tic_tac_toe.py analyze "O...X...O"
+    python tic_tac_toe.py gui
+    python tic_tac_toe.py gui --profile report.txt
+    python tic_tac_toe.py engine
+    python tic_tac_toe.py import-time
+"""
+from AI import AI
+from Board import Board
+from GameMaster import GameMaster
+from GameRecord import GameRecord, GameRecordWriter, get_result
+
+import argparse
+import subprocess
+import sys
+
+STRATEGIES = AI.STRATEGIES
+# the first player always starts
+FIRST_NAME = "O"
+SECOND_NAME = "X"
+# modules which must not be imported by the console commands
+GUI_MODULES = ["PySimpleGUI", "tkinter", "numpy"]
+
+
+def get_default_time_limit(size: int, win_length: int, time_limit: float, node_limit: int) -> float:
+    """ returns the time limit of the search: the given one, or AI.DEFAULT_TIME_LIMIT on the boards bigger than 3x3 if there is no limit at all
+    (the same as in the game window, the full search is too slow there)
+
+    Args:
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+        time_limit (float): time limit given by the user
+        node_limit (int): node limit given by the user
+
+    Returns:
+        float: time limit (None for the full search)
+    """
+    if time_limit is None and node_limit is None and (size, win_length) != (3, 3):
+        return AI.DEFAULT_TIME_LIMIT
+    return time_limit
+
+
+def get_game_result(game_status: str) -> str:
+    """ returns the text of the finished game's result
+
+    Args:
+        game_status (str): status of the GameMaster ('0' for draw, otherwise the winner's name)
+
+    Returns:
+        str: result
+    """
+    return "Draw!" if game_status == "0" else "{} wins!".format(game_status)
+
+
+def play(strategy: str, size: int, win_length: int, time_limit: float = None, node_limit: int = None, computer_first: bool = False, record_path: str = None):
+    """ plays one game of the human (choosing the field ID's in the console) against the computer
+
+    Args:
+        strategy (str): strategy of the computer (one of STRATEGIES)
+        size (int): number of rows (and columns) of the board
+        win_length (int): number of fields in a line needed to win
+        time_limit (float): seconds per move of the computer
+        node_limit (int): nodes (or playouts) per move of the computer
+        computer_first (bool): the computer starts
+        record_path (str): file where the game is appended (see GameRecord module), the game is not saved if not provided
+    """
+    board = Board(size, win_length)
+    gm = GameMaster(size, win_length)
+    human_name, computer_name = (SECOND_NAME, FIRST_NAME) if computer_first else (FIRST_NAME, SECOND_NAME)
+    computer = AI(computer_name, STRATEGIES[strategy], size = size, win_length = win_length,
+                  time_limit = get_default_time_limit(size, win_length, time_limit, node_limit), node_limit = node_limit)
+    name = FIRST_NAME
+    moves = []
+    while gm.get_the_game_status() == "1":
+        print(board)
+        if name == human_name:
+            field_ID = board.get_validate_move()
+            board.update_with_field_ID(human_name, field_ID)
+        else:
+            field_ID = Board.get_field_ID(computer.get_player_move_on_board(board, human_name), size)
+            board.update_with_field_ID(computer_name, field_ID)
+            print("computer ({}) chooses the field {}".format(computer_name, field_ID))
+        moves.append(field_ID)
+        gm.evaluate_the_last_move(board)
+        name = SECOND_NAME if name == FIRST_NAME else FIRST_NAME
+    print(board)
+    print(get_game_result(gm.get_the_game_status()))
+    computer.close()
+    if record_path is not None:
+        kinds = (strategy, "human") if computer_first else ("human", strategy)
+        with GameRecordWriter(record_path) as record_writer:
+            record_writer.write(GameRecord(*kinds, get_result(gm.get_the_game_status(), FIRST_NAME, SECOND_NAME), size, win_length, moves))
+
+
+def analyze(position: str, win_length: int = 3, to_move: str = None, time_limit: float = None, node_limit: int = None) -> dict:
+    """ finds the best move in the position with the minimax search
+
+    Args:
+        position (str): fields of the board row by row ("." for the empty field), see Board.from_string
+        win_length (int): number of fields in a line needed to win
+        to_move (str): player to move (the first player if both have the same number of fields, the second one otherwise)
+        time_limit (float): seconds for the search
+        node_limit (int): nodes for the search
+
+    Returns:
+        dict: status of the game ('1' ongoing, '0' draw, or the winner's name), and if it goes on: to_move, move (row, col), field_ID and stats
+    """
+    board = Board.from_string(position, win_length)
+    gm = GameMaster(board.size, win_length)
+    gm.evaluate_the_board(board)
+    result = {"status": gm.get_the_game_status()}
+    if result["status"] != "1":
+        return result
+    if to_move is None:
+        to_move = GameMaster.get_player_to_move(board, FIRST_NAME, SECOND_NAME)
+    opponent_name = SECOND_NAME if to_move == FIRST_NAME else FIRST_NAME
+    ai = AI(to_move, STRATEGIES["smart"], use_move_table = False, size = board.size, win_length = win_length,
+            time_limit = get_default_time_limit(board.size, win_length, time_limit, node_limit), node_limit = node_limit)
+    move = ai.get_best_move(board, opponent_name)
+    result.update({"to_move": to_move, "move": move, "field_ID": Board.get_field_ID(move, board.size), "stats": ai.get_search_stats()})
+    return result
+
+
+def measure_import_time(module: str = "tic_tac_toe") -> dict:
+    """ imports the module in a new interpreter with -X importtime and returns how long it took
+
+    Args:
+        module (str): name of the module
+
+    Returns:
+        dict: seconds (of the whole import), slowest (list of (seconds, module) of the 5 slowest imports), gui_modules (GUI_MODULES which got imported)
+    """
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module], capture_output = True, text = True, check = True).stderr
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative) / 1e6, int(self_time) / 1e6, name.strip()))
+    top_level = next(seconds for seconds, _, name in imports if name == module)
+    return {
+        "seconds": top_level,
+        "slowest": sorted(((self_time, name) for _, self_time, name in imports), reverse = True)[:5],
+        "gui_modules": [name for name in GUI_MODULES if any(imported == name for _, _, imported in imports)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Tic Tac Toe in the console.")
+    subparsers = parser.add_subparsers(dest = "command", required = True)
+    play_parser = subparsers.add_parser("play", help = "play against the computer in the console")
+    play_parser.add_argument("--strategy", choices = sorted(STRATEGIES), default = "smart")
+    play_parser.add_argument("--size", type = int, default = 3)
+    play_parser.add_argument("--computer-first", action = "store_true", help = "the computer starts")
+    play_parser.add_argument("--record", default = None, help = "file where the game is appended (see GameRecord.py)")
+    analyze_parser = subparsers.add_parser("analyze", help = "find the best move in the position")
+    analyze_parser.add_argument("position", help = "fields row by row, \".\" for the empty field, e.g. \"O...X...O\"")
+    analyze_parser.add_argument("--to-move", help = "player to move (guessed from the number of the fields if not given)")
+    for subparser in [play_parser, analyze_parser]:
+        subparser.add_argument("--win-length", type = int, default = 3)
+        subparser.add_argument("--time-limit", type = float, default = None, help = "seconds per move")
+        subparser.add_argument("--node-limit", type = int, default = None, help = "nodes (playouts for mcts) per move")
+    gui_parser = subparsers.add_parser("gui", help = "open the game window")
+    gui_parser.add_argument("--profile", default = None, help = "file where the latency of the turns and the profiles of the slowest ones are written at exit (see Profiler.py)")
+    subparsers.add_parser("engine", help = "answer the engine protocol commands on stdin (see Engine.py)")
+    subparsers.add_parser("import-time", help = "measure how long the import of this module takes")
+    args = parser.parse_args()
+
+    if args.command == "play":
+        play(args.strategy, args.size, args.win_length, args.time_limit, args.node_limit, args.computer_first, args.record)
+    elif args.command == "analyze":
+        result = analyze(args.position, args.win_length, args.to_move, args.time_limit, args.node_limit)
+        if result["status"] != "1":
+            print("the game is over: " + get_game_result(result["status"]))
+        else:
+            print("best move for {}: field {} {}".format(result["to_move"], result["field_ID"], result["move"]))
+            print(result["stats"].format())
+    elif args.command == "gui":
+        if args.profile is not None:
+            import Profiler
+            Profiler.enable(args.profile)
+        import initial_window
+        initial_window.main()
+    elif args.command == "engine":
+        from Engine import Engine
+        Engine().run()
+    else:
+        result = measure_import_time()
+        print("import tic_tac_toe: {:.1f} ms".format(result["seconds"] * 1000))
+        for seconds, name in result["slowest"]:
+            print("    {:<20} {:.1f} ms".format(name, seconds * 1000))
+        if result["gui_modules"]:
+            print("imported GUI modules: " + ", ".join(result["gui_modules"]))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import PySimpleGUI as sg
+from game_window import GameWindow, main_color, other_color
+from UltimateBoard import UltimateBoard, SUB_BOARDS, SIZE
+from UltimateAI import UltimateAI
+
+class UltimateGameWindow(GameWindow):
+    #title and margins of the window
+    title = "Ultimate Tic Tac Toe"
+    margins = (44,22)
+
+    def __init__(self, game_mode: str, player_1_name: str, player_2_name: str, show_search_stats: bool = False):
+        """ initializes an instance of the UltimateGameWindow object - the game window of Ultimate Tic Tac Toe (see UltimateBoard module):
+            the 9 sub-boards in the frames, only the tiles where the player can move are enabled. The event loop and the computer turn in the
+            background thread are the ones of the GameWindow
+
+        Args:
+            game_mode (str): 'Player vs Player' or 'Player vs Ultimate Computer'
+            player_1_name (str): name of the first player (preferably 'O')
+            player_2_name (str): name of the second player (preferably 'X')
+            show_search_stats (bool): show the debug panel with the counters of the AI's last search
+        """
+        #the games of this mode are not saved (the game records hold the moves of one board only)
+        super().__init__(game_mode, player_1_name, player_2_name, SIZE, 3, show_search_stats, record_path = None)
+
+    def create_the_game_board(self) -> UltimateBoard:
+        """ creates the board of the game: the 9 sub-boards
+
+        Returns:
+            UltimateBoard: empty board
+        """
+        return UltimateBoard()
+
+    def create_the_computer(self) -> UltimateAI:
+        """ creates the computer player, searching within the fixed time per move
+
+        Returns:
+            UltimateAI: computer player (the second player)
+        """
+        return UltimateAI(self.player_2_name)
+
+    def create_the_tiles_buttons(self) -> list:
+        """ creates the sub-boards in the frames, the tiles keyed with their coordinates on the whole 9x9 grid
+
+        Returns:
+            list: rows of the layout with the sub-boards
+        """
+        return [[sg.Frame(" ", [[sg.Button(size = (3,1), key = UltimateBoard.get_coords(sub_row * 3 + sub_col, row * 3 + col), button_color = main_color) for col in range(3)] for row in range(3)],
+                          key = ("sub_board", sub_row * 3 + sub_col), pad = 4) for sub_col in range(3)] for sub_row in range(3)]
+
+    def create_the_bottom_buttons(self) -> list:
+        """ creates the buttons below the board: reset, change mode and leave (the hint is not available in this mode, the whole game can not be analyzed)
+
+        Returns:
+            list: row of the layout with the buttons
+        """
+        return [sg.Button(text, size = (13,2), pad = 5, button_color = other_color) for text in ["Reset", "Change mode", "Leave"]]
+
+    def create_the_view(self, tiles: list):
+        """ creates the view model like the GameWindow, with the marks of the sub-boards
+
+        Args:
+            tiles (list): keys of the tiles buttons
+        """
+        super().create_the_view(tiles)
+        for sub_board in range(SUB_BOARDS):
+            self.view.track(("sub_board", sub_board), value = " ")
+
+    def prepare_the_board_for_next_turn(self):
+        """ after the human player turn against the computer, disables all the tile buttons and enables next turn button,
+            otherwise enables only the tiles where the next player can move
+        """
+        if self.game_mode != "Player vs Player" and not self.player:
+            super().prepare_the_board_for_next_turn()
+        else:
+            self.enable_the_tiles_buttons_disable_next_turn_button()
+
+    def switch_turn(self):
+        """ changes the current player and updates the player info in the window (with the sub-board where the player has to move)
+        """
+        super().switch_turn()
+        if self.game_board.next_sub_board is not None:
+            self.view.set("player_info", value = "Player {} move! (board {})".format(self.player + 1, self.game_board.next_sub_board + 1))
+
+    def check_the_game_status(self):
+        """ marks the sub-board of the last move if it got won or full, then checks if the game is draw or someone has winned
+            and if so stop the game and show appropriate message
+        """
+        sub_board = self.game_board.last_move[0]
+        status = self.game_board.sub_board_statuses[sub_board]
+        if status != "1":
+            self.view.set(("sub_board", sub_board), value = "Draw" if status == "0" else "Won by {}".format(status))
+        self.show_the_game_result(self.game_board.get_game_status())
+
+    def disable_the_tile_buttons(self):
+        """ disables the tiles buttons (only the empty ones, the taken tiles are disabled when they are taken)
+        """
+        for sub_board, board in enumerate(self.game_board.sub_boards):
+            for cell in board.get_free_cells():
+                self.view.set(UltimateBoard.get_coords(sub_board, cell), disabled = True)
+
+    def enable_the_tiles_buttons_disable_next_turn_button(self):
+        """ enables the tiles where the player can move (disables the other empty ones) and disables the next turn button
+        """
+        self.view.set("next_turn_button", disabled = True, button_color = other_color)
+        open_sub_boards = self.game_board.get_open_sub_boards()
+        for sub_board, board in enumerate(self.game_board.sub_boards):
+            for cell in board.get_free_cells():
+                self.view.set(UltimateBoard.get_coords(sub_board, cell), disabled = sub_board not in open_sub_boards)
+
+    def reset(self):
+        """ resets the board like the GameWindow, and clears the marks of the sub-boards
+        """
+        super().reset()
+        for sub_board in range(SUB_BOARDS):
+            self.view.set(("sub_board", sub_board), value = " ")
+
+    def get_game_mode_info(self) -> str:
+        """ returns the game mode text
+
+        Returns:
+            str: game mode info
+        """
+        return "Ultimate: {}".format(self.game_mode)